@@ -17,6 +17,9 @@ class ContactAdmin(admin.ModelAdmin):
     # Columns displayed on the admin list page
     list_display = ("subject", "name", "email", "created_at", "read")
 
+    # Show unread messages first, newest first
+    ordering = ("read", "-created_at")
+
     # Filters shown in the right sidebar
     list_filter = ("created_at", "read")
 
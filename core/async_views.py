@@ -0,0 +1,54 @@
+"""
+Async views for the core app, served under ASGI.
+
+Includes:
+- Async version of the contact view, saving messages with the async ORM
+"""
+
+from django.shortcuts import render, redirect
+from django.contrib import messages
+from .forms import ContactForm
+
+
+async def contact_view(request):
+    """
+    Async version of :view:`core.views.contact_view`.
+
+    The user is loaded and the message is saved with the async ORM; the
+    form itself runs no queries.
+
+    **Template:** :template:`core/contact.html`
+
+    **Context:**
+
+    ``contact_form``
+        Instance of `ContactForm` for rendering in the template.
+    """
+    # Load the user now; the lazy request.user would query the database
+    # from async code
+    request.user = await request.auser()
+
+    if request.method == "POST":
+        contact_form = ContactForm(request.POST)
+        if contact_form.is_valid():
+            contact_message = contact_form.save(commit=False)
+            if request.user.is_authenticated:
+                contact_message.user = request.user
+            await contact_message.asave()
+            messages.success(request, "Thank you! Your message has been sent.")
+            return redirect("home")  # Redirect to homepage after submission
+        else:
+            messages.error(
+                request,
+                "Your message could not be sent. Please check your input."
+            )
+    else:
+        # Prefill email if user is authenticated and email address is available
+        if request.user.is_authenticated:
+            contact_form = ContactForm(initial={
+                "email": request.user.email
+            })
+        else:
+            contact_form = ContactForm()
+
+    return render(request, "core/contact.html", {"contact_form": contact_form})
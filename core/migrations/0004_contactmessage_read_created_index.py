@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-17 23:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_contactmessage_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['read', '-created_at'], name='contact_read_created_idx'),
+        ),
+    ]
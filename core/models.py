@@ -38,6 +38,14 @@ class ContactMessage(models.Model):
     read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Admin inbox: unread messages first, newest first
+            models.Index(
+                fields=["read", "-created_at"], name="contact_read_created_idx"
+            ),
+        ]
+
     def __str__(self):
         """Return a readable label for the event."""
         return f"{self.name} - {self.subject}"
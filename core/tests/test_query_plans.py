@@ -0,0 +1,38 @@
+"""
+Query plan tests for the core app.
+"""
+
+from django.db import connection
+from django.test import TestCase
+from core.models import ContactMessage
+
+
+class ContactMessageQueryPlanTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ContactMessage.objects.bulk_create(
+            ContactMessage(
+                name=f"Sender {i}",
+                email=f"sender{i}@example.com",
+                subject="Subject",
+                message="Message",
+                read=i % 4 != 0,
+            )
+            for i in range(1000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def test_unread_inbox_uses_index(self):
+        """
+        Listing unread messages newest first (the admin inbox filtered by
+        read status) should search the read/created_at index instead of
+        scanning and sorting the whole table.
+        """
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest(f"No plan check for {connection.vendor}")
+        queryset = ContactMessage.objects.filter(read=False).order_by(
+            "read", "-created_at"
+        )
+        plan = queryset.explain()
+        self.assertIn("contact_read_created_idx", plan)
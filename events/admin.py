@@ -4,8 +4,12 @@ Registers Event and Category models with custom admin settings.
 """
 
 from django.contrib import admin
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django_summernote.admin import SummernoteModelAdmin
+from .exporting import CONTENT_TYPES, iter_export
 from .models import Event, Category
+from .search import search_events
 
 
 @admin.register(Category)
@@ -43,7 +47,8 @@ class EventAdmin(SummernoteModelAdmin):
         'title', 'organizer', 'date', 'start_time', 'is_past', 'cancelled'
     )
 
-    # Fields that can be searched quickly
+    # Fields that can be searched (through the full-text search index,
+    # see get_search_results)
     search_fields = ('title', 'organizer', 'location', 'description')
 
     # Sidebar filters for easy filtering
@@ -54,3 +59,36 @@ class EventAdmin(SummernoteModelAdmin):
 
     # Exclude auto-generated slug from admin form
     exclude = ('slug',)
+
+    # Export the selected events (or, with "select all", every event
+    # matching the current filters and search)
+    actions = ('export_csv', 'export_ndjson')
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Search events through the full-text search index instead of
+        LIKE scans over every search field.
+        """
+        if not search_term.strip():
+            return queryset, False
+        return search_events(queryset, search_term), False
+
+    def _export(self, queryset, file_format):
+        """Stream the events in ``queryset`` as a file download."""
+        response = StreamingHttpResponse(
+            iter_export(queryset, file_format),
+            content_type=CONTENT_TYPES[file_format],
+        )
+        filename = f"events-{timezone.localdate():%Y-%m-%d}.{file_format}"
+        response["Content-Disposition"] = (
+            f'attachment; filename="{filename}"'
+        )
+        return response
+
+    @admin.action(description="Export selected events as CSV")
+    def export_csv(self, request, queryset):
+        return self._export(queryset, "csv")
+
+    @admin.action(description="Export selected events as NDJSON")
+    def export_ndjson(self, request, queryset):
+        return self._export(queryset, "ndjson")
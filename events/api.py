@@ -0,0 +1,166 @@
+"""
+Read-only JSON API for events and categories (version 1).
+
+Includes:
+- event_list_api: Upcoming events, filtered like the events list, with
+  sparse fieldsets (``?fields=``) and cursor pagination.
+- category_list_api: All categories.
+
+Responses are built from ``values()`` rows instead of model instances, so
+only the requested columns are selected and no templates are rendered.
+"""
+
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+from .forms import EventFilterForm
+from .models import Category, Event
+from .pagination import CursorPaginator
+
+# Event fields of the API and the columns they are read from. The
+# categories are looked up separately, the URL is built from the slug.
+EVENT_FIELDS = {
+    "id": "id",
+    "slug": "slug",
+    "url": "slug",
+    "title": "title",
+    "organizer": "organizer",
+    "description": "description",
+    "date": "date",
+    "start_time": "start_time",
+    "end_time": "end_time",
+    "starts_at": "starts_at",
+    "ends_at": "ends_at",
+    "difficulty": "difficulty",
+    "location": "location",
+    "latitude": "latitude",
+    "longitude": "longitude",
+    "link": "link",
+    "cancelled": "cancelled",
+    "author": "author__username",
+    "categories": None,
+}
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _error(message, status=400, **details):
+    """Return a JSON error response."""
+    return JsonResponse({"error": message, **details}, status=status)
+
+
+def _page_url(request, **params):
+    """Return the absolute URL of this request with replaced params."""
+    query = request.GET.copy()
+    for param in ("after", "before"):
+        query.pop(param, None)
+    for param, value in params.items():
+        query[param] = value
+    return request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+
+
+def _event_categories(event_ids):
+    """Return the category IDs of the given events, per event ID."""
+    categories = {pk: [] for pk in event_ids}
+    rows = Event.category.through.objects.filter(
+        event_id__in=event_ids
+    ).values_list("event_id", "category_id")
+    for event_id, category_id in rows:
+        categories[event_id].append(category_id)
+    return categories
+
+
+@require_GET
+def event_list_api(request):
+    """
+    Return upcoming events as JSON, soonest first.
+
+    **Parameters:**
+
+    ``category``, ``difficulty``, ``date_filter``, ``cancelled``, ``q``,
+    ``near``, ``radius``, ``lat``, ``lng``
+        Filters of the events list (EventFilterForm). Search results are
+        ordered by date as well, so they can be paginated by cursor.
+    ``fields``
+        Comma-separated list of the fields to return (default: all).
+    ``limit``
+        Page size (default 20, at most 100).
+    ``after`` / ``before``
+        Cursors of the next/previous page, taken from ``next``/``previous``.
+
+    **Response:** ``{"results": [...], "next": url, "previous": url}``
+    """
+    fields = [
+        field.strip()
+        for field in request.GET.get("fields", "").split(",")
+        if field.strip()
+    ] or list(EVENT_FIELDS)
+    unknown = sorted(set(fields) - set(EVENT_FIELDS))
+    if unknown:
+        return _error(f"Unknown fields: {', '.join(unknown)}.")
+
+    try:
+        limit = int(request.GET.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return _error("limit must be a number.")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return _error(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+
+    form = EventFilterForm(request.GET)
+    if not form.is_valid():
+        return _error("Invalid filters.", errors=form.errors.get_json_data())
+    queryset = form.filter_queryset(Event.objects.upcoming())
+
+    # id and starts_at are needed for the cursors
+    columns = {"id", "starts_at"}
+    columns.update(
+        EVENT_FIELDS[field] for field in fields if EVENT_FIELDS[field]
+    )
+    # The paginator orders by (starts_at, id), also for search results
+    queryset = queryset.values(*columns)
+    page = CursorPaginator(queryset, limit).page(
+        after=request.GET.get("after"), before=request.GET.get("before")
+    )
+
+    categories = {}
+    if "categories" in fields:
+        categories = _event_categories([row["id"] for row in page])
+
+    results = []
+    for row in page:
+        event = {}
+        for field in fields:
+            if field == "categories":
+                event[field] = categories[row["id"]]
+            elif field == "url":
+                event[field] = request.build_absolute_uri(
+                    reverse("event_detail", args=[row["slug"]])
+                )
+            else:
+                event[field] = row[EVENT_FIELDS[field]]
+        results.append(event)
+
+    return JsonResponse({
+        "results": results,
+        "next": (
+            _page_url(request, after=page.next_cursor)
+            if page.has_next() else None
+        ),
+        "previous": (
+            _page_url(request, before=page.previous_cursor)
+            if page.has_previous() else None
+        ),
+    })
+
+
+@require_GET
+def category_list_api(request):
+    """
+    Return all categories as JSON, in their display order.
+
+    **Response:** ``{"results": [{"id": ..., "name": ...}, ...]}``
+    """
+    return JsonResponse({
+        "results": list(Category.objects.values("id", "name"))
+    })
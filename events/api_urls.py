@@ -0,0 +1,14 @@
+"""
+URL configuration of the events JSON API (version 1).
+"""
+
+from django.urls import path
+from . import api
+
+urlpatterns = [
+    # Upcoming events with filters, sparse fieldsets and cursor paging
+    path('events/', api.event_list_api, name='api_v1_events'),
+
+    # All categories
+    path('categories/', api.category_list_api, name='api_v1_categories'),
+]
@@ -9,7 +9,11 @@ class EventsConfig(AppConfig):
     """
     AppConfig for the events app.
 
-    Defines the default primary key field type and app name.
+    Defines the default primary key field type and app name, and
+    connects the signal handlers that invalidate cached listings.
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'events'
+
+    def ready(self):
+        from . import signals  # noqa
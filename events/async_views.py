@@ -0,0 +1,259 @@
+"""
+Async versions of the main event pages, served under ASGI.
+
+Includes:
+- AsyncConditionalListMixin: Async ``get()`` for the conditional list
+  views, loading their data with the async ORM.
+- TodaysEventsListView, EventListView, ProfileView: Async versions of
+  the homepage, events list and profile views.
+- event_detail: Async version of the event detail view.
+
+The views subclass the sync views and load everything they show with
+the async ORM (``aget()``, ``aaggregate()``, ``async for``, including
+prefetched categories) before rendering. Rendering then runs no
+queries, as Django doesn't allow database access from async code. The
+list views return template responses, which Django renders in a thread,
+so their cached fragments may use any cache backend.
+
+Validating the filter form of the events list may geocode a location
+and looks up the selected categories, so it runs in a thread.
+
+See ``runnershive/asgi_urls.py`` for where these views are used.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+from django.shortcuts import render
+from django.views.decorators.http import condition
+from django.views.generic import View
+from django.views.generic.list import MultipleObjectMixin
+from . import views
+from .cache import (
+    aget_author_summary, aget_cached_event_ids, aget_todays_events,
+    aget_version
+)
+from .conditional import (
+    aload_event_state, aqueryset_fingerprint, event_etag,
+    event_last_modified
+)
+from .facets import aget_facet_counts
+from .models import Event
+from .pagination import CursorPaginator
+
+
+async def _materialize(page):
+    """Fetch the events of ``page`` with the async ORM."""
+    page.object_list = [event async for event in page.object_list]
+    return page
+
+
+class AsyncConditionalListMixin:
+    """
+    Async ``get()`` for subclasses of the sync conditional list views.
+
+    The fingerprint is loaded with ``aget_fingerprint()`` and checked
+    first; only if the client's copy is outdated, ``aload()`` loads what
+    the page shows. Both are awaited before the sync view renders, as is
+    the categories version (from the async cache API), so computing the
+    ETag touches neither the database nor the cache.
+    """
+
+    async def aget_queryset(self):
+        """Return the listed events (lazily, if possible)."""
+        return self.get_queryset()
+
+    async def aget_fingerprint(self):
+        """Return the fingerprint of the listed events."""
+        return await aqueryset_fingerprint(self.get_fingerprint_queryset())
+
+    async def aload(self):
+        """Load everything rendered on the page."""
+
+    def get_fingerprint(self):
+        """Return the fingerprint loaded in ``get()``."""
+        return self.fingerprint
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Answer 304 if the client's copy is current, otherwise render the
+        list with an ETag.
+        """
+        # Load the user now; the lazy request.user would query the
+        # database from async code
+        request.user = await request.auser()
+        self.object_list = await self.aget_queryset()
+        self.fingerprint = await self.aget_fingerprint()
+        self.categories_version = await aget_version("categories")
+        etag = self.get_etag()
+        response = self.get_not_modified_response(etag)
+        if response is None:
+            await self.aload()
+            response = self.render_with_etag(etag)
+        return response
+
+
+class TodaysEventsListView(
+    AsyncConditionalListMixin, views.TodaysEventsListView
+):
+    """
+    Async version of :view:`events.views.TodaysEventsListView`.
+
+    **Template:** :template:`core/index.html`
+    """
+
+    async def aget_queryset(self):
+        """Return today's (cached) events that have not ended yet."""
+        return await aget_todays_events()
+
+    async def aget_fingerprint(self):
+        """Return the IDs and update times of the listed events."""
+        return views.TodaysEventsListView.get_fingerprint(self)
+
+
+class EventListView(AsyncConditionalListMixin, views.EventListView):
+    """
+    Async version of :view:`events.views.EventListView`.
+
+    **Template:** :template:`events/event_list.html`
+    """
+
+    async def aget_queryset(self):
+        """
+        Return the filtered upcoming events, validating the filter form in
+        a thread.
+        """
+        return await sync_to_async(self.get_queryset)()
+
+    async def aload(self):
+        """
+        Load the requested page of events, the facet counts and the
+        categories offered in the filter form.
+        """
+        page_size = self.get_paginate_by(self.object_list)
+        if self.uses_cursor_pagination():
+            page = await CursorPaginator(self.object_list, page_size).apage(
+                after=self.request.GET.get("after"),
+                before=self.request.GET.get("before"),
+            )
+            self.pagination = (
+                None, page, page.object_list, page.has_other_pages()
+            )
+        else:
+            # Paginate the cached list of matching event IDs and only
+            # fetch the events shown on the requested page
+            event_ids = await aget_cached_event_ids(
+                self.object_list, self.filter_key
+            )
+            paginator, page, page_ids, is_paginated = (
+                MultipleObjectMixin.paginate_queryset(
+                    self, event_ids, page_size
+                )
+            )
+            events = await Event.objects.with_categories().ain_bulk(page_ids)
+            page.object_list = [
+                events[pk] for pk in page_ids if pk in events
+            ]
+            self.pagination = (
+                paginator, page, page.object_list, is_paginated
+            )
+
+        self.facets = await aget_facet_counts(self.form)
+        self.categories = [
+            category async for category
+            in self.form.fields["category"].queryset
+        ]
+
+    def paginate_queryset(self, queryset, page_size):
+        """Return the page loaded in ``aload()``."""
+        return self.pagination
+
+    def get_facet_counts(self):
+        """Return the facet counts loaded in ``aload()``."""
+        return self.facets
+
+    def get_context_data(self, **kwargs):
+        """
+        Offer the categories loaded in ``aload()`` in the filter form, so
+        rendering it doesn't query them.
+        """
+        context = super().get_context_data(**kwargs)
+        field = self.form.fields["category"]
+        field.choices = [
+            (category.pk, field.label_from_instance(category))
+            for category in self.categories
+        ]
+        return context
+
+
+class ProfileView(AsyncConditionalListMixin, views.ProfileView):
+    """
+    Async version of :view:`events.views.ProfileView`.
+
+    **Template:** :template:`events/profile.html`
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Skip the login check of LoginRequiredMixin, which loads the user
+        synchronously; ``get()`` checks it.
+        """
+        return View.dispatch(self, request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        """Redirect anonymous users to the login page."""
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await super().get(request, *args, **kwargs)
+
+    async def aget_fingerprint(self):
+        """Return the (cached) summary of the user's events."""
+        self.summary = await aget_author_summary(self.request.user)
+        return views.ProfileView.get_fingerprint(self)
+
+    async def aload(self):
+        """Load the requested pages of upcoming and past events."""
+        paginator, page, object_list, is_paginated = (
+            super().paginate_queryset(self.object_list, self.paginate_by)
+        )
+        await _materialize(page)
+        self.pagination = (paginator, page, page.object_list, is_paginated)
+        self.past_page = await _materialize(super().get_past_page())
+
+    def paginate_queryset(self, queryset, page_size):
+        """Return the page of upcoming events loaded in ``aload()``."""
+        return self.pagination
+
+    def get_past_page(self):
+        """Return the page of past events loaded in ``aload()``."""
+        return self.past_page
+
+
+@condition(etag_func=event_etag, last_modified_func=event_last_modified)
+async def _event_detail(request, slug):
+    try:
+        event = await Event.objects.with_categories().aget(slug=slug)
+    except Event.DoesNotExist:
+        raise Http404("No event found matching the query.")
+
+    return render(
+        request,
+        "events/event_detail.html",
+        {"event": event},
+    )
+
+
+async def event_detail(request, slug):
+    """
+    Async version of :view:`events.views.event_detail`.
+
+    The user and the event's validators are loaded with the async ORM
+    first, as the ``condition`` decorator computes the validators
+    synchronously.
+
+    **Template:** :template:`events/event_detail.html`
+    """
+    request.user = await request.auser()
+    await aload_event_state(request, slug)
+    return await _event_detail(request, slug)
@@ -0,0 +1,129 @@
+"""
+Autocomplete suggestions for free-text event fields.
+
+Includes:
+- PrefixIndex: An in-memory, sorted index of the distinct values of a
+  field, answering (word) prefix lookups with a binary search.
+- suggest: Returns the most used existing spellings matching what a user
+  typed so far.
+
+Every process keeps one PrefixIndex per field and rebuilds it (with one
+grouped query) when the "list" cache version changes, i.e. after any
+event was created, changed or deleted. On PostgreSQL, typos that match no
+prefix are looked up with trigram similarity (``pg_trgm`` GIN indexes
+created by migration 0011).
+"""
+
+import heapq
+from bisect import bisect_left
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Count
+from .cache import get_version
+from .models import Event
+
+# Event fields with autocomplete suggestions
+AUTOCOMPLETE_FIELDS = ("location", "organizer")
+
+# Maximum number of suggestions returned
+MAX_SUGGESTIONS = 10
+
+# Minimum input length for fuzzy (trigram) matches
+MIN_TRIGRAM_LENGTH = 3
+
+# Sorts after every other character, to find the end of a prefix range
+_MAX_CHAR = "\U0010ffff"
+
+
+def _normalize(value):
+    """Return ``value`` lowercased and with whitespace collapsed."""
+    return " ".join(value.split()).casefold()
+
+
+class PrefixIndex:
+    """
+    Sorted index of field values and how often they are used.
+
+    Every value is indexed from the start of each of its words, so both
+    "olym" and "stad" find "Olympic Stadium".
+    """
+
+    def __init__(self, counts):
+        """Build the index from ``(value, count)`` pairs."""
+        entries = []
+        for value, count in counts:
+            words = _normalize(value).split()
+            for start in range(len(words)):
+                entries.append((" ".join(words[start:]), count, value))
+        entries.sort()
+        self._keys = [key for key, count, value in entries]
+        self._entries = entries
+
+    def lookup(self, prefix, limit=MAX_SUGGESTIONS):
+        """
+        Return up to ``limit`` values with a word starting with
+        ``prefix``, most used first.
+        """
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + _MAX_CHAR, lo=start)
+
+        # A value matches once per word starting with the prefix
+        counts = {
+            value: count for key, count, value in self._entries[start:end]
+        }
+        best = heapq.nsmallest(
+            limit, counts.items(), key=lambda item: (-item[1], item[0])
+        )
+        return [value for value, count in best]
+
+
+# Prefix index and the "list" version it was built for, per field
+_indexes = {}
+
+
+def get_index(field):
+    """Return the prefix index of ``field``, rebuilt if events changed."""
+    version = get_version("list")
+    cached = _indexes.get(field)
+    if cached is None or cached[0] != version:
+        counts = (
+            Event.objects.values_list(field)
+            .annotate(uses=Count("id"))
+            .order_by()
+        )
+        cached = (version, PrefixIndex(counts))
+        _indexes[field] = cached
+    return cached[1]
+
+
+def _similar_values(field, term, limit):
+    """Return up to ``limit`` values of ``field`` similar to ``term``."""
+    return list(
+        Event.objects.filter(**{f"{field}__trigram_similar": term})
+        .annotate(similarity=TrigramSimilarity(field, term))
+        .order_by("-similarity", field)
+        .values_list(field, flat=True)
+        .distinct()[:limit]
+    )
+
+
+def suggest(field, term, limit=MAX_SUGGESTIONS):
+    """
+    Return up to ``limit`` existing values of ``field`` for the input
+    ``term``: prefix matches first, then (on PostgreSQL) similar
+    spellings.
+    """
+    suggestions = get_index(field).lookup(term, limit)
+    if (
+        len(suggestions) < limit
+        and len(term.strip()) >= MIN_TRIGRAM_LENGTH
+        and connections[Event.objects.db].vendor == "postgresql"
+    ):
+        for value in _similar_values(field, term.strip(), limit):
+            if value not in suggestions:
+                suggestions.append(value)
+        suggestions = suggestions[:limit]
+    return suggestions
@@ -0,0 +1,283 @@
+"""
+Caching helpers for event listings.
+
+Includes:
+- get_version / aget_version / bump_version: Versions of the cached
+  event data (``aget_version`` for async code). They
+  are part of every cache key, so bumping a version (from the signal
+  handlers in ``events.signals``) invalidates everything cached under it
+  at once:
+  - "list": cached event listings, bumped on any event or category change
+  - "categories": cached fragments showing categories, bumped when a
+    category is changed or deleted
+  - "today": the cached list of today's events, bumped when an event
+    taking place today (before or after the change) or a category
+    changes
+- filter_cache_key: Normalizes the cleaned data of an EventFilterForm into
+  a stable cache key.
+- get_cached_event_ids: Returns the ordered list of event IDs for a
+  filtered listing, from the cache if possible.
+- get_todays_events: Returns today's events that haven't ended yet, from
+  the cache if possible.
+- get_author_summary: Returns the numbers of upcoming and past events of
+  a user, from the cache if possible.
+
+The ``a``-prefixed versions of the last three (e.g. ``aget_todays_events``)
+query the database and the cache with their async APIs, for the async
+views.
+"""
+
+import hashlib
+import math
+from datetime import datetime, time, timedelta
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+from runnershive.caching import VersionedCache
+from .models import Event
+
+# Upper bound for how long a listing stays cached (in seconds)
+LIST_CACHE_TIMEOUT = 60 * 60 * 24
+
+VERSIONED_CACHES = {
+    "list": VersionedCache("events:list", alias="pages"),
+    "categories": VersionedCache("events:categories", alias="fragments"),
+    "today": VersionedCache("events:today", alias="pages"),
+}
+
+
+def get_version(name):
+    """Return the current version of the named cached data."""
+    return VERSIONED_CACHES[name].version
+
+
+async def aget_version(name):
+    """Async version of ``get_version``."""
+    return await VERSIONED_CACHES[name].aversion()
+
+
+def bump_version(name):
+    """Invalidate all data cached under the named version."""
+    VERSIONED_CACHES[name].bump()
+
+
+def filter_cache_key(cleaned_data):
+    """
+    Return a cache key fragment for the given EventFilterForm data.
+
+    Equivalent filter combinations (e.g. categories in a different order,
+    or no date filter vs. "all") map to the same key. Search queries are
+    hashed, so user input never ends up in a cache key.
+    """
+    radius = cleaned_data.get("radius")
+    center = cleaned_data.get("center")
+    distance = ""
+    if radius and center:
+        # About 10 m precision
+        distance = f"{radius}@{center[0]:.4f},{center[1]:.4f}"
+
+    query = " ".join((cleaned_data.get("q") or "").lower().split())
+    if query:
+        query = hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()
+    categories = sorted(
+        str(category.pk) for category in cleaned_data.get("category") or []
+    )
+    difficulties = sorted(cleaned_data.get("difficulty") or [])
+    date_filter = cleaned_data.get("date_filter") or "all"
+    cancelled = "1" if cleaned_data.get("cancelled") else "0"
+    return "|".join([
+        ",".join(categories),
+        ",".join(difficulties),
+        date_filter,
+        cancelled,
+        distance,
+        query,
+    ])
+
+
+def _event_ids_key(filter_key):
+    return f"{timezone.localdate().isoformat()}:{filter_key}"
+
+
+def _event_ids_timeout(rows):
+    """
+    Return the IDs of the ``(id, ends_at)`` rows and how many seconds to
+    cache them.
+    """
+    event_ids = [pk for pk, ends_at in rows]
+
+    timeout = LIST_CACHE_TIMEOUT
+    if rows:
+        next_end = min(ends_at for pk, ends_at in rows)
+        seconds = (next_end - timezone.now()).total_seconds()
+        timeout = max(1, min(timeout, int(seconds)))
+    return event_ids, timeout
+
+
+def get_cached_event_ids(queryset, filter_key):
+    """
+    Return the ordered list of IDs of the events in ``queryset``.
+
+    The list is cached per filter combination and day. It expires when
+    the first event in it ends (as that event drops out of the upcoming
+    listing) and is invalidated whenever events or categories change.
+    """
+    key = _event_ids_key(filter_key)
+    event_ids = VERSIONED_CACHES["list"].get(key)
+    if event_ids is None:
+        rows = list(queryset.values_list("id", "ends_at"))
+        event_ids, timeout = _event_ids_timeout(rows)
+        VERSIONED_CACHES["list"].set(key, event_ids, timeout)
+    return event_ids
+
+
+async def aget_cached_event_ids(queryset, filter_key):
+    """Async version of ``get_cached_event_ids``."""
+    key = _event_ids_key(filter_key)
+    event_ids = await VERSIONED_CACHES["list"].aget(key)
+    if event_ids is None:
+        rows = [row async for row in queryset.values_list("id", "ends_at")]
+        event_ids, timeout = _event_ids_timeout(rows)
+        await VERSIONED_CACHES["list"].aset(key, event_ids, timeout)
+    return event_ids
+
+
+def _current_todays_events(cached, now):
+    """
+    Return the list of today's events from the ``cached`` entry, or None
+    if it isn't cached (anymore).
+    """
+    # Cache timeouts are whole seconds, the exact expiry is checked here
+    if cached is not None and cached[0] >= now:
+        return cached[1]
+    return None
+
+
+def _todays_events_query():
+    return Event.objects.today_upcoming().with_categories().order_by(
+        "starts_at"
+    )
+
+
+def _todays_events_entry(events, now):
+    """
+    Return the cache entry of today's ``events`` and its timeout, so it
+    expires when the list changes by itself.
+    """
+    midnight = timezone.make_aware(
+        datetime.combine(timezone.localdate(now) + timedelta(days=1), time()),
+        timezone.get_current_timezone(),
+    )
+    # Events are upcoming up to and including their end; from midnight
+    # on, the next day's key is used
+    expires = min([event.ends_at for event in events] + [midnight])
+    timeout = max(1, math.ceil((expires - now).total_seconds()))
+    return (expires, events), timeout
+
+
+def get_todays_events():
+    """
+    Return today's events that haven't ended yet (with their categories),
+    ordered by start.
+
+    The list is cached until it would change by itself: when the next of
+    its events ends, or at midnight. Changes to today's events invalidate
+    it (see ``events.signals``), so cache hits run no queries.
+    """
+    now = timezone.now()
+    key = timezone.localdate(now).isoformat()
+    events = _current_todays_events(VERSIONED_CACHES["today"].get(key), now)
+    if events is None:
+        events = list(_todays_events_query())
+        VERSIONED_CACHES["today"].set(
+            key, *_todays_events_entry(events, now)
+        )
+    return events
+
+
+async def aget_todays_events():
+    """Async version of ``get_todays_events``."""
+    now = timezone.now()
+    key = timezone.localdate(now).isoformat()
+    events = _current_todays_events(
+        await VERSIONED_CACHES["today"].aget(key), now
+    )
+    if events is None:
+        # Async iteration runs the category prefetch as well
+        events = [event async for event in _todays_events_query()]
+        await VERSIONED_CACHES["today"].aset(
+            key, *_todays_events_entry(events, now)
+        )
+    return events
+
+
+def _current_author_summary(summary, now):
+    """Return the cached ``summary``, or None if it isn't current."""
+    # Cache timeouts are whole seconds, the exact expiry is checked here
+    if summary is not None and (
+        summary["next_end"] is None or summary["next_end"] >= now
+    ):
+        return summary
+    return None
+
+
+def _author_summary_aggregates(now):
+    upcoming = Q(ends_at__gte=now)
+    return {
+        "total": Count("pk"),
+        "upcoming": Count("pk", filter=upcoming),
+        "cancelled": Count("pk", filter=upcoming & Q(cancelled=True)),
+        "last_updated": Max("updated_on"),
+        "next_end": Min("ends_at", filter=upcoming),
+    }
+
+
+def _complete_author_summary(summary, now):
+    """
+    Complete the aggregated ``summary`` and return how many seconds to
+    cache it.
+    """
+    summary["past"] = summary["total"] - summary["upcoming"]
+
+    timeout = LIST_CACHE_TIMEOUT
+    if summary["next_end"] is not None:
+        seconds = math.ceil((summary["next_end"] - now).total_seconds())
+        timeout = max(1, min(timeout, seconds))
+    return timeout
+
+
+def get_author_summary(user):
+    """
+    Return the numbers of events of ``user``, as a dict with ``total``,
+    ``upcoming``, ``past`` and ``cancelled`` (upcoming but cancelled),
+    plus ``last_updated`` (the latest ``updated_on``).
+
+    Computed with one aggregate query and cached per user until the
+    user's next upcoming event ends (as it then counts as past); any
+    event change invalidates it.
+    """
+    now = timezone.now()
+    key = f"author:{user.pk}"
+    summary = _current_author_summary(VERSIONED_CACHES["list"].get(key), now)
+    if summary is None:
+        summary = Event.objects.filter(author=user).aggregate(
+            **_author_summary_aggregates(now)
+        )
+        timeout = _complete_author_summary(summary, now)
+        VERSIONED_CACHES["list"].set(key, summary, timeout)
+    return summary
+
+
+async def aget_author_summary(user):
+    """Async version of ``get_author_summary``."""
+    now = timezone.now()
+    key = f"author:{user.pk}"
+    summary = _current_author_summary(
+        await VERSIONED_CACHES["list"].aget(key), now
+    )
+    if summary is None:
+        summary = await Event.objects.filter(author=user).aaggregate(
+            **_author_summary_aggregates(now)
+        )
+        timeout = _complete_author_summary(summary, now)
+        await VERSIONED_CACHES["list"].aset(key, summary, timeout)
+    return summary
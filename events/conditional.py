@@ -0,0 +1,249 @@
+"""
+Conditional GET (ETag / Last-Modified) support for event pages.
+
+Includes:
+- make_etag: Hashes everything a rendered page depends on into an ETag.
+- viewer_key: Identifies how a page looks for the requesting user and
+  session.
+- queryset_fingerprint / aqueryset_fingerprint: Latest update, number of
+  events and number of upcoming events of a queryset, in one aggregate
+  query (the latter with the async ORM).
+- event_etag / event_last_modified: Validators of the event detail page,
+  derived from ``Event.updated_on`` (for :func:`django.views.decorators.
+  http.condition`).
+- aload_event_state: Looks up what the validators of the event detail
+  page need with the async ORM and cache API, for the async detail view.
+- list_etag: ETag of a list page with a given fingerprint.
+- ConditionalListMixin: Answers list views with 304 Not Modified, based on
+  a cheap aggregate fingerprint of their queryset, before paginating and
+  rendering anything.
+
+No validators are sent while flash messages are waiting to be shown, as
+a 304 would keep the browser from displaying them.
+"""
+
+import hashlib
+from django.contrib import messages
+from django.middleware.csrf import get_token
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from .cache import aget_version, get_version
+from .models import Event
+
+
+def make_etag(*parts):
+    """Return an ETag for a page depending on the given parts."""
+    value = "|".join(str(part) for part in parts)
+    return hashlib.md5(value.encode(), usedforsecurity=False).hexdigest()
+
+
+def viewer_key(request):
+    """
+    Return who the page is rendered for, as pages show the logged-in
+    user's navigation and controls.
+
+    For logged-in users, pages contain forms with CSRF tokens, which are
+    only accepted with the current CSRF secret. Logging in rotates the
+    secret (and the session), so a hash of both is included: a copy from
+    before a logout and new login must be rendered again, or its forms
+    would fail.
+    """
+    if not request.user.is_authenticated:
+        return "anonymous"
+    # Creates the secret if the request has none yet, as rendering the
+    # page would
+    get_token(request)
+    secrets = make_etag(
+        request.session.session_key, request.META["CSRF_COOKIE"]
+    )
+    return f"user:{request.user.pk}:{secrets}"
+
+
+def _fingerprint_aggregates():
+    return {
+        "last_updated": Max("updated_on"),
+        "count": Count("pk"),
+        "upcoming": Count("pk", filter=Q(ends_at__gte=timezone.now())),
+    }
+
+
+def queryset_fingerprint(queryset):
+    """
+    Return the latest ``updated_on``, the number of events and the number
+    of upcoming events in ``queryset``. Any change to the events, and any
+    event ending, changes the fingerprint.
+    """
+    fingerprint = queryset.order_by().aggregate(**_fingerprint_aggregates())
+    return (
+        fingerprint["last_updated"],
+        fingerprint["count"],
+        fingerprint["upcoming"],
+    )
+
+
+async def aqueryset_fingerprint(queryset):
+    """Async version of ``queryset_fingerprint``."""
+    fingerprint = await queryset.order_by().aaggregate(
+        **_fingerprint_aggregates()
+    )
+    return (
+        fingerprint["last_updated"],
+        fingerprint["count"],
+        fingerprint["upcoming"],
+    )
+
+
+def _has_pending_messages(request):
+    # len() loads the messages without marking them as shown
+    return len(messages.get_messages(request)) > 0
+
+
+def _event_state_query(slug):
+    return Event.objects.filter(slug=slug).values_list("updated_on", "ends_at")
+
+
+def _event_state(request, slug):
+    """
+    Return ``(updated_on, ends_at)`` of the event with ``slug``, or None
+    if it doesn't exist. Looked up once per request.
+    """
+    if not hasattr(request, "_event_state"):
+        request._event_state = _event_state_query(slug).first()
+    return request._event_state
+
+
+def _categories_version(request):
+    """
+    Return the version of the cached categories. Looked up once per
+    request.
+    """
+    if not hasattr(request, "_categories_version"):
+        request._categories_version = get_version("categories")
+    return request._categories_version
+
+
+async def aload_event_state(request, slug):
+    """
+    Look up the state of the event with ``slug`` and the categories
+    version with the async ORM and cache API, so the validators below
+    don't query the database or the cache in async views.
+    """
+    if not hasattr(request, "_event_state"):
+        request._event_state = await _event_state_query(slug).afirst()
+    if not hasattr(request, "_categories_version"):
+        request._categories_version = await aget_version("categories")
+
+
+def event_last_modified(request, slug):
+    """
+    Return when the event detail page last changed: when the event was
+    updated, or when it ended (as it's shown as past from then on).
+    """
+    state = _event_state(request, slug)
+    if state is None or _has_pending_messages(request):
+        return None
+    updated_on, ends_at = state
+    if ends_at <= timezone.now():
+        return max(updated_on, ends_at)
+    return updated_on
+
+
+def event_etag(request, slug):
+    """Return the ETag of the event detail page."""
+    last_modified = event_last_modified(request, slug)
+    if last_modified is None:
+        return None
+    return make_etag(
+        "event",
+        slug,
+        last_modified.isoformat(),
+        viewer_key(request),
+        _categories_version(request),
+    )
+
+
+def list_etag(request, name, fingerprint, categories_version):
+    """
+    Return the ETag of the list page ``name`` showing events with the
+    given fingerprint and categories version, or None to skip validation.
+    """
+    if _has_pending_messages(request):
+        return None
+    return make_etag(
+        name,
+        *fingerprint,
+        sorted(request.GET.lists()),
+        viewer_key(request),
+        categories_version,
+        timezone.localdate(),
+    )
+
+
+class ConditionalListMixin:
+    """
+    Conditional GET for list views.
+
+    The ETag is derived from the fingerprint of
+    ``get_fingerprint_queryset()`` (one aggregate query), together with
+    the request parameters, the user, the categories version and the
+    date. If the client already has this version, the view answers 304
+    without paginating or rendering.
+
+    The categories version is looked up once in ``get()`` and passed to
+    the templates as ``categories_version``, as part of the keys of
+    their cached fragments.
+
+    No Last-Modified header is sent: events dropping out of a list or
+    being deleted don't advance the latest ``updated_on``.
+    """
+
+    def get_fingerprint_queryset(self):
+        """Return the events the page depends on."""
+        return self.object_list
+
+    def get_fingerprint(self):
+        """
+        Return values that change whenever the listed events change
+        (by default the fingerprint of ``get_fingerprint_queryset()``).
+        """
+        return queryset_fingerprint(self.get_fingerprint_queryset())
+
+    def get_etag(self):
+        """Return the ETag of the page, or None to skip validation."""
+        return list_etag(
+            self.request, self.__class__.__name__, self.get_fingerprint(),
+            self.categories_version,
+        )
+
+    def get_context_data(self, **kwargs):
+        """Add the categories version for the cached fragments."""
+        context = super().get_context_data(**kwargs)
+        context["categories_version"] = self.categories_version
+        return context
+
+    def get_not_modified_response(self, etag):
+        """Return a 304 response if the client's copy is current."""
+        if not etag:
+            return None
+        return get_conditional_response(self.request, etag=quote_etag(etag))
+
+    def render_with_etag(self, etag):
+        """Render the list and add the ETag header."""
+        response = self.render_to_response(self.get_context_data())
+        if etag:
+            response.headers["ETag"] = quote_etag(etag)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        """
+        Answer 304 if the client's copy is current, otherwise render the
+        list with an ETag.
+        """
+        self.object_list = self.get_queryset()
+        self.categories_version = get_version("categories")
+        etag = self.get_etag()
+        response = self.get_not_modified_response(etag)
+        if response is None:
+            response = self.render_with_etag(etag)
+        return response
@@ -0,0 +1,137 @@
+"""
+Streaming export of events as CSV or NDJSON (JSON Lines).
+
+Includes:
+- CategoryNames: Aggregate joining the category names of an event.
+- export_rows: Yields the export rows of a queryset, reading it in chunks.
+- iter_export: Yields an export file line by line, for streaming
+  responses or writing to files.
+
+Exports use the columns of ``import_events``, so exported files can be
+imported again.
+"""
+
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Aggregate, CharField, OuterRef, Subquery, Value
+from .models import Event
+
+# Columns of the export and the fields they are read from
+EXPORT_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "slug": "slug",
+    "organizer": "organizer",
+    "description": "description",
+    "date": "date",
+    "start_time": "start_time",
+    "end_time": "end_time",
+    "difficulty": "difficulty",
+    "location": "location",
+    "latitude": "latitude",
+    "longitude": "longitude",
+    "link": "link",
+    "categories": "category_names",
+    "cancelled": "cancelled",
+    "author": "author__username",
+    "created_on": "created_on",
+    "updated_on": "updated_on",
+}
+
+# Events fetched from the database at a time
+EXPORT_CHUNK_SIZE = 2000
+
+# Separator of the category names (as expected by import_events)
+CATEGORY_SEPARATOR = ";"
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson; charset=utf-8",
+}
+
+
+class CategoryNames(Aggregate):
+    """
+    Joins the values of an expression with CATEGORY_SEPARATOR
+    (``STRING_AGG`` on PostgreSQL, ``GROUP_CONCAT`` on SQLite).
+    """
+
+    function = "STRING_AGG"
+    output_field = CharField()
+
+    def __init__(self, expression, **extra):
+        super().__init__(expression, Value(CATEGORY_SEPARATOR), **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, function="GROUP_CONCAT", **extra_context
+        )
+
+
+def _category_names():
+    """
+    Return a subquery of the joined category names of the outer event.
+    The database aggregates them while reading the events, so exports
+    don't run a category query per event or per chunk.
+    """
+    through = Event.category.through
+    return Subquery(
+        through.objects.filter(event_id=OuterRef("pk"))
+        .order_by()
+        .values("event_id")
+        .annotate(names=CategoryNames("category__name"))
+        .values("names")
+    )
+
+
+def export_rows(queryset):
+    """
+    Yield the events of ``queryset`` as dicts of the export columns.
+
+    Only the exported columns are selected, and the events are read with
+    a chunked iterator, so memory use doesn't grow with the size of the
+    export.
+    """
+    rows = queryset.annotate(category_names=_category_names()).values(
+        *EXPORT_FIELDS.values()
+    )
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield {column: row[field] for column, field in EXPORT_FIELDS.items()}
+
+
+class _Echo:
+    """File-like object returning what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    """Yield a CSV file of ``rows``, one line at a time."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(row.values())
+
+
+def iter_ndjson(rows):
+    """Yield a JSON Lines file of ``rows``, one line at a time."""
+    for row in rows:
+        row["categories"] = [
+            name for name in (row["categories"] or "").split(
+                CATEGORY_SEPARATOR
+            ) if name
+        ]
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+WRITERS = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+}
+
+
+def iter_export(queryset, file_format):
+    """Yield the export of ``queryset`` in ``file_format`` line by line."""
+    return WRITERS[file_format](export_rows(queryset))
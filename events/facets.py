@@ -0,0 +1,119 @@
+"""
+Facet counts of the events list filters.
+
+Includes:
+- get_facet_counts / aget_facet_counts: Number of upcoming events per
+  category and per difficulty, each respecting the other active filters
+  (the latter with the async ORM).
+
+Every facet is counted with one grouped aggregate query. The counts are
+cached under the "list" version, so they're invalidated along with the
+cached listings whenever events or categories change, and expire when
+the first counted event ends.
+"""
+
+from django.db.models import Count, Min
+from django.utils import timezone
+from .cache import LIST_CACHE_TIMEOUT, VERSIONED_CACHES, filter_cache_key
+from .models import Event
+
+# Filters with counts per option, and the field their events are
+# grouped by
+FACETS = {
+    "category": "category",
+    "difficulty": "difficulty",
+}
+
+
+def _facet_rows(form, field, facet):
+    """
+    Return the query counting the upcoming events per value of ``field``,
+    with the other active filters of ``form`` applied.
+    """
+    queryset = Event.objects.upcoming()
+    if form.is_valid():
+        # Options of a facet are combined with OR, so each option is
+        # counted as if it were selected alone
+        queryset = form.filter_queryset(queryset, exclude=(facet,))
+        if queryset.query.distinct:
+            # The category filter joins the categories and adds DISTINCT,
+            # which would wrap the grouped query; matching the filtered
+            # IDs instead keeps one row per event
+            queryset = Event.objects.filter(
+                pk__in=queryset.order_by().values("pk")
+            )
+    return (
+        queryset.order_by()
+        .values(field)
+        .annotate(count=Count("pk"), next_end=Min("ends_at"))
+    )
+
+
+def _facet_counts(rows, field):
+    """
+    Return the counts of one facet as ``{value: count}`` and how many
+    seconds they are valid.
+    """
+    counts = {}
+    timeout = LIST_CACHE_TIMEOUT
+    now = timezone.now()
+    for row in rows:
+        if row[field] is None:
+            continue
+        counts[row[field]] = row["count"]
+        seconds = int((row["next_end"] - now).total_seconds())
+        timeout = max(1, min(timeout, seconds))
+    return counts, timeout
+
+
+def _facet_lookups(form):
+    """
+    Yield the name, grouped field and cache key of each facet of
+    ``form``. Shared by the sync and async versions, so both cache the
+    counts under the same keys.
+    """
+    data = form.cleaned_data if form.is_valid() else {}
+    for facet, field in FACETS.items():
+        key = (
+            f"facets:{facet}:{timezone.localdate().isoformat()}:"
+            f"{filter_cache_key({**data, facet: None})}"
+        )
+        yield facet, field, key
+
+
+def get_facet_counts(form):
+    """
+    Return the number of upcoming events per option of each facet of the
+    EventFilterForm ``form``, e.g.
+    ``{"category": {1: 4, 2: 0}, "difficulty": {"BEGINNER": 3}}``.
+    """
+    cache = VERSIONED_CACHES["list"]
+    facets = {}
+    for facet, field, key in _facet_lookups(form):
+        counts = cache.get(key)
+        if counts is None:
+            rows = _facet_rows(form, field, facet)
+            counts, timeout = _facet_counts(rows, field)
+            cache.set(key, counts, timeout)
+        facets[facet] = counts
+    return facets
+
+
+async def aget_facet_counts(form):
+    """
+    Async version of ``get_facet_counts``, querying the database and the
+    cache with their async APIs. Validate ``form`` beforehand, as
+    validating it may query the database (e.g. for the categories).
+    """
+    cache = VERSIONED_CACHES["list"]
+    facets = {}
+    for facet, field, key in _facet_lookups(form):
+        counts = await cache.aget(key)
+        if counts is None:
+            rows = _facet_rows(form, field, facet)
+            counts, timeout = _facet_counts(
+                [row async for row in rows], field
+            )
+            await cache.aset(key, counts, timeout)
+        facets[facet] = counts
+    return facets
@@ -0,0 +1,157 @@
+"""
+iCalendar (.ics) feeds of events.
+
+Includes:
+- iter_calendar: Generates an iCalendar document event by event, for
+  streaming responses.
+- feed_events: The events included in a feed (upcoming and recently
+  ended).
+- feed_token / user_from_feed_token: Signed tokens for the private
+  per-user feed URLs.
+
+Feeds are written by hand following RFC 5545 (escaped text, lines folded
+at 75 octets, CRLF line endings), as they only need a small subset of it.
+"""
+
+from datetime import timedelta, timezone as dt_timezone
+from django.contrib.auth.models import User
+from django.core import signing
+from django.utils import timezone
+from .search import plain_text
+
+# Ended events stay in feeds for this many days, so calendar apps don't
+# drop them right after they happened
+FEED_PAST_DAYS = 30
+
+# Events fetched from the database at a time while streaming
+FEED_CHUNK_SIZE = 500
+
+# Suggested polling interval for calendar apps
+FEED_REFRESH_INTERVAL = "PT1H"
+
+
+def _escape(text):
+    """Escape a TEXT value."""
+    return (
+        (text or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    """
+    Return ``line`` with CRLF, folded into lines of at most 75 octets
+    (continuation lines start with a space).
+    """
+    parts = []
+    current = ""
+    size = 0
+    for char in line:
+        char_size = len(char.encode())
+        if size + char_size > 75:
+            parts.append(current)
+            current, size = " ", 1
+        current += char
+        size += char_size
+    parts.append(current)
+    return "\r\n".join(parts) + "\r\n"
+
+
+def _timestamp(value):
+    """Format a datetime as a UTC DATE-TIME value."""
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _vevent(event, url, domain):
+    """Return the VEVENT lines of ``event``."""
+    description = plain_text(event.description)
+    if event.organizer:
+        description += f"\n\nOrganized by {event.organizer}"
+    if event.link:
+        description += f"\n{event.link}"
+
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:event-{event.pk}@{domain}",
+        f"DTSTAMP:{_timestamp(event.updated_on)}",
+        f"LAST-MODIFIED:{_timestamp(event.updated_on)}",
+        f"DTSTART:{_timestamp(event.starts_at)}",
+        f"DTEND:{_timestamp(event.ends_at)}",
+        f"SUMMARY:{_escape(event.title)}",
+        f"LOCATION:{_escape(event.location)}",
+        f"DESCRIPTION:{_escape(description)}",
+        f"URL:{url}",
+        f"STATUS:{'CANCELLED' if event.cancelled else 'CONFIRMED'}",
+    ]
+    if event.latitude is not None and event.longitude is not None:
+        lines.append(f"GEO:{event.latitude:.6f};{event.longitude:.6f}")
+    categories = [category.name for category in event.category.all()]
+    if categories:
+        lines.append(
+            "CATEGORIES:" + ",".join(_escape(name) for name in categories)
+        )
+    lines.append("END:VEVENT")
+    return lines
+
+
+def iter_calendar(queryset, name, build_url, domain):
+    """
+    Yield an iCalendar document of the events in ``queryset``, one chunk
+    per event.
+
+    Events are read with a chunked iterator (categories prefetched per
+    chunk), so memory use doesn't grow with the number of events.
+    ``build_url(event)`` returns the absolute URL of an event.
+    """
+    yield "".join(_fold(line) for line in [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Runners Hive//Events//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+        f"REFRESH-INTERVAL;VALUE=DURATION:{FEED_REFRESH_INTERVAL}",
+        f"X-PUBLISHED-TTL:{FEED_REFRESH_INTERVAL}",
+    ])
+    for event in queryset.iterator(chunk_size=FEED_CHUNK_SIZE):
+        yield "".join(
+            _fold(line) for line in _vevent(event, build_url(event), domain)
+        )
+    yield _fold("END:VCALENDAR")
+
+
+def feed_events(queryset):
+    """
+    Return the events in ``queryset`` that belong in a feed: upcoming
+    events and events that ended in the last FEED_PAST_DAYS days.
+    """
+    since = timezone.now() - timedelta(days=FEED_PAST_DAYS)
+    return queryset.filter(ends_at__gte=since)
+
+
+def _signer(user):
+    # Changing the password invalidates the user's feed URLs
+    return signing.Signer(salt=f"events.feeds:{user.password}")
+
+
+def feed_token(user):
+    """Return the token of the private feed URL of ``user``."""
+    return _signer(user).sign(str(user.pk))
+
+
+def user_from_feed_token(token):
+    """
+    Return the user of a private feed token, or None if the token is
+    invalid.
+    """
+    pk = token.partition(":")[0]
+    try:
+        user = User.objects.get(pk=int(pk), is_active=True)
+        _signer(user).unsign(token)
+    except (ValueError, User.DoesNotExist, signing.BadSignature):
+        return None
+    return user
@@ -2,25 +2,41 @@
 Forms for the events app.
 
 Includes:
-- EventFilterForm: Used to filter Event instances by category, difficulty,
-  date, and cancellation status.
+- EventFilterForm: Used to search Event instances and filter them by
+  category, difficulty, date, distance, and cancellation status.
 - EventForm: Model form for creating or editing Event instances, including
   rich text description and optional media.
+- EventImportForm: EventForm rules for rows of bulk imports.
+- EventBulkActionForm: Cancels, reactivates or deletes several events
+  selected on the profile page.
 """
 
+from datetime import timedelta
 from django import forms
+from django.urls import reverse_lazy
 from django.utils import timezone
 from django_summernote.widgets import SummernoteWidget
-from datetime import datetime
-from .models import Category, Event
+from .geo import within_radius
+from .geocoding import geocode
+from .models import Category, Event, make_event_datetime
+from .search import search_events
 
 
 class EventFilterForm(forms.Form):
     """
-    Form used to filter events on the frontend by category,
-    difficulty, date range, and cancellation status.
+    Form used to search events on the frontend and filter them by
+    category, difficulty, date range, distance, and cancellation status.
     """
 
+    # Full-text search over title, organizer, location and description
+    q = forms.CharField(
+        required=False,
+        max_length=100,
+        label="Search",
+        widget=forms.TextInput(attrs={
+            "type": "search", "placeholder": "Search events"})
+    )
+
     # Allow users to filter by one or more categories
     category = forms.ModelMultipleChoiceField(
         queryset=Category.objects.all(),
@@ -48,6 +64,36 @@ class EventFilterForm(forms.Form):
         initial='all'  # Preselect "All" by default
     )
 
+    # Distance filter around a place name or the user's own location
+    # (lat/lng, filled in by near_me.js)
+    near = forms.CharField(
+        required=False,
+        max_length=100,
+        label="Near",
+        widget=forms.TextInput(attrs={
+            "placeholder": "Place, e.g. Tempelhofer Feld"})
+    )
+    radius = forms.TypedChoiceField(
+        choices=[
+            ('', 'Any distance'),
+            (5, 'Within 5 km'),
+            (10, 'Within 10 km'),
+            (25, 'Within 25 km'),
+            (50, 'Within 50 km'),
+        ],
+        coerce=int,
+        empty_value=None,
+        required=False,
+    )
+    lat = forms.FloatField(
+        required=False, min_value=-90, max_value=90,
+        widget=forms.HiddenInput
+    )
+    lng = forms.FloatField(
+        required=False, min_value=-180, max_value=180,
+        widget=forms.HiddenInput
+    )
+
     # Simple toggle to hide cancelled events
     cancelled = forms.BooleanField(
         required=False,
@@ -55,6 +101,106 @@ class EventFilterForm(forms.Form):
         widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
     )
 
+    def clean(self):
+        """
+        Resolve the centre of the distance filter into ``center``: the
+        user's own location if given, otherwise the geocoded place name.
+        """
+        cleaned_data = super().clean()
+        lat = cleaned_data.get("lat")
+        lng = cleaned_data.get("lng")
+        near = cleaned_data.get("near")
+
+        center = None
+        if lat is not None and lng is not None:
+            center = (lat, lng)
+        elif near:
+            center = geocode(near)
+            if center is None:
+                self.add_error("near", "Sorry, we don't know this place.")
+
+        if cleaned_data.get("radius") and center is None and not near:
+            self.add_error(
+                "near",
+                "Enter a place or use your location to filter by distance."
+            )
+
+        cleaned_data["center"] = center
+        return cleaned_data
+
+    def set_facet_counts(self, facets):
+        """
+        Show the number of matching events next to each category and
+        difficulty option (counts from ``events.facets``).
+        """
+        categories = facets.get("category", {})
+        self.fields["category"].label_from_instance = (
+            lambda category: f"{category} ({categories.get(category.pk, 0)})"
+        )
+        difficulties = facets.get("difficulty", {})
+        self.fields["difficulty"].choices = [
+            (value, f"{label} ({difficulties.get(value, 0)})")
+            for value, label in Event.Difficulty.choices
+        ]
+
+    def filter_queryset(self, queryset, exclude=()):
+        """
+        Return the events in ``queryset`` matching the selected filters.
+
+        Shared by the events list and the JSON API, so both filter the
+        same way. With a search query, the events are ordered by
+        relevance, then by date. Filters named in ``exclude`` are not
+        applied (see ``events.facets``). Only call this on a valid form.
+        """
+        today = timezone.localdate()
+        data = {
+            name: value for name, value in self.cleaned_data.items()
+            if name not in exclude
+        }
+
+        # Category
+        categories = data.get("category")
+        if categories:
+            queryset = queryset.filter(category__in=categories).distinct()
+
+        # Difficulty
+        difficulties = data.get("difficulty")
+        if difficulties:
+            queryset = queryset.filter(difficulty__in=difficulties)
+
+        # Date
+        date_filter = data.get('date_filter')
+        if date_filter == 'today':
+            queryset = queryset.filter(date=today)
+        elif date_filter == 'tomorrow':
+            queryset = queryset.filter(date=today + timedelta(days=1))
+        elif date_filter == 'this_week':
+            # Assuming week starts on Monday
+            start_of_week = today - timedelta(days=today.weekday())
+            end_of_week = start_of_week + timedelta(days=6)
+            queryset = queryset.filter(
+                date__range=[start_of_week, end_of_week]
+                )
+        # 'all' -> no date filter
+
+        # Distance
+        radius = data.get("radius")
+        center = data.get("center")
+        if radius and center:
+            queryset = within_radius(queryset, *center, radius)
+
+        # Cancelled filter
+        exclude_cancelled = data.get("cancelled")
+        if exclude_cancelled:
+            queryset = queryset.filter(cancelled=False)
+
+        # Search
+        query = data.get("q", "").strip()
+        if query:
+            queryset = search_events(queryset, query)
+
+        return queryset
+
 
 class EventForm(forms.ModelForm):
     """
@@ -84,6 +230,16 @@ class EventForm(forms.ModelForm):
             "end_time": forms.TimeInput(attrs={
                 "type": "time", "class": "form-control"}),
 
+            # Suggest existing spellings while typing (autocomplete.js)
+            "organizer": forms.TextInput(attrs={
+                "autocomplete": "off",
+                "data-autocomplete-url": reverse_lazy(
+                    "event_autocomplete", args=["organizer"])}),
+            "location": forms.TextInput(attrs={
+                "autocomplete": "off",
+                "data-autocomplete-url": reverse_lazy(
+                    "event_autocomplete", args=["location"])}),
+
             # Display category selection as checkboxes
             "category": forms.CheckboxSelectMultiple(),
 
@@ -107,14 +263,10 @@ class EventForm(forms.ModelForm):
 
         # Ensure the event does not start in the past
         if date and start_time:
-            # Merge date and time into a single datetime
-            event_dt = datetime.combine(date, start_time)
+            # Same timezone-aware timestamp that Event.save() stores
+            event_dt = make_event_datetime(date, start_time)
 
-            # Make timezone-aware so comparison is accurate
-            event_dt = timezone.make_aware(
-                event_dt, timezone.get_current_timezone())
-
-            if event_dt < timezone.localtime():
+            if event_dt < timezone.now():
                 raise forms.ValidationError(
                     "An event cannot start in the past. "
                     "Please check your chosen date and start time."
@@ -129,3 +281,53 @@ class EventForm(forms.ModelForm):
                 )
 
         return cleaned_data
+
+
+class EventImportForm(EventForm):
+    """
+    Validates one row of a bulk import with the rules of EventForm.
+
+    Categories and images are not part of the form, and uniqueness of
+    titles and slugs is not checked per row: the importer resolves
+    categories and checks uniqueness for a whole batch at once, so
+    validating a row runs no queries.
+    """
+
+    class Meta(EventForm.Meta):
+        fields = [
+            field for field in EventForm.Meta.fields
+            if field not in ("category", "featured_image")
+        ]
+
+    def validate_unique(self):
+        """Skip the per-row uniqueness queries (checked per batch)."""
+
+
+class EventIdsField(forms.TypedMultipleChoiceField):
+    """
+    IDs of selected events. Any number is accepted, as the actions only
+    affect events of the logged-in user anyway.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(coerce=int, **kwargs)
+
+    def valid_value(self, value):
+        """Accept any event ID."""
+        return str(value).isdigit()
+
+
+class EventBulkActionForm(forms.Form):
+    """
+    Form used to apply one action to the events selected on the profile
+    page.
+    """
+
+    action = forms.ChoiceField(choices=[
+        ("cancel", "Cancel"),
+        ("reactivate", "Reactivate"),
+        ("delete", "Delete"),
+    ])
+    events = EventIdsField(
+        error_messages={"required": "Please select at least one event."}
+    )
@@ -0,0 +1,74 @@
+"""
+Distance filtering of events.
+
+Includes:
+- haversine_km: Great-circle distance between two points.
+- bounding_box: Latitude/longitude ranges enclosing a circle.
+- within_radius: Filters an Event queryset to events within a distance of
+  a point.
+"""
+
+import math
+from django.db.models import F, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+# Mean radius of the earth
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Return the great-circle distance between two points in km."""
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = (
+        math.sin(dlat / 2) ** 2
+        + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2))
+        * math.sin(dlng / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bounding_box(lat, lng, radius_km):
+    """
+    Return ``(min_lat, max_lat, min_lng, max_lng)`` enclosing the circle
+    of ``radius_km`` around the point.
+
+    The longitude range is None if the circle reaches a pole or crosses
+    the antimeridian, where a simple range can't enclose it.
+    """
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - lat_delta, lat + lat_delta
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), None, None
+
+    lng_delta = math.degrees(
+        radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(lat)))
+    )
+    min_lng, max_lng = lng - lng_delta, lng + lng_delta
+    if min_lng < -180 or max_lng > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lng, max_lng
+
+
+def within_radius(queryset, lat, lng, radius_km):
+    """
+    Return the events in ``queryset`` at most ``radius_km`` away from the
+    point, annotated with ``distance_km``.
+
+    A bounding box prefilter on the (latitude, longitude) index narrows
+    the events down cheaply, so the exact haversine distance is only
+    computed for the few events near the point.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    queryset = queryset.filter(latitude__range=(min_lat, max_lat))
+    if min_lng is not None:
+        queryset = queryset.filter(longitude__range=(min_lng, max_lng))
+
+    a = (
+        Power(Sin(Radians(F("latitude") - lat) / 2), 2)
+        + Value(math.cos(math.radians(lat))) * Cos(Radians(F("latitude")))
+        * Power(Sin(Radians(F("longitude") - lng) / 2), 2)
+    )
+    return queryset.annotate(
+        distance_km=Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a))
+    ).filter(distance_km__lte=radius_km)
@@ -0,0 +1,104 @@
+"""
+Geocoding of event locations.
+
+Includes:
+- Geocoder: Base class of the geocoder backends.
+- GazetteerGeocoder: Offline backend looking places up in a local CSV
+  gazetteer (default).
+- NullGeocoder: Backend that never finds a place, to disable geocoding.
+- geocode: Returns the coordinates of a place with the configured backend.
+
+The backend is chosen by the ``EVENT_GEOCODER`` setting (dotted path of a
+Geocoder subclass); the gazetteer file by ``EVENT_GAZETTEER``. The CSV
+needs the columns ``name``, ``latitude`` and ``longitude``.
+"""
+
+import csv
+import re
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+def _words(value):
+    """Return the lowercased words of ``value``, without punctuation."""
+    return re.findall(r"\w+", value.casefold())
+
+
+class Geocoder:
+    """Base class of geocoder backends."""
+
+    def geocode(self, query):
+        """
+        Return the ``(latitude, longitude)`` of the place ``query``, or
+        None if the place is unknown.
+        """
+        raise NotImplementedError
+
+
+class NullGeocoder(Geocoder):
+    """Geocoder that never finds a place."""
+
+    def geocode(self, query):
+        return None
+
+
+class GazetteerGeocoder(Geocoder):
+    """
+    Geocoder looking places up in a local CSV gazetteer.
+
+    A location matches the gazetteer entry with the longest name found as
+    a whole word sequence in it, so "Tiergarten, Berlin" is found as
+    "Tiergarten" rather than "Berlin". Names match regardless of case and
+    punctuation.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.EVENT_GAZETTEER
+        self._places = None
+
+    @property
+    def places(self):
+        """Return the gazetteer as a dict of name -> coordinates."""
+        if self._places is None:
+            with open(self.path, newline="", encoding="utf-8") as csv_file:
+                self._places = {
+                    " ".join(_words(row["name"])): (
+                        float(row["latitude"]), float(row["longitude"])
+                    )
+                    for row in csv.DictReader(csv_file)
+                }
+        return self._places
+
+    def geocode(self, query):
+        words = _words(query)
+        # Try the longest word sequences first
+        for size in range(len(words), 0, -1):
+            for start in range(len(words) - size + 1):
+                coordinates = self.places.get(
+                    " ".join(words[start:start + size])
+                )
+                if coordinates:
+                    return coordinates
+        return None
+
+
+# Geocoder instances per backend path
+_geocoders = {}
+
+
+def get_geocoder():
+    """Return the geocoder configured in the settings."""
+    path = settings.EVENT_GEOCODER
+    if path not in _geocoders:
+        _geocoders[path] = import_string(path)()
+    return _geocoders[path]
+
+
+def geocode(query):
+    """
+    Return the ``(latitude, longitude)`` of the place ``query``, or None
+    if it is empty or unknown.
+    """
+    if not query or not query.strip():
+        return None
+    return get_geocoder().geocode(query)
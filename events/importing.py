@@ -0,0 +1,426 @@
+"""
+Bulk import of events (used by the ``import_events`` command).
+
+Includes:
+- read_csv / read_json / read_ics: Stream the rows of an input file as
+  ``(line number, row)`` pairs, where a row is a dict of event fields or
+  a RowError for rows that can't be read.
+- guess_format: The input format of a file name or URL.
+- EventImporter: Validates rows with EventImportForm and inserts valid
+  events in batches with ``bulk_create``, including their categories.
+
+Row fields: ``title``, ``organizer``, ``description``, ``date``
+(YYYY-MM-DD), ``start_time`` / ``end_time`` (HH:MM), ``difficulty``
+(value or label), ``location``, ``link``, ``categories`` (names,
+separated by ``;`` in CSV files), ``cancelled`` and ``uid`` (the ID of
+the event in a partner feed, used by ``events.sync``).
+"""
+
+import csv
+import json
+import os
+from datetime import datetime
+from urllib.parse import urlsplit
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from .cache import bump_version
+from .forms import EventImportForm
+from .models import Category, Event, make_event_slug
+from .search import index_events
+
+TRUE_VALUES = ("1", "true", "yes", "y", "x", "cancelled")
+
+
+class RowError(ValueError):
+    """A row of the input that can't be read or imported."""
+
+
+# ------------------------------
+# Readers
+# ------------------------------
+def read_csv(stream):
+    """Yield the rows of a CSV file with a header row."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, {
+            key.strip(): value for key, value in row.items() if key
+        }
+
+
+def read_json(stream):
+    """
+    Yield the rows of a JSON Lines file (one object per line), or of a
+    JSON array of objects. Arrays are read into memory at once, so JSON
+    Lines should be preferred for large imports.
+    """
+    first_line = stream.readline()
+    if first_line.lstrip().startswith("["):
+        try:
+            rows = json.loads(first_line + stream.read())
+        except json.JSONDecodeError as error:
+            yield 1, RowError(f"Invalid JSON: {error}")
+            return
+        for number, row in enumerate(rows, start=1):
+            yield number, row if isinstance(row, dict) else RowError(
+                "Expected a JSON object."
+            )
+        return
+
+    lines = _chain_first(first_line, stream)
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield number, RowError(f"Invalid JSON: {error}")
+            continue
+        yield number, row if isinstance(row, dict) else RowError(
+            "Expected a JSON object."
+        )
+
+
+def _chain_first(first_line, stream):
+    yield first_line
+    yield from stream
+
+
+def _ics_lines(stream):
+    """
+    Yield ``(line number, line)`` of an iCalendar file with folded lines
+    joined.
+    """
+    current, start = None, 0
+    for number, line in enumerate(stream, start=1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield start, current
+        current, start = line, number
+    if current is not None:
+        yield start, current
+
+
+def _ics_property(line):
+    """
+    Split a content line into ``(name, params, value)``. Colons inside
+    quoted parameter values don't end the parameters.
+    """
+    quoted = False
+    for index, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            head, value = line[:index], line[index + 1:]
+            break
+    else:
+        return line.upper(), {}, ""
+
+    name, *params = head.split(";")
+    return name.upper(), dict(
+        (param.partition("=")[0].upper(), param.partition("=")[2].strip('"'))
+        for param in params
+    ), value
+
+
+def _ics_unescape(value):
+    result, escaped = [], False
+    for char in value:
+        if escaped:
+            result.append("\n" if char in "nN" else char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        else:
+            result.append(char)
+    return "".join(result)
+
+
+def _ics_split(value):
+    """Split an escaped, comma-separated list value."""
+    parts, current, escaped = [], [], False
+    for char in value:
+        if escaped:
+            current.append("\\" + char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == ",":
+            parts.append(_ics_unescape("".join(current)))
+            current = []
+        else:
+            current.append(char)
+    parts.append(_ics_unescape("".join(current)))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _ics_datetime(value, params):
+    """Return a DATE-TIME value in the current timezone."""
+    if params.get("VALUE") == "DATE" or "T" not in value:
+        raise RowError("All-day events are not supported.")
+    try:
+        if value.endswith("Z"):
+            moment = datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(
+                tzinfo=ZoneInfo("UTC")
+            )
+        else:
+            moment = datetime.strptime(value, "%Y%m%dT%H%M%S")
+            if "TZID" in params:
+                moment = moment.replace(tzinfo=ZoneInfo(params["TZID"]))
+            else:
+                # Floating time: local time of the event
+                moment = timezone.make_aware(moment)
+    except (ValueError, ZoneInfoNotFoundError):
+        raise RowError(f"Invalid date/time: {value}")
+    return timezone.localtime(moment)
+
+
+def _ics_event(properties):
+    """Return the row of a VEVENT from its ``(name, params, value)``."""
+    row = {"categories": []}
+    starts = ends = None
+    for name, params, value in properties:
+        if name == "UID":
+            row["uid"] = value
+        elif name == "SUMMARY":
+            row["title"] = _ics_unescape(value)
+        elif name == "DESCRIPTION":
+            row["description"] = _ics_unescape(value)
+        elif name == "LOCATION":
+            row["location"] = _ics_unescape(value)
+        elif name == "URL":
+            row["link"] = value
+        elif name == "ORGANIZER":
+            row["organizer"] = params.get("CN") or value.removeprefix(
+                "mailto:"
+            )
+        elif name == "CATEGORIES":
+            row["categories"] += _ics_split(value)
+        elif name == "STATUS":
+            row["cancelled"] = value.upper() == "CANCELLED"
+        elif name == "DTSTART":
+            starts = _ics_datetime(value, params)
+        elif name == "DTEND":
+            ends = _ics_datetime(value, params)
+
+    if starts is None or ends is None:
+        raise RowError("DTSTART and DTEND are required.")
+    if starts.date() != ends.date():
+        raise RowError("Events spanning several days are not supported.")
+    row.update(
+        date=starts.date().isoformat(),
+        start_time=starts.strftime("%H:%M"),
+        end_time=ends.strftime("%H:%M"),
+    )
+    return row
+
+
+def read_ics(stream):
+    """Yield the VEVENTs of an iCalendar file as rows."""
+    properties, start = None, 0
+    for number, line in _ics_lines(stream):
+        name, params, value = _ics_property(line)
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            properties, start = [], number
+        elif name == "END" and value.upper() == "VEVENT":
+            try:
+                yield start, _ics_event(properties or [])
+            except RowError as error:
+                yield start, error
+            properties = None
+        elif properties is not None:
+            properties.append((name, params, value))
+
+
+READERS = {
+    "csv": read_csv,
+    "json": read_json,
+    "ics": read_ics,
+}
+
+# Other file extensions of the formats
+FORMAT_ALIASES = {
+    "jsonl": "json",
+    "ndjson": "json",
+    "ical": "ics",
+}
+
+
+def guess_format(path):
+    """
+    Return the format of a file name or URL by its extension, or None if
+    it isn't known.
+    """
+    extension = os.path.splitext(urlsplit(path).path)[1].lstrip(".").lower()
+    extension = FORMAT_ALIASES.get(extension, extension)
+    return extension if extension in READERS else None
+
+
+# ------------------------------
+# Importer
+# ------------------------------
+class EventImporter:
+    """
+    Validates rows and inserts the valid events in batches.
+
+    Every batch is inserted in its own transaction with one
+    ``bulk_create`` for the events and one for their category rows, so
+    an import runs a few queries per batch instead of several per event.
+    Rows that fail are collected in ``errors`` as ``(line, message)``
+    and don't stop the import.
+    """
+
+    def __init__(self, author, batch_size=500, default_difficulty=None,
+                 dry_run=False):
+        self.author = author
+        self.batch_size = batch_size
+        self.default_difficulty = default_difficulty
+        self.dry_run = dry_run
+        self.created = 0
+        self.errors = []
+
+        self._categories = {
+            category.name.casefold(): category
+            for category in Category.objects.all()
+        }
+        self._difficulties = {}
+        for value, label in Event.Difficulty.choices:
+            self._difficulties[value.casefold()] = value
+            self._difficulties[label.casefold()] = value
+        # Titles and slugs of this import, to find duplicates in the input
+        self._titles = set()
+        self._slugs = set()
+
+    def run(self, rows):
+        """Import all ``(line, row)`` pairs and return the importer."""
+        batch = []
+        for line, row in rows:
+            try:
+                batch.append((line, *self.build(row)))
+            except RowError as error:
+                self.errors.append((line, str(error)))
+                continue
+            if len(batch) >= self.batch_size:
+                self.insert(batch)
+                batch = []
+        if batch:
+            self.insert(batch)
+
+        # Bulk inserts don't send the signals invalidating cached listings
+        if self.created and not self.dry_run:
+            bump_version("list")
+            bump_version("today")
+        return self
+
+    def _categories_of(self, value):
+        """Return the categories named in ``value``."""
+        if isinstance(value, str):
+            value = value.split(";")
+        categories = []
+        for name in value or []:
+            name = str(name).strip()
+            if not name:
+                continue
+            try:
+                categories.append(self._categories[name.casefold()])
+            except KeyError:
+                raise RowError(f"Unknown category: {name}")
+        return categories
+
+    def build(self, row):
+        """
+        Return the unsaved event and its categories for ``row``.
+
+        Raises RowError if the row is invalid.
+        """
+        if isinstance(row, RowError):
+            raise row
+
+        data = {
+            key: "" if value is None else str(value).strip()
+            for key, value in row.items()
+            if key in EventImportForm.Meta.fields
+        }
+        difficulty = data.get("difficulty") or self.default_difficulty or ""
+        data["difficulty"] = self._difficulties.get(
+            difficulty.casefold(), difficulty
+        )
+
+        form = EventImportForm(data=data)
+        if not form.is_valid():
+            raise RowError("; ".join(
+                f"{field}: {' '.join(messages)}" if field != "__all__"
+                else " ".join(messages)
+                for field, messages in form.errors.items()
+            ))
+
+        event = form.instance
+        event.author = self.author
+        event.cancelled = (
+            str(row.get("cancelled", "")).strip().casefold() in TRUE_VALUES
+        )
+        event.slug = make_event_slug(event.title, event.date)
+        event.set_timestamps()
+        event.set_coordinates()
+        return event, self._categories_of(row.get("categories"))
+
+    def insert(self, batch):
+        """
+        Insert a batch of ``(line, event, categories)``, skipping events
+        whose title or slug is already taken.
+        """
+        existing = Event.objects.filter(
+            title__in=[event.title for line, event, categories in batch]
+        ).values_list("title", flat=True)
+        taken_titles = self._titles | set(existing)
+        existing = Event.objects.filter(
+            slug__in=[event.slug for line, event, categories in batch]
+        ).values_list("slug", flat=True)
+        taken_slugs = self._slugs | set(existing)
+
+        valid = []
+        for line, event, categories in batch:
+            if event.title in taken_titles:
+                self.errors.append(
+                    (line, f"An event titled {event.title!r} exists.")
+                )
+            elif event.slug in taken_slugs:
+                self.errors.append(
+                    (line, f"An event with slug {event.slug!r} exists.")
+                )
+            else:
+                taken_titles.add(event.title)
+                taken_slugs.add(event.slug)
+                valid.append((line, event, categories))
+
+        if self.dry_run:
+            self._remember(valid)
+            return
+
+        events = [event for line, event, categories in valid]
+        try:
+            with transaction.atomic():
+                Event.objects.bulk_create(events)
+                Event.category.through.objects.bulk_create([
+                    Event.category.through(
+                        event_id=event.pk, category_id=category.pk
+                    )
+                    for line, event, categories in valid
+                    for category in categories
+                ])
+                index_events(events)
+        except DatabaseError as error:
+            self.errors.extend(
+                (line, f"Batch failed: {error}") for line, *rest in valid
+            )
+            return
+        self._remember(valid)
+
+    def _remember(self, valid):
+        self.created += len(valid)
+        for line, event, categories in valid:
+            self._titles.add(event.title)
+            self._slugs.add(event.slug)
@@ -0,0 +1,74 @@
+"""
+Management command exporting events as CSV or NDJSON.
+
+Usage:
+    python manage.py export_events -o events.csv
+    python manage.py export_events --format ndjson --upcoming \
+        --filter difficulty=BEGINNER --filter q=trail > events.ndjson
+
+Filters are those of the events list (EventFilterForm). Events are
+streamed to the output (see ``events.exporting``).
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+from events.exporting import WRITERS, iter_export
+from events.forms import EventFilterForm
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = "Export events as CSV or NDJSON (JSON Lines)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-o", "--output",
+            help="File to write (default: standard output).",
+        )
+        parser.add_argument(
+            "--format", choices=sorted(WRITERS),
+            help="Output format (default: the output file extension, "
+                 "or csv).",
+        )
+        parser.add_argument(
+            "--filter", action="append", default=[], metavar="NAME=VALUE",
+            help="Filter of the events list, e.g. difficulty=BEGINNER "
+                 "(repeatable).",
+        )
+        parser.add_argument(
+            "--upcoming", action="store_true",
+            help="Export upcoming events only.",
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        file_format = options["format"]
+        if not file_format and output:
+            file_format = output.rpartition(".")[2].lower()
+            if file_format == "jsonl":
+                file_format = "ndjson"
+        if file_format not in WRITERS:
+            file_format = "csv"
+
+        filters = QueryDict(mutable=True)
+        for item in options["filter"]:
+            name, sep, value = item.partition("=")
+            if not sep:
+                raise CommandError(f"Invalid filter: {item}")
+            filters.appendlist(name, value)
+        form = EventFilterForm(filters)
+        if not form.is_valid():
+            raise CommandError(f"Invalid filters: {form.errors.as_text()}")
+
+        if options["upcoming"]:
+            queryset = Event.objects.upcoming()
+        else:
+            queryset = Event.objects.all()
+        lines = iter_export(form.filter_queryset(queryset), file_format)
+
+        if output:
+            with open(output, "w", encoding="utf-8", newline="") as stream:
+                stream.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,86 @@
+"""
+Management command importing events from CSV, JSON or iCalendar files.
+
+Usage:
+    python manage.py import_events season.csv --author club
+    python manage.py import_events - --format json --author club < rows.json
+
+Rows are validated with the rules of EventForm. Invalid rows are reported
+and skipped; the valid ones are inserted in batches (see
+``events.importing``).
+"""
+
+import sys
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from events.importing import READERS, EventImporter, guess_format
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = "Import events from a CSV, JSON (Lines) or iCalendar file."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", help="File to import, or - to read standard input."
+        )
+        parser.add_argument(
+            "--author", required=True,
+            help="Username of the user the events are created for.",
+        )
+        parser.add_argument(
+            "--format", choices=sorted(READERS),
+            help="Input format (default: the file extension).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=500,
+            help="Number of events inserted per query (default: 500).",
+        )
+        parser.add_argument(
+            "--difficulty", choices=Event.Difficulty.values,
+            help="Difficulty of rows that don't specify one.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Validate the rows without creating any events.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options["author"])
+        except User.DoesNotExist:
+            raise CommandError(f"Unknown user: {options['author']}")
+
+        path = options["path"]
+        file_format = options["format"] or guess_format(path)
+        if not file_format:
+            raise CommandError(
+                "Unknown format, please specify one with --format."
+            )
+        if options["batch_size"] < 1:
+            raise CommandError("The batch size must be positive.")
+
+        importer = EventImporter(
+            author,
+            batch_size=options["batch_size"],
+            default_difficulty=options["difficulty"],
+            dry_run=options["dry_run"],
+        )
+        if path == "-":
+            importer.run(READERS[file_format](sys.stdin))
+        else:
+            try:
+                # utf-8-sig skips the byte order mark spreadsheets add
+                with open(path, encoding="utf-8-sig", newline="") as stream:
+                    importer.run(READERS[file_format](stream))
+            except OSError as error:
+                raise CommandError(f"Cannot read {path}: {error}")
+
+        for line, message in importer.errors:
+            self.stderr.write(f"Line {line}: {message}")
+
+        verb = "Would import" if options["dry_run"] else "Imported"
+        summary = f"{verb} {importer.created} event(s)"
+        if importer.errors:
+            summary += f", skipped {len(importer.errors)} invalid row(s)"
+        self.stdout.write(self.style.SUCCESS(summary + "."))
@@ -0,0 +1,67 @@
+"""
+Management command syncing the events of a partner feed.
+
+Usage:
+    python manage.py sync_events north-club https://example.com/cal.ics \
+        --author north-club
+
+Only new, changed and removed feed entries are written (see
+``events.sync``). Meant to be run regularly, e.g. nightly.
+"""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from events.importing import READERS, guess_format
+from events.sync import FeedSync, FileFeed, UrlFeed
+
+
+class Command(BaseCommand):
+    help = "Sync the events of a partner feed (file or URL)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "name", help="Name of the feed, identifying its events."
+        )
+        parser.add_argument("location", help="Path or URL of the feed.")
+        parser.add_argument(
+            "--author", required=True,
+            help="Username of the user new events are created for.",
+        )
+        parser.add_argument(
+            "--format", choices=sorted(READERS),
+            help="Feed format (default: the file extension).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=500,
+            help="Number of events written per query (default: 500).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options["author"])
+        except User.DoesNotExist:
+            raise CommandError(f"Unknown user: {options['author']}")
+
+        location = options["location"]
+        file_format = options["format"] or guess_format(location)
+        if not file_format:
+            raise CommandError(
+                "Unknown format, please specify one with --format."
+            )
+        if options["batch_size"] < 1:
+            raise CommandError("The batch size must be positive.")
+
+        if location.startswith(("http://", "https://")):
+            feed = UrlFeed(options["name"], location, file_format)
+        else:
+            feed = FileFeed(options["name"], location, file_format)
+
+        sync = FeedSync(feed, author, batch_size=options["batch_size"])
+        try:
+            sync.run()
+        except OSError as error:
+            raise CommandError(f"Cannot read {location}: {error}")
+
+        for line, message in sync.errors:
+            self.stderr.write(f"Line {line}: {message}")
+        self.stdout.write(self.style.SUCCESS(sync.summary()))
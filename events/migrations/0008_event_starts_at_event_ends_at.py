@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-17 23:20
+
+from datetime import datetime
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_timestamps(apps, schema_editor):
+    """
+    Populate starts_at and ends_at for existing events from their date,
+    start_time and end_time.
+    """
+    Event = apps.get_model('events', 'Event')
+    tz = timezone.get_current_timezone()
+    events = list(Event.objects.only('date', 'start_time', 'end_time'))
+    for event in events:
+        event.starts_at = timezone.make_aware(
+            datetime.combine(event.date, event.start_time), tz)
+        event.ends_at = timezone.make_aware(
+            datetime.combine(event.date, event.end_time), tz)
+    Event.objects.bulk_update(events, ['starts_at', 'ends_at'],
+                              batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_alter_category_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='starts_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='ends_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_timestamps, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='event',
+            name='starts_at',
+            field=models.DateTimeField(db_index=True, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='ends_at',
+            field=models.DateTimeField(db_index=True, editable=False),
+        ),
+        migrations.AlterModelOptions(
+            name='event',
+            options={'ordering': ['starts_at']},
+        ),
+    ]
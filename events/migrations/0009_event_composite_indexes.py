@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-17 23:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_event_starts_at_event_ends_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date', 'starts_at'], name='event_date_starts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['author', 'starts_at'], name='event_author_starts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['cancelled', 'starts_at'], name='event_cancelled_starts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('cancelled', False)), fields=['starts_at'], name='event_active_starts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['difficulty', 'starts_at'], name='event_difficulty_starts_idx'),
+        ),
+    ]
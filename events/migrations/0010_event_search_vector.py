@@ -0,0 +1,92 @@
+# Generated by Django 5.2.6 on 2026-10-18 00:05
+
+import html
+
+import django.contrib.postgres.search
+from django.db import migrations
+from django.utils.html import strip_tags
+
+SEARCH_INDEX = 'event_search_vector_idx'
+FTS_TABLE = 'events_event_fts'
+# Indexed columns, most important first
+FTS_COLUMNS = ('title', 'organizer', 'location', 'description')
+
+# Weighted search vectors of all events, with the HTML tags of the
+# description removed
+UPDATE_SEARCH_VECTORS = """
+UPDATE events_event SET search_vector =
+    setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A')
+    || setweight(
+        to_tsvector('english'::regconfig, coalesce(organizer, '')), 'B'
+    )
+    || setweight(
+        to_tsvector('english'::regconfig, coalesce(location, '')), 'B'
+    )
+    || setweight(to_tsvector('english'::regconfig, regexp_replace(
+        coalesce(description, ''), '<[^>]*>', ' ', 'g'
+    )), 'C')
+"""
+
+
+def _plain_text(value):
+    """Return the text of an HTML fragment without tags and entities."""
+    return ' '.join(html.unescape(strip_tags(value or '')).split())
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Create the full-text search index for the database in use and index
+    the existing events: a GIN index on search_vector on PostgreSQL, an
+    FTS5 table on SQLite.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX {SEARCH_INDEX} ON events_event '
+            f'USING gin (search_vector)'
+        )
+        schema_editor.execute(UPDATE_SEARCH_VECTORS)
+    elif vendor == 'sqlite':
+        columns = ', '.join(FTS_COLUMNS)
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({columns}, '
+            f"tokenize='porter unicode61')"
+        )
+        Event = apps.get_model('events', 'Event')
+        rows = [
+            (pk, title or '', organizer or '', location or '',
+             _plain_text(description))
+            for pk, title, organizer, location, description
+            in Event.objects.using(schema_editor.connection.alias)
+            .values_list('pk', *FTS_COLUMNS)
+        ]
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, {columns}) '
+                f'VALUES (%s, %s, %s, %s, %s)',
+                rows,
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {SEARCH_INDEX}')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_event_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-18 00:40
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+TRIGRAM_INDEXES = {
+    'event_location_trgm_idx': 'location',
+    'event_organizer_trgm_idx': 'organizer',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Create trigram GIN indexes for the autocomplete lookups on PostgreSQL.
+    Other databases only use the in-memory prefix index.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX {name} ON events_event '
+            f'USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_event_search_vector'),
+    ]
+
+    operations = [
+        # Only runs on PostgreSQL
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
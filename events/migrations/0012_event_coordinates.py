@@ -0,0 +1,86 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:10
+
+import csv
+import os
+import re
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _words(value):
+    """Return the lowercased words of ``value``, without punctuation."""
+    return re.findall(r'\w+', value.casefold())
+
+
+def _load_gazetteer():
+    """
+    Return the places of the gazetteer CSV (EVENT_GAZETTEER) as a dict of
+    name -> coordinates, or an empty dict if there is none.
+    """
+    path = getattr(settings, 'EVENT_GAZETTEER', None)
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, newline='', encoding='utf-8') as csv_file:
+        return {
+            ' '.join(_words(row['name'])): (
+                float(row['latitude']), float(row['longitude'])
+            )
+            for row in csv.DictReader(csv_file)
+        }
+
+
+def _geocode(places, location):
+    """
+    Return the coordinates of the longest place name found as a whole
+    word sequence in ``location``, or None.
+    """
+    words = _words(location or '')
+    for size in range(len(words), 0, -1):
+        for start in range(len(words) - size + 1):
+            coordinates = places.get(' '.join(words[start:start + size]))
+            if coordinates:
+                return coordinates
+    return None
+
+
+def geocode_locations(apps, schema_editor):
+    """Geocode the locations of existing events with the gazetteer."""
+    places = _load_gazetteer()
+    if not places:
+        return
+    Event = apps.get_model('events', 'Event')
+    events = list(
+        Event.objects.using(schema_editor.connection.alias).only('location')
+    )
+    for event in events:
+        event.latitude, event.longitude = (
+            _geocode(places, event.location) or (None, None))
+    Event.objects.bulk_update(events, ['latitude', 'longitude'],
+                              batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_event_trigram_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['latitude', 'longitude'], name='event_lat_lng_idx'),
+        ),
+        migrations.RunPython(geocode_locations, migrations.RunPython.noop),
+    ]
@@ -9,10 +9,69 @@ Includes:
 
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.text import slugify
 from cloudinary.models import CloudinaryField
 from datetime import datetime
 from django.utils import timezone
+from .geocoding import geocode
+
+
+def make_event_datetime(date, time):
+    """
+    Combine a date and a time into a timezone-aware datetime in the
+    current timezone.
+
+    Used to derive :model:`events.Event` start and end timestamps and to
+    validate user input against the current time.
+    """
+    return timezone.make_aware(
+        datetime.combine(date, time), timezone.get_current_timezone()
+    )
+
+
+def make_event_slug(title, date):
+    """
+    Return the slug of an event: ``<title>-<YYYY-MM-DD>``.
+
+    Used by :model:`events.Event` ``save()`` and by bulk imports, which
+    bypass ``save()``.
+    """
+    return slugify(f"{title}-{date.strftime('%Y-%m-%d')}")
+
+
+class EventQuerySet(models.QuerySet):
+    """
+    Custom queryset for :model:`events.Event`.
+
+    Provides chronological filters that compare the stored ``ends_at``
+    timestamp against the current time inside the database, so views can
+    keep working with lazy querysets (and paginate with LIMIT/OFFSET)
+    instead of filtering every row in Python.
+    """
+
+    def upcoming(self):
+        """Return events that have not ended yet."""
+        return self.filter(ends_at__gte=timezone.now())
+
+    def past(self):
+        """Return events that have already ended."""
+        return self.filter(ends_at__lt=timezone.now())
+
+    def today_upcoming(self):
+        """Return today's events that have not ended yet."""
+        return self.upcoming().filter(date=timezone.localdate())
+
+    def with_categories(self):
+        """
+        Prefetch the categories of all events in one query, so rendering
+        event cards does not run one category query per card.
+        """
+        return self.prefetch_related(
+            models.Prefetch(
+                "category", queryset=Category.objects.only("id", "name")
+            )
+        )
 
 
 class Category(models.Model):
@@ -66,6 +125,11 @@ class Event(models.Model):
     start_time = models.TimeField()
     end_time = models.TimeField()
 
+    # Denormalized, timezone-aware start and end of the event, kept in
+    # sync with date/start_time/end_time by save() for indexed range scans
+    starts_at = models.DateTimeField(editable=False, db_index=True)
+    ends_at = models.DateTimeField(editable=False, db_index=True)
+
     # Many-to-many relationship: One event can have many categories
     # and a category can belong to many events
     category = models.ManyToManyField(Category, related_name="events")
@@ -75,6 +139,11 @@ class Event(models.Model):
     )
     location = models.CharField(max_length=100)
 
+    # Coordinates of the location, geocoded by save() when the location
+    # changes (None if the geocoder doesn't know the place)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+
     # Optional link to external event page
     link = models.URLField(blank=True, null=True)
 
@@ -85,6 +154,20 @@ class Event(models.Model):
 
     cancelled = models.BooleanField(default=False)
 
+    # Origin of events synced from partner feeds (see events.sync): the
+    # feed name, the event's ID in the feed and a hash of the feed row,
+    # to tell which events changed since the last sync. Blank for events
+    # created on the site.
+    external_source = models.CharField(
+        max_length=50, blank=True, default="", editable=False
+    )
+    external_id = models.CharField(
+        max_length=255, blank=True, default="", editable=False
+    )
+    content_hash = models.CharField(
+        max_length=64, blank=True, default="", editable=False
+    )
+
     # The user who created the event
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="events"
@@ -93,9 +176,69 @@ class Event(models.Model):
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
 
+    # Weighted full-text search vector, written by events.search after
+    # every save (PostgreSQL only; SQLite uses an FTS5 table instead).
+    # The GIN index on it is created by migration 0010, as SQLite can't
+    # build it when a migration rebuilds the table.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = EventQuerySet.as_manager()
+
     class Meta:
         # Order events chronologically
-        ordering = ["date", "start_time"]
+        ordering = ["starts_at"]
+        # Indexes matching the filters and orderings used by the views
+        indexes = [
+            # Today's events
+            models.Index(
+                fields=["date", "starts_at"], name="event_date_starts_idx"
+            ),
+            # Profile page (upcoming and past events of one author)
+            models.Index(
+                fields=["author", "starts_at"],
+                name="event_author_starts_idx"
+            ),
+            # "Don't show cancelled events" filter
+            models.Index(
+                fields=["cancelled", "starts_at"],
+                name="event_cancelled_starts_idx"
+            ),
+            models.Index(
+                fields=["starts_at"],
+                condition=models.Q(cancelled=False),
+                name="event_active_starts_idx"
+            ),
+            # Difficulty filter
+            models.Index(
+                fields=["difficulty", "starts_at"],
+                name="event_difficulty_starts_idx"
+            ),
+            # Bounding box prefilter of the radius filter
+            models.Index(
+                fields=["latitude", "longitude"], name="event_lat_lng_idx"
+            ),
+        ]
+        constraints = [
+            # One event per feed entry (also the lookup index of syncs)
+            models.UniqueConstraint(
+                fields=["external_source", "external_id"],
+                condition=~models.Q(external_id=""),
+                name="event_external_id_unique",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the field values loaded from the database, so save() can
+        tell which fields changed.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values)
+            if value is not models.DEFERRED
+        }
+        return instance
 
     def __str__(self):
         """Return a readable label for the event."""
@@ -106,23 +249,58 @@ class Event(models.Model):
         """
         Returns True if the event's date and end_time are in the past.
         """
-        # Combine date and end_time into a single datetime
-        event_dt = datetime.combine(self.date, self.end_time)
+        return self.ends_at < timezone.now()
 
-        # Convert to timezone-aware datetime for accurate comparison
-        event_dt = timezone.make_aware(
-            event_dt, timezone.get_current_timezone()
+    def set_timestamps(self):
+        """
+        Derive starts_at and ends_at from date, start_time and end_time.
+        """
+        self.starts_at = make_event_datetime(self.date, self.start_time)
+        self.ends_at = make_event_datetime(self.date, self.end_time)
+
+    def location_changed(self):
+        """
+        Return True if the event is new or its location differs from the
+        one loaded from the database.
+        """
+        loaded_values = getattr(self, "_loaded_values", {})
+        return self._state.adding or (
+            loaded_values.get("location", self.location) != self.location
         )
 
-        return event_dt < timezone.localtime()
+    def set_coordinates(self):
+        """Geocode the location into latitude and longitude."""
+        self.latitude, self.longitude = geocode(self.location) or (
+            None, None
+        )
 
     def save(self, *args, **kwargs):
         """
         Automatically generate a unique slug using `<title>-<YYYY-MM-DD>`
-        if no slug is manually provided.
+        if no slug is manually provided, keep the starts_at/ends_at
+        timestamps in sync with the event's date and times, and geocode
+        the location when it changed.
         """
         if not self.slug:
-            date_str = self.date.strftime("%Y-%m-%d")
-            self.slug = slugify(f"{self.title}-{date_str}")
+            self.slug = make_event_slug(self.title, self.date)
+
+        self.set_timestamps()
+        derived_fields = {"starts_at", "ends_at"}
+
+        # Geocode new locations only, keeping coordinates set by hand
+        if self.location_changed():
+            self.set_coordinates()
+            derived_fields |= {"latitude", "longitude"}
+
+        # Make sure derived fields are written on partial saves as well
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *derived_fields}
 
         super().save(*args, **kwargs)
+        # The saved values are the ones to compare later changes with
+        self._loaded_values = {
+            **getattr(self, "_loaded_values", {}),
+            "location": self.location,
+            "date": self.date,
+        }
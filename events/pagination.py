@@ -0,0 +1,158 @@
+"""
+Keyset (cursor) pagination for event listings.
+
+Includes:
+- encode_cursor / decode_cursor: Convert an event's position in the
+  chronological ordering into an opaque URL-safe token and back.
+  Works for Event instances as well as ``values()`` rows.
+- CursorPaginator: Splits an event queryset into pages ordered by
+  ``(starts_at, id)`` using ``WHERE`` conditions on the last seen row
+  instead of OFFSET, so deep pages cost the same as the first one and
+  no COUNT query is needed.
+  ``apage()`` fetches the page with the async ORM.
+- CursorPage: A single page of events with next/previous cursors.
+- CountedPaginator: Page number pagination with a known number of
+  items, so no COUNT query is needed.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import Http404
+
+
+def encode_cursor(event):
+    """
+    Return an opaque token for the position of the given event, which is
+    an Event instance or a dict with ``starts_at`` and ``id``.
+    """
+    if isinstance(event, dict):
+        starts_at, pk = event["starts_at"], event["id"]
+    else:
+        starts_at, pk = event.starts_at, event.pk
+    payload = json.dumps([starts_at.isoformat(), pk])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """
+    Return the ``(starts_at, id)`` position encoded in a cursor token.
+
+    Raises Http404 if the token is malformed.
+    """
+    try:
+        padding = "=" * (-len(token) % 4)
+        payload = base64.urlsafe_b64decode(token + padding)
+        starts_at, pk = json.loads(payload)
+        return datetime.fromisoformat(starts_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise Http404("Invalid page cursor.")
+
+
+class CursorPage:
+    """
+    A single page of events produced by :class:`CursorPaginator`.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginate an event queryset by keyset on ``(starts_at, id)``.
+
+    ``starts_at`` is derived from the event's date and start_time, so this
+    is the same chronological order as ``(date, start_time, id)``.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def _query(self, after=None, before=None):
+        """
+        Return the query for the page and whether it walks backwards.
+        One extra row is fetched to find out if there are more pages.
+        """
+        if before:
+            starts_at, pk = decode_cursor(before)
+            # Walk backwards from the cursor, the order is restored later
+            queryset = self.queryset.filter(
+                Q(starts_at__lt=starts_at)
+                | Q(starts_at=starts_at, pk__lt=pk)
+            ).order_by("-starts_at", "-pk")
+            return queryset[:self.per_page + 1], True
+
+        queryset = self.queryset.order_by("starts_at", "pk")
+        if after:
+            starts_at, pk = decode_cursor(after)
+            queryset = queryset.filter(
+                Q(starts_at__gt=starts_at)
+                | Q(starts_at=starts_at, pk__gt=pk)
+            )
+        return queryset[:self.per_page + 1], False
+
+    def _page(self, rows, backwards, after):
+        """Return the CursorPage of the fetched ``rows``."""
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows = rows[::-1]
+            has_previous, has_next = more, True
+        else:
+            has_previous, has_next = bool(after), more
+
+        return CursorPage(
+            rows,
+            next_cursor=encode_cursor(rows[-1]) if rows and has_next else None,
+            previous_cursor=(
+                encode_cursor(rows[0]) if rows and has_previous else None
+            ),
+        )
+
+    def page(self, after=None, before=None):
+        """
+        Return the page following the ``after`` cursor, the page preceding
+        the ``before`` cursor, or the first page if neither is given.
+        """
+        queryset, backwards = self._query(after, before)
+        return self._page(list(queryset), backwards, after)
+
+    async def apage(self, after=None, before=None):
+        """Async version of ``page()``."""
+        queryset, backwards = self._query(after, before)
+        rows = [row async for row in queryset]
+        return self._page(rows, backwards, after)
+
+
+class CountedPaginator(Paginator):
+    """
+    A Paginator for a queryset whose number of items is already known
+    (e.g. from a cached summary), which saves the COUNT query.
+    """
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        # Takes the place of the cached property running the COUNT query
+        self.count = count
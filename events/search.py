@@ -0,0 +1,211 @@
+"""
+Full-text search for events.
+
+Includes:
+- search_events: Filters an Event queryset by a search query and orders
+  the matches by relevance, then by start.
+- index_event / unindex_event: Keep the search index of a single event in
+  sync (called from the signal handlers in ``events.signals``).
+- index_events: Indexes many events at once (one statement per batch),
+  e.g. after bulk inserts, which don't send signals.
+- rebuild_search_index: (Re)indexes all events of a queryset.
+
+Title, organizer, location and the plain text of the description are
+indexed, weighted in that order of importance.
+
+- PostgreSQL: A weighted ``tsvector`` stored in ``Event.search_vector``
+  (with a GIN index), computed from the event's columns by an UPDATE
+  after every save and ranked with ``ts_rank``.
+- SQLite: The FTS5 virtual table ``events_event_fts`` (rowid = event ID),
+  ranked with ``bm25``. Keeps tests and local development working.
+- Other databases: Case-insensitive substring matching, ordered by start.
+"""
+
+import html
+import operator
+import re
+from functools import reduce
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector
+)
+from django.db import connections
+from django.db.models import F, Func, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+
+# Text search configuration used to build and query the search vectors
+SEARCH_CONFIG = "english"
+
+# Indexed fields and their PostgreSQL weight (A = most important)
+SEARCH_FIELDS = (
+    ("title", "A"),
+    ("organizer", "B"),
+    ("location", "B"),
+    ("description", "C"),
+)
+
+FTS_TABLE = "events_event_fts"
+# bm25 weights of the FTS5 columns, in the order of SEARCH_FIELDS
+FTS_WEIGHTS = "10.0, 5.0, 5.0, 1.0"
+
+
+def _vendor(using):
+    return connections[using].vendor
+
+
+def plain_text(value):
+    """Return the text of an HTML fragment without tags and entities."""
+    return " ".join(html.unescape(strip_tags(value or "")).split())
+
+
+def search_document(event):
+    """Return the indexed text of ``event`` per field."""
+    return {
+        field: plain_text(getattr(event, field))
+        if field == "description" else getattr(event, field) or ""
+        for field, weight in SEARCH_FIELDS
+    }
+
+
+def _search_vector():
+    """
+    Return the weighted search vector of an event, computed by PostgreSQL
+    from the event's columns (with the HTML tags of the description
+    removed, like ``plain_text``).
+    """
+    columns = {field: F(field) for field, weight in SEARCH_FIELDS}
+    columns["description"] = Func(
+        F("description"), Value("<[^>]*>"), Value(" "), Value("g"),
+        function="regexp_replace", output_field=TextField(),
+    )
+    return reduce(operator.add, (
+        SearchVector(columns[field], weight=weight, config=SEARCH_CONFIG)
+        for field, weight in SEARCH_FIELDS
+    ))
+
+
+def _fts_query(query):
+    """
+    Return an FTS5 MATCH expression for the search query entered by a
+    user: every word must match, as a word or word prefix. Quoting the
+    words keeps FTS5 operators and syntax errors out of user input.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", query))
+
+
+def search_events(queryset, query):
+    """
+    Return the events in ``queryset`` matching the search ``query``,
+    annotated with ``search_rank`` and ordered by relevance, then by
+    start.
+    """
+    vendor = _vendor(queryset.db)
+    table = queryset.model._meta.db_table
+
+    if vendor == "postgresql":
+        search_query = SearchQuery(
+            query, search_type="websearch", config=SEARCH_CONFIG
+        )
+        queryset = queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F("search_vector"), search_query)
+        )
+    elif vendor == "sqlite":
+        match = _fts_query(query)
+        if not match:
+            return queryset.none()
+        queryset = queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            (match,),
+        )).annotate(search_rank=RawSQL(
+            # bm25 returns lower values for better matches
+            f"SELECT -bm25({FTS_TABLE}, {FTS_WEIGHTS}) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id",
+            (match,),
+        ))
+    else:
+        words = query.split()
+        if not words:
+            return queryset.none()
+        for word in words:
+            queryset = queryset.filter(reduce(operator.or_, (
+                Q(**{f"{field}__icontains": word})
+                for field, weight in SEARCH_FIELDS
+            )))
+        queryset = queryset.annotate(search_rank=Value(0.0))
+
+    return queryset.order_by("-search_rank", "starts_at", "pk")
+
+
+def index_event(event, using="default"):
+    """Write the search index entry of ``event``."""
+    vendor = _vendor(using)
+
+    if vendor == "postgresql":
+        # update() doesn't send post_save, so this doesn't recurse
+        type(event)._default_manager.using(using).filter(
+            pk=event.pk
+        ).update(search_vector=_search_vector())
+    elif vendor == "sqlite":
+        document = search_document(event)
+        columns = ", ".join(field for field, weight in SEARCH_FIELDS)
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [event.pk]
+            )
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, {columns}) "
+                f"VALUES (%s, %s, %s, %s, %s)",
+                [event.pk, *document.values()],
+            )
+
+
+def index_events(events, using="default"):
+    """Write the search index entries of all ``events``."""
+    vendor = _vendor(using)
+    if not events or vendor not in ("postgresql", "sqlite"):
+        return
+
+    if vendor == "postgresql":
+        # One UPDATE for the whole batch
+        type(events[0])._default_manager.using(using).filter(
+            pk__in=[event.pk for event in events]
+        ).update(search_vector=_search_vector())
+        return
+
+    columns = ", ".join(field for field, weight in SEARCH_FIELDS)
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+            [[event.pk] for event in events],
+        )
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, {columns}) "
+            f"VALUES (%s, %s, %s, %s, %s)",
+            [
+                [event.pk, *search_document(event).values()]
+                for event in events
+            ],
+        )
+
+
+def unindex_event(event, using="default"):
+    """Remove ``event`` from the search index."""
+    # The PostgreSQL search vector is deleted along with the event row
+    if _vendor(using) == "sqlite":
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [event.pk]
+            )
+
+
+def rebuild_search_index(queryset, batch_size=500):
+    """Index all events in ``queryset``."""
+    fields = [field for field, weight in SEARCH_FIELDS]
+    batch = []
+    for event in queryset.only(*fields).iterator(chunk_size=batch_size):
+        batch.append(event)
+        if len(batch) == batch_size:
+            index_events(batch, using=queryset.db)
+            batch = []
+    if batch:
+        index_events(batch, using=queryset.db)
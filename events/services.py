@@ -0,0 +1,131 @@
+"""
+Actions of users on their own events.
+
+Includes:
+- EventNotFound / EventHasEnded: Raised when an action isn't allowed on
+  an event.
+- get_owned_event: Fetches an event of a user (optionally only if it
+  hasn't ended) with one query.
+- toggle_event_cancelled: Cancels or reactivates an upcoming event with
+  one conditional UPDATE.
+- delete_owned_event: Deletes an event of a user.
+- bulk_set_cancelled / bulk_delete: Cancel, reactivate or delete many
+  selected events of a user at once.
+
+Every action filters by the author in the database, so events of other
+users are never loaded. Actions running UPDATE queries send no signals,
+so they set ``updated_on`` (which versions the cached event cards) and
+invalidate the cached listings themselves.
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .cache import bump_version
+from .models import Event
+
+
+class EventNotFound(Exception):
+    """The event doesn't exist or belongs to another user."""
+
+
+class EventHasEnded(Exception):
+    """The event already ended, so it can't be changed anymore."""
+
+    def __init__(self, event):
+        super().__init__(f"Event '{event.title}' already ended.")
+        self.event = event
+
+
+def _owned_events(user):
+    """Return the events of ``user``."""
+    return Event.objects.filter(author=user)
+
+
+def _invalidate(dates):
+    """
+    Invalidate the cached listings after UPDATE queries, and the list of
+    today's events if one of the ``dates`` is today.
+    """
+    bump_version("list")
+    if timezone.localdate() in dates:
+        bump_version("today")
+
+
+def get_owned_event(user, slug, upcoming=False):
+    """
+    Return the event of ``user`` with ``slug``.
+
+    Raises EventNotFound if there's none, and EventHasEnded if
+    ``upcoming`` is set and the event ended.
+    """
+    event = _owned_events(user).filter(slug=slug).first()
+    if event is None:
+        raise EventNotFound(slug)
+    if upcoming and event.is_past:
+        raise EventHasEnded(event)
+    return event
+
+
+def toggle_event_cancelled(user, slug):
+    """
+    Cancel the upcoming event of ``user`` with ``slug``, or reactivate it
+    if it's cancelled, and return it with its new status.
+
+    The status is flipped by the database, so concurrent toggles can't
+    overwrite each other's changes to the event.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        toggled = _owned_events(user).filter(
+            slug=slug, ends_at__gte=now
+        ).update(cancelled=~F("cancelled"), updated_on=now)
+        event = _owned_events(user).filter(slug=slug).only(
+            "title", "slug", "date", "ends_at", "cancelled"
+        ).first()
+    if event is None:
+        raise EventNotFound(slug)
+    if not toggled:
+        raise EventHasEnded(event)
+    _invalidate({event.date})
+    return event
+
+
+def delete_owned_event(user, slug):
+    """Delete the event of ``user`` with ``slug`` and return it."""
+    event = get_owned_event(user, slug)
+    event.delete()
+    return event
+
+
+def bulk_set_cancelled(user, pks, cancelled):
+    """
+    Set the status of the upcoming events of ``user`` among ``pks`` to
+    ``cancelled`` with one UPDATE, and return how many changed.
+    """
+    now = timezone.now()
+    events = _owned_events(user).filter(
+        pk__in=pks, ends_at__gte=now
+    ).exclude(cancelled=cancelled)
+    with transaction.atomic():
+        dates = set(events.values_list("date", flat=True))
+        changed = events.update(cancelled=cancelled, updated_on=now)
+    if changed:
+        _invalidate(dates)
+    return changed
+
+
+def bulk_delete(user, pks):
+    """
+    Delete the events of ``user`` among ``pks`` and return how many were
+    deleted.
+
+    The events and their category assignments are deleted with one
+    DELETE each. The events are still loaded (without their
+    descriptions), as the post_delete signal handlers keep the search
+    index and the cached listings in sync.
+    """
+    deleted, per_model = _owned_events(user).filter(pk__in=pks).only(
+        "pk", "date"
+    ).delete()
+    return per_model.get(Event._meta.label, 0)
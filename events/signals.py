@@ -0,0 +1,85 @@
+"""
+Signal handlers for the events app.
+
+Invalidates cached event listings, fragments and the list of today's
+events whenever events, their categories or the categories themselves
+change, and keeps the full-text search index of events up to date.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .cache import bump_version
+from .models import Category, Event
+from .search import index_event, unindex_event
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_listings(sender, **kwargs):
+    """Invalidate cached listings after an event change."""
+    bump_version("list")
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_todays_events(sender, instance, **kwargs):
+    """
+    Invalidate the cached list of today's events if the event takes place
+    today, or did before it was moved to another date.
+    """
+    today = timezone.localdate()
+    original_date = getattr(instance, "_loaded_values", {}).get("date")
+    if today in (instance.date, original_date):
+        bump_version("today")
+
+
+@receiver(post_save, sender=Event)
+def update_search_index(sender, instance, using, **kwargs):
+    """Index the saved event for full-text search."""
+    index_event(instance, using=using)
+
+
+@receiver(post_delete, sender=Event)
+def remove_from_search_index(sender, instance, using, **kwargs):
+    """Remove the deleted event from the full-text search index."""
+    unindex_event(instance, using=using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_fragments(sender, **kwargs):
+    """
+    Invalidate cached listings and fragments showing categories after a
+    category change.
+    """
+    bump_version("list")
+    bump_version("categories")
+    bump_version("today")
+
+
+@receiver(m2m_changed, sender=Event.category.through)
+def invalidate_event_categories(sender, instance, action, reverse, model,
+                                pk_set, **kwargs):
+    """
+    Invalidate cached listings after categories are (un)assigned, and
+    touch updated_on of the affected events so their cached cards are
+    rendered again.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse and action == "post_clear":
+        # The events removed from the category are unknown at this point
+        bump_version("categories")
+        bump_version("today")
+    else:
+        # Forward: instance is the event; reverse: pk_set holds the events
+        event_pks = pk_set if reverse else [instance.pk]
+        Event.objects.filter(pk__in=event_pks).update(
+            updated_on=timezone.now()
+        )
+        # Today's events are cached with their categories
+        if reverse or instance.date == timezone.localdate():
+            bump_version("today")
+    bump_version("list")
@@ -0,0 +1,277 @@
+"""
+Incremental sync of events from partner feeds (iCalendar, JSON or CSV).
+
+Includes:
+- FileFeed / UrlFeed: Feeds read from a local file or from a URL. File
+  feeds also stand in for partner feeds in tests.
+- content_hash: Hash of the validated content of a feed entry.
+- FeedSync: Compares a feed with the events synced from it before and
+  applies only the differences.
+
+Every synced event stores the feed name (``external_source``), its ID in
+the feed (``uid`` of the row, the UID of iCalendar events) and the hash
+of its content. A sync then:
+- inserts entries that are new (in batches, see ``EventImporter``),
+- updates events whose hash changed, with one ``bulk_update`` per batch,
+  keeping their slugs,
+- cancels upcoming events that are no longer in the feed, with one
+  UPDATE per batch,
+and leaves unchanged events alone, so their ``updated_on`` and the
+cached pages depending on them stay valid.
+"""
+
+import hashlib
+import io
+import json
+import time
+from urllib.request import urlopen
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
+from .cache import bump_version
+from .importing import READERS, EventImporter, RowError, guess_format
+from .models import Event, make_event_datetime
+from .search import index_events
+
+# Seconds to wait for a partner's server
+FEED_TIMEOUT = 30
+
+# Fields compared (through the content hash) and written by updates
+SYNCED_FIELDS = [
+    "title", "organizer", "description", "date", "start_time", "end_time",
+    "difficulty", "location", "link", "cancelled",
+]
+UPDATED_FIELDS = SYNCED_FIELDS + [
+    "starts_at", "ends_at", "latitude", "longitude", "content_hash",
+    "updated_on",
+]
+
+
+class FileFeed:
+    """A feed read from a local file."""
+
+    def __init__(self, name, path, file_format=None):
+        self.name = name
+        self.path = path
+        self.file_format = file_format or guess_format(path)
+
+    def rows(self):
+        """Yield the ``(line, row)`` pairs of the feed."""
+        with open(self.path, encoding="utf-8-sig", newline="") as stream:
+            yield from READERS[self.file_format](stream)
+
+
+class UrlFeed(FileFeed):
+    """A feed downloaded from a URL while it's read."""
+
+    def rows(self):
+        """Yield the ``(line, row)`` pairs of the feed."""
+        with urlopen(self.path, timeout=FEED_TIMEOUT) as response:
+            stream = io.TextIOWrapper(
+                response, encoding="utf-8-sig", newline=""
+            )
+            yield from READERS[self.file_format](stream)
+
+
+def content_hash(event, categories):
+    """
+    Return a hash of the synced fields and categories of ``event``, as
+    validated (so formatting differences in the feed don't count as
+    changes).
+    """
+    content = [str(getattr(event, field)) for field in SYNCED_FIELDS]
+    content.append(sorted(category.pk for category in categories))
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()
+
+
+def _has_started(row):
+    """
+    Return True if the row is of an event that already started. Such
+    entries are neither validated nor synced.
+    """
+    try:
+        date = parse_date(str(row.get("date") or ""))
+        start_time = parse_time(str(row.get("start_time") or ""))
+    except ValueError:
+        return False
+    if date is None or start_time is None:
+        return False
+    return make_event_datetime(date, start_time) < timezone.now()
+
+
+class FeedSync:
+    """
+    Syncs the events of ``feed`` for ``author``.
+
+    After ``run()``, ``created``, ``updated``, ``cancelled``,
+    ``unchanged`` and ``skipped`` (entries that already started) count
+    the feed entries, ``errors`` holds the invalid ones as
+    ``(line, message)`` and ``duration`` the seconds the sync took.
+    """
+
+    def __init__(self, feed, author, batch_size=500):
+        self.feed = feed
+        self.batch_size = batch_size
+        self.importer = EventImporter(author, batch_size=batch_size)
+        self.errors = self.importer.errors
+        self.updated = 0
+        self.cancelled = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.duration = 0
+
+    @property
+    def created(self):
+        """Number of events inserted."""
+        return self.importer.created
+
+    def summary(self):
+        """Return the result of the sync as a sentence."""
+        return (
+            f"{self.feed.name}: {self.created} created, "
+            f"{self.updated} updated, {self.cancelled} cancelled, "
+            f"{self.unchanged} unchanged, {self.skipped} already started, "
+            f"{len(self.errors)} invalid ({self.duration:.2f}s)."
+        )
+
+    def run(self):
+        """Sync the feed and return the sync."""
+        started = time.perf_counter()
+
+        # pk, content hash and slug of the events synced before, by ID
+        existing = {
+            external_id: (pk, digest, slug)
+            for external_id, pk, digest, slug in Event.objects.filter(
+                external_source=self.feed.name
+            ).values_list("external_id", "pk", "content_hash", "slug")
+        }
+        seen = set()
+        inserts, updates = [], []
+        for line, row in self.feed.rows():
+            if isinstance(row, RowError):
+                self.errors.append((line, str(row)))
+                continue
+            external_id = str(row.get("uid") or "").strip()
+            if not external_id:
+                self.errors.append((line, "The entry has no uid."))
+                continue
+            if external_id in seen:
+                self.errors.append(
+                    (line, f"The uid {external_id!r} is used twice.")
+                )
+                continue
+            # Invalid entries count as seen, so their events aren't
+            # cancelled because of a mistake in the feed
+            seen.add(external_id)
+            if _has_started(row):
+                self.skipped += 1
+                continue
+
+            try:
+                event, categories = self.importer.build(row)
+            except RowError as error:
+                self.errors.append((line, str(error)))
+                continue
+            event.external_source = self.feed.name
+            event.external_id = external_id
+            event.content_hash = content_hash(event, categories)
+
+            if external_id not in existing:
+                inserts.append((line, event, categories))
+            elif existing[external_id][1] != event.content_hash:
+                event.pk, digest, event.slug = existing[external_id]
+                updates.append((line, event, categories))
+            else:
+                self.unchanged += 1
+
+            if len(updates) >= self.batch_size:
+                self.update(updates)
+                updates = []
+            if len(inserts) >= self.batch_size:
+                self.importer.insert(inserts)
+                inserts = []
+        if updates:
+            self.update(updates)
+        if inserts:
+            self.importer.insert(inserts)
+
+        # An empty feed more likely means a broken feed than a club
+        # cancelling all its events
+        if seen:
+            self.cancel_missing(
+                pk for external_id, (pk, digest, slug) in existing.items()
+                if external_id not in seen
+            )
+
+        # Bulk queries don't send the signals invalidating cached listings
+        if self.created or self.updated or self.cancelled:
+            bump_version("list")
+            bump_version("today")
+        self.duration = time.perf_counter() - started
+        return self
+
+    def update(self, batch):
+        """
+        Write a batch of changed ``(line, event, categories)`` in one
+        UPDATE, replacing the events' categories. If the batch fails, its
+        lines are reported in ``errors``.
+        """
+        titles = {}
+        for line, event, categories in batch:
+            titles.setdefault(event.title, event.pk)
+        taken = set(
+            Event.objects.filter(title__in=titles)
+            .exclude(pk__in=[event.pk for line, event, categories in batch])
+            .values_list("title", flat=True)
+        )
+        valid = []
+        for line, event, categories in batch:
+            if event.title in taken or titles[event.title] != event.pk:
+                self.errors.append(
+                    (line, f"An event titled {event.title!r} exists.")
+                )
+            else:
+                valid.append((line, event, categories))
+        if not valid:
+            return
+
+        now = timezone.now()
+        events = [event for line, event, categories in valid]
+        for event in events:
+            event.updated_on = now
+        through = Event.category.through
+        try:
+            with transaction.atomic():
+                Event.objects.bulk_update(events, UPDATED_FIELDS)
+                through.objects.filter(event_id__in=[
+                    event.pk for event in events
+                ]).delete()
+                through.objects.bulk_create([
+                    through(event_id=event.pk, category_id=category.pk)
+                    for line, event, categories in valid
+                    for category in categories
+                ])
+                index_events(events)
+        except DatabaseError as error:
+            # Like failed inserts: report the batch and go on with the next
+            self.errors.extend(
+                (line, f"Batch failed: {error}") for line, *rest in valid
+            )
+            return
+        self.updated += len(events)
+
+    def cancel_missing(self, pks):
+        """
+        Cancel the upcoming events among ``pks``, one UPDATE per batch.
+
+        Their content hash is cleared, so they're updated (and
+        reactivated) if they come back to the feed.
+        """
+        pks = list(pks)
+        now = timezone.now()
+        for start in range(0, len(pks), self.batch_size):
+            self.cancelled += Event.objects.filter(
+                pk__in=pks[start:start + self.batch_size],
+                cancelled=False,
+                starts_at__gt=now,
+            ).update(cancelled=True, content_hash="", updated_on=now)
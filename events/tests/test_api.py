@@ -0,0 +1,151 @@
+"""
+Tests for the events JSON API.
+"""
+
+from datetime import timedelta
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from events.models import Category, Event
+from events.tests.utils import create_event
+
+
+class EventApiTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="password123"
+        )
+        self.trail = Category.objects.create(name="Trail Run", sort_order=1)
+        self.social = Category.objects.create(name="Social Run", sort_order=2)
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+
+        self.events = []
+        for day in range(5):
+            event = create_event(
+                self.user, f"API Event {day}",
+                categories=[self.trail if day % 2 else self.social],
+                description="<p>Forest loops</p>",
+                date=self.tomorrow + timedelta(days=day),
+                difficulty=(
+                    Event.Difficulty.BEGINNER if day % 2
+                    else Event.Difficulty.ADVANCED
+                ),
+            )
+            self.events.append(event)
+
+        # Past events are not part of the API
+        create_event(
+            self.user, "Past Event", date=self.tomorrow - timedelta(days=3)
+        )
+
+    def _get(self, url=None, **params):
+        response = self.client.get(url or reverse("api_v1_events"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_event_list(self):
+        """
+        All upcoming events should be returned with all fields.
+        """
+        data = self._get()
+        self.assertEqual(
+            [event["id"] for event in data["results"]],
+            [event.pk for event in self.events],
+        )
+        first = data["results"][0]
+        self.assertEqual(first["title"], "API Event 0")
+        self.assertEqual(first["author"], "testuser")
+        self.assertEqual(first["categories"], [self.social.pk])
+        self.assertEqual(first["date"], self.tomorrow.isoformat())
+        self.assertTrue(first["url"].endswith(
+            reverse("event_detail", args=[self.events[0].slug])
+        ))
+        self.assertIsNone(data["next"])
+
+    def test_sparse_fieldsets(self):
+        """
+        Only the requested fields should be returned and selected.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            data = self._get(fields="title,date")
+        self.assertEqual(set(data["results"][0]), {"title", "date"})
+
+        event_queries = [
+            query["sql"] for query in queries
+            if '"events_event"' in query["sql"]
+        ]
+        self.assertEqual(len(event_queries), 1)
+        self.assertNotIn("description", event_queries[0])
+        self.assertNotIn("auth_user", event_queries[0])
+
+    def test_query_count(self):
+        """
+        A page should be built with one event and one category query.
+        """
+        self._get()
+        with self.assertNumQueries(2):
+            self._get()
+
+    def test_filters(self):
+        """
+        The events list filters should apply to the API.
+        """
+        data = self._get(
+            difficulty=Event.Difficulty.BEGINNER, fields="id,categories"
+        )
+        self.assertEqual(
+            [event["id"] for event in data["results"]],
+            [self.events[1].pk, self.events[3].pk],
+        )
+        data = self._get(category=self.social.pk, q="forest", fields="id")
+        self.assertEqual(
+            [event["id"] for event in data["results"]],
+            [self.events[0].pk, self.events[2].pk, self.events[4].pk],
+        )
+
+    def test_cursor_pagination(self):
+        """
+        Following next and previous should walk through all events.
+        """
+        first = self._get(limit=2, fields="id")
+        second = self._get(first["next"])
+        third = self._get(second["next"])
+        self.assertIsNone(third["next"])
+        self.assertEqual(
+            [event["id"] for page in (first, second, third)
+             for event in page["results"]],
+            [event.pk for event in self.events],
+        )
+        self.assertEqual(self._get(second["previous"]), first)
+
+    def test_invalid_parameters(self):
+        """
+        Unknown fields, bad limits and invalid filters should be rejected.
+        """
+        for params in (
+            {"fields": "title,secret"},
+            {"limit": "0"},
+            {"limit": "many"},
+            {"date_filter": "yesterday"},
+        ):
+            response = self.client.get(reverse("api_v1_events"), params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("error", response.json())
+
+    def test_category_list(self):
+        """
+        Categories should be listed in their display order.
+        """
+        self.assertEqual(
+            self._get(reverse("api_v1_categories"))["results"],
+            [
+                {"id": self.trail.pk, "name": "Trail Run"},
+                {"id": self.social.pk, "name": "Social Run"},
+            ],
+        )
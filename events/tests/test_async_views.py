@@ -0,0 +1,177 @@
+"""
+Tests for the async event views served under ASGI.
+
+Requests go through the AsyncClient (i.e. the ASGI handler), so any
+synchronous database access left in the views, templates or middleware
+fails with SynchronousOnlyOperation.
+"""
+
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from core.models import ContactMessage
+from events import async_views, views
+from events.models import Category
+from events.tests.utils import create_event
+
+
+@override_settings(ROOT_URLCONF="runnershive.asgi_urls")
+class AsyncViewsTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            username="club", password="password123", email="club@example.com"
+        )
+        self.category = Category.objects.create(name="Trail Run")
+        today = timezone.localdate()
+        self.event = self._create_event("Hill Repeats", today + timedelta(1))
+        self.past_event = self._create_event("Old Run", today - timedelta(3))
+
+    def _create_event(self, title, date):
+        return create_event(
+            self.user, title, categories=[self.category], date=date
+        )
+
+    def test_urls(self):
+        """
+        The main pages should be served by the async views, all other
+        URLs by the usual views.
+        """
+        self.assertIs(
+            resolve(reverse("events")).func.view_class,
+            async_views.EventListView,
+        )
+        self.assertIs(
+            resolve(reverse("event_detail", args=["slug"])).func,
+            async_views.event_detail,
+        )
+        self.assertIs(
+            resolve(reverse("event_create")).func.view_class,
+            views.EventCreateView,
+        )
+
+    def test_asgi_settings(self):
+        """
+        The ASGI application should use the async URLconf, everything else
+        the usual one.
+        """
+        from runnershive import settings, settings_asgi
+        self.assertEqual(settings_asgi.ROOT_URLCONF, "runnershive.asgi_urls")
+        self.assertEqual(settings.ROOT_URLCONF, "runnershive.urls")
+
+    async def _login(self):
+        # aforce_login() checks cached_db session keys with a sync cache
+        # call, which fails with the database cache
+        await sync_to_async(self.async_client.force_login)(self.user)
+
+    async def test_event_list(self):
+        """
+        The events list should render the filtered events, categories and
+        facet counts, and answer 304 to a current ETag.
+        """
+        url = reverse("events")
+        response = await self.async_client.get(url)
+        self.assertContains(response, "Hill Repeats")
+        self.assertContains(response, "Trail Run (1)")
+        self.assertNotContains(response, "Old Run")
+
+        response = await self.async_client.get(
+            url, headers={"if-none-match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = await self.async_client.get(
+            url, {"category": [self.category.pk], "after": ""}
+        )
+        self.assertContains(response, "Hill Repeats")
+
+        response = await self.async_client.get(url, {"q": "nothing"})
+        self.assertNotContains(response, "Hill Repeats")
+
+    async def test_home_and_detail(self):
+        """
+        The homepage and detail page should render, the detail page with
+        its categories and a 404 for unknown events.
+        """
+        response = await self.async_client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+
+        url = reverse("event_detail", args=[self.event.slug])
+        response = await self.async_client.get(url)
+        self.assertContains(response, "Trail Run")
+        response = await self.async_client.get(
+            url, headers={"if-none-match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+        url = reverse("event_detail", args=["no-such-event"])
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_profile(self):
+        """
+        The profile should redirect anonymous users to the login page and
+        show logged-in users their upcoming and past events.
+        """
+        url = reverse("profile")
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("login", response["Location"])
+
+        await self._login()
+        response = await self.async_client.get(url)
+        self.assertContains(response, "Hill Repeats")
+        self.assertContains(response, "Old Run")
+        self.assertContains(response, "1 upcoming")
+        self.assertEqual(
+            response.context["past_events"], [self.past_event]
+        )
+
+    async def test_contact(self):
+        """
+        The contact form should be prefilled for logged-in users and save
+        messages.
+        """
+        await self._login()
+        response = await self.async_client.get(reverse("contact"))
+        self.assertContains(response, "club@example.com")
+
+        response = await self.async_client.post(reverse("contact"), {
+            "name": "Club",
+            "email": "club@example.com",
+            "subject": "Hello",
+            "message": "Hello there",
+        })
+        self.assertRedirects(
+            response, reverse("home"), fetch_redirect_response=False
+        )
+        message = await ContactMessage.objects.select_related("user").aget()
+        self.assertEqual(message.user, self.user)
+
+
+DATABASE_CACHES = {
+    alias: {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "test_async_cache",
+        "KEY_PREFIX": alias,
+    }
+    for alias in ("default", "pages", "fragments", "sessions")
+}
+
+
+@override_settings(CACHES=DATABASE_CACHES)
+class AsyncViewsDatabaseCacheTestCase(AsyncViewsTestCase):
+    """
+    The async views with the database cache, which fails any cache access
+    made synchronously from async code.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("createcachetable", verbosity=0)
@@ -0,0 +1,104 @@
+"""
+Tests for the events app autocomplete suggestions.
+"""
+
+from datetime import timedelta
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from events.autocomplete import PrefixIndex, get_index
+from events.tests.utils import create_event
+
+
+class PrefixIndexTestCase(TestCase):
+    def setUp(self):
+        self.index = PrefixIndex([
+            ("Olympic Stadium", 3),
+            ("Olympiapark", 5),
+            ("City Park", 1),
+            ("Stadtpark", 2),
+        ])
+
+    def test_prefix_of_any_word_matches(self):
+        """
+        Values should be found by the start of any of their words,
+        ignoring case and extra whitespace.
+        """
+        self.assertEqual(
+            self.index.lookup("olymp"), ["Olympiapark", "Olympic Stadium"]
+        )
+        self.assertEqual(
+            self.index.lookup("STAD"), ["Olympic Stadium", "Stadtpark"]
+        )
+        self.assertEqual(
+            self.index.lookup(" city   pa"), ["City Park"]
+        )
+        self.assertEqual(self.index.lookup("ark"), [])
+
+    def test_most_used_values_first(self):
+        """
+        Suggestions should be ordered by usage and limited.
+        """
+        self.assertEqual(self.index.lookup("o", limit=1), ["Olympiapark"])
+        self.assertEqual(self.index.lookup(""), [])
+
+
+class EventAutocompleteViewTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="password123"
+        )
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+        for index, location in enumerate(
+            ["Olympic Stadium", "Olympic Stadium", "Olympiapark"]
+        ):
+            self._create_event(f"Event {index}", location)
+
+    def _create_event(self, title, location):
+        return create_event(self.user, title, location=location)
+
+    def _suggest(self, field, query):
+        response = self.client.get(
+            reverse("event_autocomplete", args=[field]), {"q": query}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_suggestions(self):
+        """
+        The endpoint should return matching values, most used first.
+        """
+        self.assertEqual(
+            self._suggest("location", "olym"),
+            ["Olympic Stadium", "Olympiapark"],
+        )
+        self.assertEqual(self._suggest("organizer", "run"), ["Running Club"])
+
+    def test_index_is_rebuilt_after_changes(self):
+        """
+        New spellings should be suggested once an event was saved.
+        """
+        self.assertEqual(self._suggest("location", "track"), [])
+        self._create_event("New Event", "Track Field")
+        self.assertEqual(self._suggest("location", "track"), ["Track Field"])
+
+    def test_warm_index_needs_no_queries(self):
+        """
+        Lookups should be answered from memory once the index is built.
+        """
+        get_index("location")
+        with self.assertNumQueries(0):
+            self._suggest("location", "olym")
+
+    def test_unknown_field(self):
+        """
+        Only location and organizer should offer suggestions.
+        """
+        response = self.client.get(
+            reverse("event_autocomplete", args=["description"]), {"q": "a"}
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,82 @@
+"""
+Tests for the events app listing cache.
+"""
+
+from datetime import datetime, time, timedelta
+from unittest import mock
+from django.core.cache import caches
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth.models import User
+from events.cache import (
+    filter_cache_key, get_cached_event_ids, get_version
+)
+from events.models import Category, Event
+from events.tests.utils import create_event
+
+
+class EventListCacheTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="password123"
+        )
+        self.category = Category.objects.create(name="Trail Run")
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+        self.event = create_event(
+            self.user, "Cached Event", difficulty=Event.Difficulty.BEGINNER
+        )
+
+    def test_filter_key_is_normalized(self):
+        """
+        Equivalent filter combinations should share one cache key.
+        """
+        other = Category.objects.create(name="Social Run")
+        self.assertEqual(
+            filter_cache_key({
+                "category": [self.category, other],
+                "difficulty": ["INTERMEDIATE", "BEGINNER"],
+                "date_filter": "",
+            }),
+            filter_cache_key({
+                "category": [other, self.category],
+                "difficulty": ["BEGINNER", "INTERMEDIATE"],
+                "date_filter": "all",
+                "cancelled": False,
+            }),
+        )
+
+    def test_cached_ids_expire_when_next_event_ends(self):
+        """
+        The cached ID list should expire when the first event in it ends.
+        """
+        now = timezone.make_aware(
+            datetime.combine(self.tomorrow, time(11, 0)),
+            timezone.get_current_timezone()
+        )
+        with mock.patch("django.utils.timezone.now", return_value=now), \
+                mock.patch.object(caches["pages"], "set",
+                                  wraps=caches["pages"].set) as set_:
+            event_ids = get_cached_event_ids(
+                Event.objects.upcoming(), filter_cache_key({})
+            )
+        self.assertEqual(event_ids, [self.event.pk])
+        # The event ends at 12:00, one hour after "now"
+        self.assertEqual(set_.call_args.args[2], 60 * 60)
+
+    def test_signals_bump_list_version(self):
+        """
+        Changing events, their categories or categories should invalidate
+        the cached listings.
+        """
+        changes = [
+            lambda: self.event.save(),
+            lambda: self.event.category.add(self.category),
+            lambda: self.category.save(),
+            lambda: self.event.delete(),
+        ]
+        for change in changes:
+            version = get_version("list")
+            change()
+            self.assertGreater(get_version("list"), version)
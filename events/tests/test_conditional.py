@@ -0,0 +1,161 @@
+"""
+Tests for conditional GET (ETag / Last-Modified) on event pages.
+"""
+
+from datetime import timedelta
+from django.contrib import messages
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from django.utils.http import http_date
+from django.contrib.auth.models import User
+from events.models import Category
+from events.tests.utils import create_event
+
+
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="password123"
+        )
+        self.category = Category.objects.create(name="Trail Run")
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+        self.event = self._create_event("Conditional Event")
+
+    def _create_event(self, title):
+        return create_event(self.user, title, categories=[self.category])
+
+    def _assert_revalidates(self, url):
+        """
+        A repeated request with the ETag should get an empty 304, without
+        rendering any template; return the ETag.
+        """
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        with self.assertTemplateNotUsed("base.html"):
+            response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        return etag
+
+    def test_event_detail(self):
+        """
+        The detail page should be revalidated by ETag and Last-Modified
+        until the event changes.
+        """
+        url = reverse("event_detail", args=[self.event.slug])
+        etag = self._assert_revalidates(url)
+
+        response = self.client.get(url)
+        self.assertEqual(
+            response["Last-Modified"], http_date(
+                self.event.updated_on.timestamp()
+            )
+        )
+        response = self.client.get(url, headers={
+            "if-modified-since": response["Last-Modified"]
+        })
+        self.assertEqual(response.status_code, 304)
+
+        self.event.cancelled = True
+        self.event.save()
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_event_detail_varies_by_user(self):
+        """
+        Logging in should change the ETag, as the navigation changes.
+        """
+        url = reverse("event_detail", args=[self.event.slug])
+        etag = self._assert_revalidates(url)
+        self.client.login(username="testuser", password="password123")
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_event_list(self):
+        """
+        The events list should be revalidated until an event is added or
+        changed, or other filters are requested.
+        """
+        url = reverse("events")
+        etag = self._assert_revalidates(url)
+
+        response = self.client.get(
+            url, {"difficulty": "BEGINNER"}, headers={"if-none-match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self._create_event("Another Event")
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        self.event.delete()
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_category_rename_changes_etag(self):
+        """
+        Renamed categories are shown on the cards, so they should change
+        the ETag too.
+        """
+        url = reverse("events")
+        etag = self._assert_revalidates(url)
+        self.category.name = "Trail Running"
+        self.category.save()
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile_and_home(self):
+        """
+        The profile and homepage should be revalidated as well.
+        """
+        self.client.login(username="testuser", password="password123")
+        self._assert_revalidates(reverse("profile"))
+        self._assert_revalidates(reverse("home"))
+
+    def test_login_again_changes_etag(self):
+        """
+        Logging out and in again, or a new CSRF secret, should change the
+        ETag, as the forms of the page hold a CSRF token of the old
+        secret.
+        """
+        url = reverse("profile")
+        self.client.login(username="testuser", password="password123")
+        etag = self._assert_revalidates(url)
+        self.client.logout()
+        self.client.login(username="testuser", password="password123")
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        self.client.cookies["csrftoken"] = get_random_string(32)
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_no_etag_with_pending_messages(self):
+        """
+        Pages with flash messages waiting to be shown should be rendered.
+        """
+        self.client.login(username="testuser", password="password123")
+        url = reverse("profile")
+        etag = self._assert_revalidates(url)
+
+        # Deleting shows a message on the profile page
+        other = self._create_event("Deleted Event")
+        self.client.post(reverse("event_delete", args=[other.slug]))
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        self.assertIn(
+            "deleted successfully",
+            " ".join(str(m) for m in messages.get_messages(
+                response.wsgi_request
+            )),
+        )
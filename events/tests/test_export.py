@@ -0,0 +1,146 @@
+"""
+Tests for the CSV / NDJSON export of events.
+"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.admin import helpers
+from django.contrib.auth.models import User
+from events.exporting import export_rows
+from events.models import Category, Event
+from events.tests.utils import create_event
+
+
+class ExportEventsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser(
+            username="admin", password="password123"
+        )
+        self.trail = Category.objects.create(name="Trail Run")
+        self.social = Category.objects.create(name="Social Run")
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+
+        self.hill = self._create_event("Hill Repeats")
+        self.hill.category.add(self.trail, self.social)
+        self.long = self._create_event("Long Run", cancelled=True)
+        self.long.category.add(self.trail)
+        self.easy = self._create_event("Easy Run")
+
+    def _create_event(self, title, cancelled=False):
+        return create_event(
+            self.user, title,
+            description="Bring, water\n\"and snacks\"",
+            difficulty=Event.Difficulty.BEGINNER,
+            location="Tempelhofer Feld",
+            cancelled=cancelled,
+        )
+
+    def _admin_export(self, action, url=None, **data):
+        self.client.login(username="admin", password="password123")
+        response = self.client.post(
+            url or reverse("admin:events_event_changelist"),
+            {"action": action, **data},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        return b"".join(response.streaming_content).decode()
+
+    def _write(self, content):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w", encoding="utf-8", newline="") as stream:
+            stream.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_admin_csv_selection(self):
+        """
+        The CSV export should contain the selected events.
+        """
+        content = self._admin_export("export_csv", **{
+            helpers.ACTION_CHECKBOX_NAME: [self.hill.pk, self.easy.pk],
+        })
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(
+            sorted(row["title"] for row in rows), ["Easy Run", "Hill Repeats"]
+        )
+        hill = next(row for row in rows if row["title"] == "Hill Repeats")
+        self.assertEqual(
+            sorted(hill["categories"].split(";")), ["Social Run", "Trail Run"]
+        )
+        self.assertEqual(hill["description"], self.hill.description)
+        self.assertEqual(hill["author"], "admin")
+        easy = next(row for row in rows if row["title"] == "Easy Run")
+        self.assertEqual(easy["categories"], "")
+
+    def test_admin_ndjson_filtered(self):
+        """
+        "Select all" should export every event matching the filters.
+        """
+        url = reverse("admin:events_event_changelist") + "?cancelled__exact=0"
+        content = self._admin_export("export_ndjson", url=url, **{
+            helpers.ACTION_CHECKBOX_NAME: [self.hill.pk],
+            "select_across": "1",
+        })
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(
+            sorted(row["title"] for row in rows), ["Easy Run", "Hill Repeats"]
+        )
+        hill = next(row for row in rows if row["title"] == "Hill Repeats")
+        self.assertEqual(
+            sorted(hill["categories"]), ["Social Run", "Trail Run"]
+        )
+        self.assertEqual(hill["start_time"], "10:00:00")
+
+    def test_constant_queries(self):
+        """
+        Exports should take one query, regardless of the number of
+        events.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(export_rows(Event.objects.all()))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(len(queries), 1)
+
+    def test_command(self):
+        """
+        The command should export the filtered events, in a format that
+        can be imported again.
+        """
+        stdout = io.StringIO()
+        call_command(
+            "export_events", "--filter", "cancelled=on", stdout=stdout
+        )
+        rows = list(csv.DictReader(io.StringIO(stdout.getvalue())))
+        self.assertEqual(
+            sorted(row["title"] for row in rows), ["Easy Run", "Hill Repeats"]
+        )
+        searched = io.StringIO()
+        call_command(
+            "export_events", "--format", "ndjson", "--filter", "q=hill",
+            stdout=searched,
+        )
+        self.assertEqual(
+            [json.loads(line)["title"] for line in searched.getvalue()
+             .splitlines()],
+            ["Hill Repeats"],
+        )
+
+        Event.objects.all().delete()
+        path = self._write(stdout.getvalue())
+        call_command(
+            "import_events", path, "--author", "admin",
+            stdout=io.StringIO(), stderr=io.StringIO(),
+        )
+        hill = Event.objects.get(title="Hill Repeats")
+        self.assertEqual(hill.description, self.hill.description)
+        self.assertEqual(hill.category.count(), 2)
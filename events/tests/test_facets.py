@@ -0,0 +1,174 @@
+"""
+Tests for the facet counts of the events list filters.
+"""
+
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from events.facets import aget_facet_counts, get_facet_counts
+from events.forms import EventFilterForm
+from events.models import Category, Event
+from events.tests.utils import create_event
+
+
+class FacetCountsTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="password123"
+        )
+        self.trail = Category.objects.create(name="Trail Run")
+        self.social = Category.objects.create(name="Social Run")
+        self.empty = Category.objects.create(name="Relay")
+        tomorrow = timezone.localdate() + timedelta(days=1)
+
+        self._create_event(
+            "Hill Repeats", tomorrow, Event.Difficulty.BEGINNER,
+            self.trail, self.social,
+        )
+        self._create_event(
+            "Forest Loop", tomorrow, Event.Difficulty.ADVANCED, self.trail
+        )
+        self._create_event(
+            "Park Social", tomorrow, Event.Difficulty.BEGINNER, self.social,
+            location="Olympiastadion",
+        )
+        # Past events aren't counted
+        self._create_event(
+            "Old Run", timezone.localdate() - timedelta(days=3),
+            Event.Difficulty.BEGINNER, self.trail,
+        )
+
+    def _create_event(self, title, date, difficulty, *categories,
+                      location="Tempelhofer Feld"):
+        return create_event(
+            self.user, title, categories, date=date, difficulty=difficulty,
+            location=location,
+        )
+
+    def _counts(self, data=None):
+        form = EventFilterForm(data)
+        return get_facet_counts(form)
+
+    def test_counts(self):
+        """
+        Upcoming events should be counted per category and difficulty.
+        """
+        facets = self._counts()
+        self.assertEqual(facets["category"], {
+            self.trail.pk: 2, self.social.pk: 2,
+        })
+        self.assertEqual(facets["difficulty"], {
+            Event.Difficulty.BEGINNER: 2, Event.Difficulty.ADVANCED: 1,
+        })
+
+    def test_counts_respect_other_filters(self):
+        """
+        Each facet should be counted with the other filters applied, but
+        not its own.
+        """
+        facets = self._counts({
+            "difficulty": [Event.Difficulty.BEGINNER],
+            "category": [self.trail.pk],
+        })
+        self.assertEqual(facets["category"], {
+            self.trail.pk: 1, self.social.pk: 2,
+        })
+        self.assertEqual(facets["difficulty"], {
+            Event.Difficulty.BEGINNER: 1, Event.Difficulty.ADVANCED: 1,
+        })
+
+        facets = self._counts({"q": "social"})
+        self.assertEqual(facets["category"], {self.social.pk: 1})
+
+        facets = self._counts({"near": "Tempelhofer Feld", "radius": "5"})
+        self.assertEqual(facets["difficulty"], {
+            Event.Difficulty.BEGINNER: 1, Event.Difficulty.ADVANCED: 1,
+        })
+
+    def test_counts_with_category_filter(self):
+        """
+        Events in several of the selected categories should be counted
+        once per difficulty, without a DISTINCT around the grouped query.
+        """
+        data = {"category": [self.trail.pk, self.social.pk]}
+        form = EventFilterForm(data)
+        form.is_valid()
+        with self.assertNumQueries(2) as queries:
+            facets = get_facet_counts(form)
+        self.assertEqual(facets["difficulty"], {
+            Event.Difficulty.BEGINNER: 2, Event.Difficulty.ADVANCED: 1,
+        })
+        self.assertEqual(facets["category"], {
+            self.trail.pk: 2, self.social.pk: 2,
+        })
+        for query in queries:
+            self.assertFalse(query["sql"].startswith("SELECT DISTINCT"))
+
+        facets = self._counts({**data, "difficulty": ["ADVANCED"]})
+        self.assertEqual(facets["category"], {self.trail.pk: 1})
+        self.assertEqual(facets["difficulty"], {
+            Event.Difficulty.BEGINNER: 2, Event.Difficulty.ADVANCED: 1,
+        })
+
+    async def test_async_counts(self):
+        """
+        The async version should count the same and share the cache with
+        the sync version.
+        """
+        data = {"category": [self.trail.pk, self.social.pk]}
+        form = EventFilterForm(data)
+        await sync_to_async(form.is_valid)()
+        facets = await aget_facet_counts(form)
+        self.assertEqual(facets["difficulty"], {
+            Event.Difficulty.BEGINNER: 2, Event.Difficulty.ADVANCED: 1,
+        })
+        self.assertEqual(await aget_facet_counts(form), facets)
+
+        # Cached under the same keys as by the sync version
+        def cached_counts():
+            with self.assertNumQueries(0):
+                return get_facet_counts(form)
+        self.assertEqual(await sync_to_async(cached_counts)(), facets)
+
+    def test_counts_are_cached(self):
+        """
+        Counts should be cached until events change.
+        """
+        self._counts()
+        with self.assertNumQueries(0):
+            self._counts()
+
+        self._create_event(
+            "Relay Race", timezone.localdate() + timedelta(days=2),
+            Event.Difficulty.INTERMEDIATE, self.empty,
+        )
+        facets = self._counts()
+        self.assertEqual(facets["category"][self.empty.pk], 1)
+        self.assertEqual(
+            facets["difficulty"][Event.Difficulty.INTERMEDIATE], 1
+        )
+
+    def test_counts_shown_in_filter_form(self):
+        """
+        The filter form should show the counts next to each option, also
+        when the rendered form comes from the cache.
+        """
+        url = reverse("events")
+        response = self.client.get(url)
+        self.assertContains(response, "Trail Run (2)")
+        self.assertContains(response, "Relay (0)")
+        self.assertContains(response, "Beginner friendly (2)")
+
+        self._create_event(
+            "Relay Race", timezone.localdate() + timedelta(days=2),
+            Event.Difficulty.INTERMEDIATE, self.empty,
+        )
+        response = self.client.get(url)
+        self.assertContains(response, "Relay (1)")
+        self.assertContains(response, "Intermediate (1)")
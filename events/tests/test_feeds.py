@@ -0,0 +1,187 @@
+"""
+Tests for the events app iCalendar feeds.
+"""
+
+from datetime import timedelta, timezone as dt_timezone
+from django.core.cache import caches
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from events.feeds import _escape, _fold, feed_token
+from events.models import Category, Event
+from events.tests.utils import create_event
+
+
+class CalendarFormatTestCase(TestCase):
+    def test_escape(self):
+        """
+        Special characters of TEXT values should be escaped.
+        """
+        self.assertEqual(
+            _escape("Run; walk, rest\\\nrepeat"),
+            "Run\\; walk\\, rest\\\\\\nrepeat",
+        )
+
+    def test_fold(self):
+        """
+        Lines should be folded at 75 octets without splitting characters.
+        """
+        line = "DESCRIPTION:" + "ä" * 100
+        folded = _fold(line)
+        self.assertTrue(folded.endswith("\r\n"))
+        lines = folded[:-2].split("\r\n")
+        self.assertTrue(all(len(part.encode()) <= 75 for part in lines))
+        self.assertTrue(all(part.startswith(" ") for part in lines[1:]))
+        self.assertEqual(
+            "".join(part[1:] if i else part for i, part in enumerate(lines)),
+            line,
+        )
+
+
+class EventFeedTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="password123"
+        )
+        self.other_user = User.objects.create_user(
+            username="otheruser", password="password123"
+        )
+        self.category = Category.objects.create(name="Trail, Run")
+        self.today = timezone.localdate()
+
+        self.beginner = self._create_event(
+            "Beginner Run", self.today + timedelta(days=1),
+            Event.Difficulty.BEGINNER,
+        )
+        self.beginner.category.add(self.category)
+        self.advanced = self._create_event(
+            "Advanced Run", self.today + timedelta(days=2),
+            Event.Difficulty.ADVANCED, author=self.other_user,
+        )
+        self.recent = self._create_event(
+            "Recent Run", self.today - timedelta(days=3),
+            Event.Difficulty.BEGINNER,
+        )
+        self.old = self._create_event(
+            "Old Run", self.today - timedelta(days=60),
+            Event.Difficulty.BEGINNER,
+        )
+
+    def _create_event(self, title, date, difficulty, author=None):
+        return create_event(
+            author or self.user, title,
+            description="<p>Meet at the <b>gate</b>.</p>",
+            date=date,
+            difficulty=difficulty,
+            location="Tempelhofer Feld",
+        )
+
+    def _feed(self, url, params=None, **headers):
+        response = self.client.get(url, params, headers=headers)
+        if response.status_code != 200:
+            return response, ""
+        self.assertIsInstance(response, StreamingHttpResponse)
+        content = b"".join(response.streaming_content).decode()
+        return response, content
+
+    def test_filtered_feed(self):
+        """
+        The feed should contain the filtered upcoming and recent events.
+        """
+        response, content = self._feed(
+            reverse("events_feed"), {"difficulty": "BEGINNER"}
+        )
+        self.assertEqual(
+            response["Content-Type"], "text/calendar; charset=utf-8"
+        )
+        self.assertTrue(content.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(content.endswith("END:VCALENDAR\r\n"))
+        self.assertIn("SUMMARY:Beginner Run\r\n", content)
+        self.assertIn("SUMMARY:Recent Run\r\n", content)
+        self.assertNotIn("Advanced Run", content)
+        self.assertNotIn("Old Run", content)
+
+        self.assertIn("CATEGORIES:Trail\\, Run\r\n", content)
+        self.assertIn("GEO:52.473000;13.401000\r\n", content)
+        self.assertIn("DESCRIPTION:Meet at the gate.", content)
+        self.assertIn(
+            reverse("event_detail", args=[self.beginner.slug]), content
+        )
+        starts_at = self.beginner.starts_at.astimezone(dt_timezone.utc)
+        self.assertIn(
+            f"DTSTART:{starts_at:%Y%m%dT%H%M%SZ}\r\n", content
+        )
+
+    def test_invalid_filters(self):
+        """
+        Invalid filters should be rejected.
+        """
+        response = self.client.get(
+            reverse("events_feed"), {"date_filter": "yesterday"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_conditional_get(self):
+        """
+        Unchanged feeds should be answered with 304.
+        """
+        url = reverse("events_feed")
+        response, content = self._feed(url)
+        etag = response["ETag"]
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.advanced.cancelled = True
+        self.advanced.save()
+        response, content = self._feed(url, **{"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("STATUS:CANCELLED", content)
+
+    def test_user_feed(self):
+        """
+        The private feed should contain the user's own events only.
+        """
+        url = reverse("user_events_feed", args=[feed_token(self.user)])
+        response, content = self._feed(url)
+        self.assertIn("Beginner Run", content)
+        self.assertIn("Recent Run", content)
+        self.assertNotIn("Advanced Run", content)
+        self.assertIn("private", response["Cache-Control"])
+
+        response = self.client.get(url, headers={
+            "if-none-match": response["ETag"]
+        })
+        self.assertEqual(response.status_code, 304)
+
+    def test_user_feed_token(self):
+        """
+        Forged tokens should be rejected and changing the password should
+        invalidate the feed URL.
+        """
+        token = feed_token(self.user)
+        forged = f"{self.other_user.pk}:{token.partition(':')[2]}"
+        for bad_token in (forged, "abc", "1:"):
+            response = self.client.get(
+                reverse("user_events_feed", args=[bad_token])
+            )
+            self.assertEqual(response.status_code, 404)
+
+        self.user.set_password("new-password")
+        self.user.save()
+        response = self.client.get(reverse("user_events_feed", args=[token]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_profile_links_feed(self):
+        """
+        The profile should link the user's private feed.
+        """
+        self.client.login(username="testuser", password="password123")
+        response = self.client.get(reverse("profile"))
+        self.assertContains(
+            response,
+            reverse("user_events_feed", args=[feed_token(self.user)]),
+        )
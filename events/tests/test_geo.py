@@ -0,0 +1,168 @@
+"""
+Tests for the events app geocoding and distance filter.
+"""
+
+from datetime import timedelta
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from events.forms import EventFilterForm
+from events.geo import bounding_box, haversine_km, within_radius
+from events.geocoding import GazetteerGeocoder
+from events.models import Event
+from events.tests.utils import create_event
+
+# Tempelhofer Feld in the gazetteer
+TEMPELHOF = (52.4730, 13.4010)
+
+
+class GazetteerGeocoderTestCase(TestCase):
+    def setUp(self):
+        self.geocoder = GazetteerGeocoder()
+
+    def test_geocode(self):
+        """
+        Places should be found regardless of case and punctuation, by the
+        most specific name they contain.
+        """
+        self.assertEqual(
+            self.geocoder.geocode("tempelhofer feld"), TEMPELHOF
+        )
+        self.assertEqual(
+            self.geocoder.geocode("Tempelhofer Feld, Berlin"), TEMPELHOF
+        )
+        self.assertEqual(
+            self.geocoder.geocode("Main entrance, Tempelhofer-Feld"),
+            TEMPELHOF,
+        )
+        self.assertIsNone(self.geocoder.geocode("Somewhere Else"))
+
+
+class DistanceTestCase(TestCase):
+    def test_haversine(self):
+        """
+        Berlin to Hamburg should be about 255 km.
+        """
+        self.assertAlmostEqual(
+            haversine_km(52.5200, 13.4050, 53.5511, 9.9937), 255, delta=1
+        )
+
+    def test_bounding_box_encloses_circle(self):
+        """
+        The box edges should lie at the radius from the centre.
+        """
+        min_lat, max_lat, min_lng, max_lng = bounding_box(*TEMPELHOF, 10)
+        self.assertAlmostEqual(
+            haversine_km(*TEMPELHOF, max_lat, TEMPELHOF[1]), 10
+        )
+        self.assertAlmostEqual(
+            haversine_km(*TEMPELHOF, TEMPELHOF[0], max_lng), 10, places=2
+        )
+        self.assertIsNone(bounding_box(89.99, 0, 10)[2])
+
+
+class EventDistanceFilterTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="password123"
+        )
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+        self.tempelhof = self._create_event("Feld Run", "Tempelhofer Feld")
+        self.hasenheide = self._create_event("Hasenheide Run", "Hasenheide")
+        self.potsdam = self._create_event("Potsdam Run", "Potsdam")
+        self.unknown = self._create_event("Unknown Run", "Track")
+
+    def _create_event(self, title, location):
+        return create_event(self.user, title, location=location)
+
+    def test_location_is_geocoded_on_save(self):
+        """
+        Coordinates should follow location changes but keep coordinates
+        set by hand while the location stays the same.
+        """
+        self.assertEqual(
+            (self.tempelhof.latitude, self.tempelhof.longitude), TEMPELHOF
+        )
+        self.assertIsNone(self.unknown.latitude)
+
+        event = Event.objects.get(pk=self.unknown.pk)
+        event.latitude, event.longitude = 52.5, 13.4
+        event.save()
+        event.refresh_from_db()
+        self.assertEqual((event.latitude, event.longitude), (52.5, 13.4))
+
+        event = Event.objects.get(pk=self.tempelhof.pk)
+        event.location = "Potsdam"
+        event.save(update_fields=["location"])
+        event.refresh_from_db()
+        self.assertEqual(
+            (event.latitude, event.longitude),
+            (self.potsdam.latitude, self.potsdam.longitude),
+        )
+
+    def test_within_radius(self):
+        """
+        Only events within the radius should be returned, with their
+        distance.
+        """
+        events = within_radius(Event.objects.all(), *TEMPELHOF, 5)
+        self.assertEqual(
+            set(events), {self.tempelhof, self.hasenheide}
+        )
+        self.assertEqual(
+            set(within_radius(Event.objects.all(), *TEMPELHOF, 50)),
+            {self.tempelhof, self.hasenheide, self.potsdam},
+        )
+        hasenheide = events.get(pk=self.hasenheide.pk)
+        self.assertAlmostEqual(
+            hasenheide.distance_km,
+            haversine_km(*TEMPELHOF, 52.4846, 13.4155),
+        )
+
+    def test_box_corner_outside_radius(self):
+        """
+        Events inside the bounding box but outside the circle should be
+        excluded by the exact distance check.
+        """
+        min_lat, max_lat, min_lng, max_lng = bounding_box(*TEMPELHOF, 5)
+        corner = self._create_event("Corner Run", "Track")
+        Event.objects.filter(pk=corner.pk).update(
+            latitude=max_lat - 0.001, longitude=max_lng - 0.001
+        )
+        self.assertNotIn(
+            corner, within_radius(Event.objects.all(), *TEMPELHOF, 5)
+        )
+
+    def test_event_list_radius_filter(self):
+        """
+        The events list should filter by distance from a place or from
+        the user's location.
+        """
+        response = self.client.get(
+            reverse("events"), {"near": "Tempelhofer Feld", "radius": 5}
+        )
+        self.assertEqual(
+            set(response.context["events"]),
+            {self.tempelhof, self.hasenheide},
+        )
+
+        response = self.client.get(
+            reverse("events"),
+            {"lat": TEMPELHOF[0], "lng": TEMPELHOF[1], "radius": 50},
+        )
+        self.assertEqual(len(response.context["events"]), 3)
+
+    @override_settings(EVENT_GEOCODER="events.geocoding.NullGeocoder")
+    def test_unknown_place(self):
+        """
+        Unknown places and a radius without a place should be reported.
+        """
+        form = EventFilterForm({"near": "Tempelhofer Feld", "radius": 5})
+        self.assertIn("near", form.errors)
+
+        form = EventFilterForm({"radius": 5})
+        self.assertIn("near", form.errors)
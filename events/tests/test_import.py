@@ -0,0 +1,248 @@
+"""
+Tests for the import_events management command.
+"""
+
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.contrib.auth.models import User
+from events.cache import get_version
+from events.importing import read_ics
+from events.models import Category, Event
+from events.search import search_events
+from events.tests.utils import create_event
+
+CSV_HEADER = (
+    "title,organizer,description,date,start_time,end_time,difficulty,"
+    "location,link,categories,cancelled\n"
+)
+
+
+class ImportEventsTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            username="club", password="password123"
+        )
+        self.trail = Category.objects.create(name="Trail Run")
+        self.social = Category.objects.create(name="Social Run")
+        self.date = timezone.localdate() + timedelta(days=7)
+
+    def _write(self, content, suffix):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, "w", encoding="utf-8") as stream:
+            stream.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def _csv_row(self, title, categories="", difficulty="Beginner",
+                 start="10:00", end="12:00", date=None):
+        date = (date or self.date).isoformat()
+        return (
+            f"{title},Running Club,Hill session,{date},{start},{end},"
+            f"{difficulty},Tempelhofer Feld,,{categories},\n"
+        )
+
+    def _import(self, path, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            "import_events", path, "--author", "club", *args,
+            stdout=stdout, stderr=stderr,
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_csv_import(self):
+        """
+        Rows should be imported with their categories, slugs and derived
+        fields, as if saved through Event.save().
+        """
+        path = self._write(
+            CSV_HEADER
+            + self._csv_row("Hill Repeats", "trail run;Social Run")
+            + self._csv_row("Long Run", "", "ADVANCED"),
+            ".csv",
+        )
+        version = get_version("list")
+        stdout, stderr = self._import(path)
+
+        self.assertIn("Imported 2 event(s)", stdout)
+        self.assertEqual(stderr, "")
+        event = Event.objects.get(title="Hill Repeats")
+        self.assertEqual(
+            event.slug, f"hill-repeats-{self.date.isoformat()}"
+        )
+        self.assertEqual(event.author, self.user)
+        self.assertEqual(event.difficulty, Event.Difficulty.BEGINNER)
+        self.assertEqual(set(event.category.all()), {self.trail, self.social})
+        self.assertIsNotNone(event.starts_at)
+        self.assertAlmostEqual(event.latitude, 52.473)
+        self.assertEqual(
+            Event.objects.get(title="Long Run").difficulty,
+            Event.Difficulty.ADVANCED,
+        )
+
+        # Bulk inserts bypass the signals, the importer takes their place
+        self.assertNotEqual(get_version("list"), version)
+        self.assertEqual(
+            list(search_events(Event.objects.all(), "repeats")), [event]
+        )
+
+    def test_row_errors(self):
+        """
+        Invalid and duplicate rows should be reported without stopping
+        the import.
+        """
+        create_event(self.user, "Existing Run", date=self.date)
+        yesterday = self.date - timedelta(days=8)
+        path = self._write(
+            CSV_HEADER
+            + self._csv_row("Valid Run")
+            + self._csv_row("Past Run", date=yesterday)
+            + self._csv_row("Late Run", start="12:00", end="10:00")
+            + self._csv_row("Unknown Category", "Swimming")
+            + self._csv_row("Existing Run")
+            + self._csv_row("Valid Run")
+            + self._csv_row("Bad Difficulty", difficulty="Easy"),
+            ".csv",
+        )
+        stdout, stderr = self._import(path, "--batch-size", "2")
+
+        self.assertIn("Imported 1 event(s), skipped 6 invalid row(s)", stdout)
+        self.assertIn("Line 3: An event cannot start in the past", stderr)
+        self.assertIn("Line 4: The end time", stderr)
+        self.assertIn("Line 5: Unknown category: Swimming", stderr)
+        self.assertIn("Line 6: An event titled 'Existing Run'", stderr)
+        self.assertIn("Line 7: An event titled 'Valid Run'", stderr)
+        self.assertIn("Line 8: difficulty:", stderr)
+        self.assertTrue(Event.objects.filter(title="Valid Run").exists())
+
+    def test_default_difficulty_and_dry_run(self):
+        """
+        --difficulty should fill in missing difficulties, and --dry-run
+        should validate without creating events.
+        """
+        path = self._write(
+            CSV_HEADER + self._csv_row("Easy Run", difficulty=""), ".csv"
+        )
+        stdout, stderr = self._import(path, "--dry-run")
+        self.assertIn("difficulty: This field is required.", stderr)
+
+        stdout, stderr = self._import(
+            path, "--dry-run", "--difficulty", "INTERMEDIATE"
+        )
+        self.assertIn("Would import 1 event(s).", stdout)
+        self.assertFalse(Event.objects.exists())
+
+    def test_constant_queries(self):
+        """
+        The number of queries should depend on the number of batches,
+        not on the number of rows.
+        """
+        def import_rows(count, offset):
+            path = self._write(CSV_HEADER + "".join(
+                self._csv_row(f"Run {offset + i}", "Trail Run")
+                for i in range(count)
+            ), ".csv")
+            with CaptureQueriesContext(connection) as queries:
+                self._import(path, "--batch-size", "100")
+            return len(queries)
+
+        self.assertEqual(import_rows(2, 0), import_rows(20, 100))
+        self.assertEqual(Event.objects.count(), 22)
+        self.assertEqual(
+            Event.category.through.objects.filter(
+                category=self.trail
+            ).count(),
+            22,
+        )
+
+    def test_json_import(self):
+        """
+        JSON arrays and JSON Lines should both be imported.
+        """
+        row = (
+            '{{"title": "{title}", "organizer": "Club", '
+            '"description": "Intervals", "date": "%s", '
+            '"start_time": "18:00", "end_time": "19:00", '
+            '"difficulty": "ADVANCED", "location": "Stadium", '
+            '"categories": ["Trail Run"], "cancelled": true}}'
+        ) % self.date.isoformat()
+        self._import(self._write(
+            "[" + row.format(title="Array Run") + "]", ".json"
+        ))
+        stdout, stderr = self._import(self._write(
+            row.format(title="Line Run") + "\nnot json\n", ".jsonl"
+        ))
+
+        self.assertIn("Line 2: Invalid JSON", stderr)
+        event = Event.objects.get(title="Line Run")
+        self.assertTrue(event.cancelled)
+        self.assertEqual(list(event.category.all()), [self.trail])
+        self.assertTrue(Event.objects.filter(title="Array Run").exists())
+
+    def test_ics_import(self):
+        """
+        VEVENTs should be imported, with folded lines and escaped text.
+        """
+        day = self.date.strftime("%Y%m%d")
+        path = self._write(
+            "BEGIN:VCALENDAR\r\n"
+            "BEGIN:VEVENT\r\n"
+            f"DTSTART;TZID=Europe/Berlin:{day}T090000\r\n"
+            f"DTEND;TZID=Europe/Berlin:{day}T103000\r\n"
+            "SUMMARY:Sunday Long Run\\, Easy\r\n"
+            "DESCRIPTION:Meet at the gate.\\nBring wat\r\n"
+            " er.\r\n"
+            'ORGANIZER;CN="Club: North":mailto:club@example.com\r\n'
+            "LOCATION:Tempelhofer Feld\r\n"
+            "CATEGORIES:Trail Run,Social Run\r\n"
+            "END:VEVENT\r\n"
+            "BEGIN:VEVENT\r\n"
+            f"DTSTART;VALUE=DATE:{day}\r\n"
+            f"DTEND;VALUE=DATE:{day}\r\n"
+            "SUMMARY:All Day\r\n"
+            "END:VEVENT\r\n"
+            "END:VCALENDAR\r\n",
+            ".ics",
+        )
+        stdout, stderr = self._import(path, "--difficulty", "BEGINNER")
+
+        self.assertIn("All-day events are not supported.", stderr)
+        event = Event.objects.get(title="Sunday Long Run, Easy")
+        self.assertEqual(event.organizer, "Club: North")
+        self.assertEqual(event.description, "Meet at the gate.\nBring water.")
+        self.assertEqual(event.category.count(), 2)
+        self.assertEqual(event.date, self.date)
+
+    def test_ics_multi_day(self):
+        """
+        Events spanning several days should be rejected.
+        """
+        rows = list(read_ics(StringIO(
+            "BEGIN:VEVENT\n"
+            "DTSTART:20300101T090000Z\n"
+            "DTEND:20300102T090000Z\n"
+            "SUMMARY:Ultra\n"
+            "END:VEVENT\n"
+        )))
+        self.assertEqual(len(rows), 1)
+        self.assertIn("several days", str(rows[0][1]))
+
+    def test_invalid_arguments(self):
+        """
+        Unknown users and formats should be rejected.
+        """
+        path = self._write(CSV_HEADER, ".txt")
+        with self.assertRaisesMessage(CommandError, "Unknown format"):
+            self._import(path)
+        with self.assertRaisesMessage(CommandError, "Unknown user"):
+            call_command("import_events", path, "--author", "nobody")
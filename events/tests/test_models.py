@@ -0,0 +1,128 @@
+"""
+Tests for the events app models.
+"""
+
+from datetime import datetime, time
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth.models import User
+from events.models import Event
+from events.tests.utils import create_event
+
+
+class EventQuerySetTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="password123"
+        )
+
+        # Freeze "now" at noon so events today can be placed on
+        # either side of the current time
+        self.now = timezone.make_aware(
+            datetime(2030, 6, 15, 12, 0), timezone.get_current_timezone()
+        )
+        patcher = mock.patch("django.utils.timezone.now",
+                             return_value=self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.today_ended = self._create_event(
+            "Ended This Morning", 15, time(8, 0), time(9, 0)
+        )
+        self.today_running = self._create_event(
+            "Running Now", 15, time(11, 0), time(13, 0)
+        )
+        self.today_later = self._create_event(
+            "Later Today", 15, time(18, 0), time(19, 0)
+        )
+        self.yesterday = self._create_event(
+            "Yesterday", 14, time(18, 0), time(19, 0)
+        )
+        self.tomorrow = self._create_event(
+            "Tomorrow", 16, time(8, 0), time(9, 0)
+        )
+
+    def _create_event(self, title, day, start_time, end_time):
+        return create_event(
+            self.user, title,
+            organizer="Organizer",
+            date=datetime(2030, 6, day).date(),
+            start_time=start_time,
+            end_time=end_time,
+            difficulty=Event.Difficulty.BEGINNER,
+        )
+
+    def test_upcoming_excludes_ended_events(self):
+        """
+        upcoming() should only return events whose end has not passed,
+        matching Event.is_past.
+        """
+        upcoming = set(Event.objects.upcoming())
+        self.assertEqual(
+            upcoming,
+            {self.today_running, self.today_later, self.tomorrow}
+        )
+        for event in upcoming:
+            self.assertFalse(event.is_past)
+
+    def test_past_is_complement_of_upcoming(self):
+        """
+        past() should return exactly the events excluded by upcoming().
+        """
+        past = set(Event.objects.past())
+        self.assertEqual(past, {self.today_ended, self.yesterday})
+        for event in past:
+            self.assertTrue(event.is_past)
+
+    def test_today_upcoming_only_returns_todays_events(self):
+        """
+        today_upcoming() should return today's events that have not ended.
+        """
+        self.assertEqual(
+            set(Event.objects.today_upcoming()),
+            {self.today_running, self.today_later}
+        )
+
+    def test_querysets_stay_lazy(self):
+        """
+        The chronological filters should return querysets that can be
+        chained and sliced in SQL.
+        """
+        queryset = Event.objects.filter(author=self.user).upcoming()
+        with self.assertNumQueries(1):
+            first = list(queryset.order_by("starts_at")[:1])
+        self.assertEqual(first, [self.today_running])
+
+
+class EventTimestampsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="password123"
+        )
+        self.event = create_event(
+            self.user, "Timed Event", date=datetime(2030, 6, 15).date()
+        )
+
+    def test_save_sets_aware_timestamps(self):
+        """
+        Saving an event should store timezone-aware starts_at and ends_at
+        matching its date and times in the current timezone.
+        """
+        starts_at = timezone.localtime(self.event.starts_at)
+        ends_at = timezone.localtime(self.event.ends_at)
+        self.assertEqual(starts_at.date(), self.event.date)
+        self.assertEqual(starts_at.time(), time(10, 0))
+        self.assertEqual(ends_at.time(), time(12, 0))
+
+    def test_save_keeps_timestamps_in_sync(self):
+        """
+        Changing the times, even with update_fields, should update the
+        stored timestamps.
+        """
+        self.event.end_time = time(13, 30)
+        self.event.save(update_fields=["end_time"])
+        self.event.refresh_from_db()
+        self.assertEqual(
+            timezone.localtime(self.event.ends_at).time(), time(13, 30)
+        )
@@ -0,0 +1,104 @@
+"""
+Tests for the paginated profile page and the cached event counts.
+"""
+
+from datetime import timedelta
+from unittest import mock
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from events.cache import get_author_summary
+from events.tests.utils import create_event
+
+
+class ProfilePaginationTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            username="club", password="password123"
+        )
+        self.other_user = User.objects.create_user(
+            username="other", password="password123"
+        )
+        today = timezone.localdate()
+        self.past = [
+            self._create_event(f"Past Run {i}", today - timedelta(days=i))
+            for i in range(1, 26)
+        ]
+        self.upcoming = [
+            self._create_event(f"Next Run {i}", today + timedelta(days=i))
+            for i in range(1, 12)
+        ]
+        self.upcoming[0].cancelled = True
+        self.upcoming[0].save()
+        self._create_event(
+            "Other Run", today + timedelta(days=1), author=self.other_user
+        )
+        self.client.login(username="club", password="password123")
+
+    def _create_event(self, title, date, author=None):
+        return create_event(author or self.user, title, date=date)
+
+    def test_past_events_paginated(self):
+        """
+        Past events should be paginated by ?past_page=, most recent first,
+        independently of the upcoming events.
+        """
+        url = reverse("profile")
+        response = self.client.get(url, {"page": 2, "past_page": 2})
+        self.assertEqual(
+            list(response.context["past_events"]), self.past[10:20]
+        )
+        self.assertEqual(
+            list(response.context["upcoming_events"]), self.upcoming[9:]
+        )
+        # Each list's links keep the page of the other list
+        self.assertContains(response, "?past_page=3&page=2")
+        self.assertContains(response, "?page=1&past_page=2")
+
+        response = self.client.get(url, {"past_page": 99})
+        self.assertEqual(response.status_code, 404)
+
+    def test_event_counts(self):
+        """
+        The profile should show the cached numbers of the user's events.
+        """
+        response = self.client.get(reverse("profile"))
+        self.assertContains(response, "11 upcoming (1 cancelled)")
+        self.assertContains(response, "25 past")
+        self.assertEqual(response.context["event_counts"]["total"], 36)
+
+    def test_no_count_queries(self):
+        """
+        Pagination should take its counts from the summary, which is
+        cached after the first request.
+        """
+        url = reverse("profile")
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {"past_page": 2})
+        self.assertFalse(any("COUNT(" in query["sql"] for query in queries))
+
+    def test_summary_invalidation(self):
+        """
+        The summary should be recomputed after event changes and when
+        the next upcoming event ends.
+        """
+        summary = get_author_summary(self.user)
+        self.assertEqual((summary["upcoming"], summary["past"]), (11, 25))
+        with self.assertNumQueries(0):
+            get_author_summary(self.user)
+
+        self.upcoming[-1].delete()
+        summary = get_author_summary(self.user)
+        self.assertEqual(summary["upcoming"], 10)
+
+        ended = self.upcoming[0].ends_at + timedelta(seconds=1)
+        with mock.patch("django.utils.timezone.now", return_value=ended):
+            summary = get_author_summary(self.user)
+        self.assertEqual((summary["upcoming"], summary["past"]), (9, 26))
@@ -0,0 +1,115 @@
+"""
+Query plan tests for the events app views.
+
+Seeds the events table, runs EXPLAIN on the main query of each listing
+view and fails if the database falls back to a sequential scan.
+"""
+
+import re
+from datetime import timedelta, time
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from events.models import Event
+from events.views import EventListView, ProfileView
+
+# "SCAN events_event" on SQLite (without "USING INDEX"),
+# "Seq Scan on events_event" on PostgreSQL
+SEQ_SCAN_PATTERNS = {
+    "sqlite": re.compile(r"\bSCAN events_event\b(?! USING)"),
+    "postgresql": re.compile(r"Seq Scan on events_event\b"),
+}
+
+
+class EventQueryPlanTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="testuser", password="password123"
+        )
+        today = timezone.localdate()
+        difficulties = Event.Difficulty.values
+
+        # Seed enough rows spread over a year that an index is worthwhile
+        events = []
+        for i in range(2000):
+            event = Event(
+                title=f"Seeded Event {i}",
+                slug=f"seeded-event-{i}",
+                organizer="Organizer",
+                description="Seeded event",
+                date=today + timedelta(days=i % 365 - 100),
+                start_time=time(i % 20, 0),
+                end_time=time(i % 20 + 1, 0),
+                difficulty=difficulties[i % len(difficulties)],
+                location="Park",
+                cancelled=i % 7 == 0,
+                author=cls.user,
+            )
+            event.set_timestamps()
+            events.append(event)
+        Event.objects.bulk_create(events)
+
+        # Give the query planner up-to-date statistics
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def _view_queryset(self, view_class, url, data=None):
+        """Return the main queryset the given view would evaluate."""
+        request = self.factory.get(url, data or {})
+        request.user = self.user
+        view = view_class()
+        view.setup(request)
+        return view.get_queryset()
+
+    def assertNoSeqScan(self, queryset):
+        """Fail if the query plan contains a sequential scan."""
+        pattern = SEQ_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            self.skipTest(f"No plan check for {connection.vendor}")
+        plan = queryset.explain()
+        self.assertIsNone(
+            pattern.search(plan),
+            f"Sequential scan in query plan:\n{plan}"
+        )
+
+    def test_todays_events_query_uses_index(self):
+        """
+        The homepage query (run when the cached list of today's events
+        expires) should search today's events by index.
+        """
+        self.assertNoSeqScan(
+            Event.objects.today_upcoming().order_by("starts_at")
+        )
+
+    def test_event_list_queries_use_index(self):
+        """
+        The events list query should use an index with and without the
+        difficulty and cancelled filters.
+        """
+        url = reverse("events")
+        for data in (
+            {},
+            {"difficulty": [Event.Difficulty.BEGINNER]},
+            {"cancelled": "on"},
+        ):
+            with self.subTest(filters=data):
+                queryset = self._view_queryset(EventListView, url, data)
+                self.assertNoSeqScan(queryset)
+
+    def test_profile_queries_use_index(self):
+        """
+        The profile page queries for upcoming and past events should use
+        the author index.
+        """
+        upcoming = self._view_queryset(ProfileView, reverse("profile"))
+        self.assertNoSeqScan(upcoming)
+        past = Event.objects.filter(author=self.user).past().order_by(
+            "-starts_at"
+        )
+        self.assertNoSeqScan(past)
@@ -0,0 +1,163 @@
+"""
+Tests for the events app full-text search.
+"""
+
+from datetime import timedelta
+from unittest import mock
+from django.contrib.postgres.search import SearchVector
+from django.core.cache import caches
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from events.cache import filter_cache_key
+from events.models import Event
+from events.search import index_events, search_events
+from events.tests.utils import create_event
+
+
+class EventSearchTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="password123"
+        )
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+        self.trail_run = self._create_event(
+            "Forest Trail Run",
+            description="<p>Hilly <strong>forest</strong> loops.</p>",
+            days=2,
+        )
+        self.park_run = self._create_event(
+            "Park Run",
+            description="<p>Flat loops, finishing near the forest.</p>",
+            days=1,
+        )
+        self.track_session = self._create_event(
+            "Track Session",
+            description="<p>Intervals &amp; sprints.</p>",
+            location="Olympic Stadium",
+        )
+
+    def _create_event(self, title, description, location="Park", days=1):
+        return create_event(
+            self.user, title,
+            description=description,
+            date=self.tomorrow + timedelta(days=days - 1),
+            location=location,
+        )
+
+    def _search(self, query):
+        return list(search_events(Event.objects.all(), query))
+
+    def test_results_are_ranked_by_relevance(self):
+        """
+        A title match should rank above a description match, even for a
+        later event.
+        """
+        self.assertEqual(
+            self._search("forest"), [self.trail_run, self.park_run]
+        )
+
+    def test_equal_relevance_is_ordered_by_date(self):
+        """
+        Results with the same relevance should be ordered by start.
+        """
+        later = self._create_event("Hill Repeats One", "Hills", days=3)
+        earlier = self._create_event("Hill Repeats Two", "Hills", days=2)
+        self.assertEqual(self._search("repeats"), [earlier, later])
+
+    def test_all_words_and_prefixes_match(self):
+        """
+        Every word of the query should match, as a word or prefix, in any
+        of the indexed fields.
+        """
+        self.assertEqual(self._search("olymp sprint"), [self.track_session])
+        self.assertEqual(self._search("track forest"), [])
+
+    def test_html_is_not_indexed(self):
+        """
+        Only the plain text of the description should be indexed.
+        """
+        self.assertEqual(self._search("strong"), [])
+        self.assertEqual(self._search("amp"), [])
+
+    def test_query_syntax_is_ignored(self):
+        """
+        Search operators and quotes in user input should not cause errors.
+        """
+        self.assertEqual(self._search('"forest AND" NEAR(*'), [])
+        self.assertEqual(self._search("(("), [])
+
+    def test_index_follows_changes(self):
+        """
+        Updated events should be found by their new text, deleted events
+        not at all.
+        """
+        self.park_run.title = "Park Parkrun"
+        self.park_run.description = "Flat loops"
+        self.park_run.save()
+        self.assertEqual(self._search("parkrun"), [self.park_run])
+        self.assertEqual(self._search("forest"), [self.trail_run])
+
+        self.trail_run.delete()
+        self.assertEqual(self._search("hilly"), [])
+
+    def test_postgres_batch_is_indexed_in_one_statement(self):
+        """
+        On PostgreSQL, a batch of events should be indexed by one UPDATE
+        computing the search vectors from the columns.
+        """
+        events = [self.trail_run, self.park_run, self.track_session]
+        with mock.patch("events.search._vendor", return_value="postgresql"), \
+                mock.patch.object(QuerySet, "update", autospec=True) as update:
+            index_events(events)
+        update.assert_called_once()
+        queryset = update.call_args.args[0]
+        self.assertCountEqual(queryset, events)
+        # One weighted vector per indexed field
+        vector = update.call_args.kwargs["search_vector"]
+        self.assertEqual(len([
+            expression for expression in vector.flatten()
+            if isinstance(expression, SearchVector)
+        ]), 4)
+
+    def test_event_list_search(self):
+        """
+        The events list should search by ?q= and combine the search with
+        the other filters.
+        """
+        response = self.client.get(reverse("events"), {"q": "forest"})
+        self.assertEqual(
+            list(response.context["events"]),
+            [self.trail_run, self.park_run],
+        )
+
+        response = self.client.get(
+            reverse("events"), {"q": "forest", "date_filter": "tomorrow"}
+        )
+        self.assertEqual(list(response.context["events"]), [self.park_run])
+
+    @override_settings(EVENT_LIST_PAGINATION="cursor")
+    def test_search_uses_page_pagination(self):
+        """
+        Searches should be paginated by page number, as relevance order
+        has no cursor.
+        """
+        response = self.client.get(reverse("events"), {"q": "forest"})
+        self.assertFalse(response.context["cursor_pagination"])
+        self.assertEqual(len(response.context["events"]), 2)
+
+    def test_filter_key_includes_normalized_query(self):
+        """
+        Searches should be cached apart, ignoring case and whitespace.
+        """
+        self.assertNotEqual(
+            filter_cache_key({"q": "forest"}), filter_cache_key({})
+        )
+        self.assertEqual(
+            filter_cache_key({"q": "Forest  Trail "}),
+            filter_cache_key({"q": "forest trail"}),
+        )
@@ -0,0 +1,178 @@
+"""
+Tests for the owner-scoped event actions and the bulk actions of the
+profile page.
+"""
+
+from datetime import timedelta
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from events.cache import get_author_summary, get_version
+from events.models import Event
+from events.services import (
+    EventHasEnded, EventNotFound, bulk_delete, bulk_set_cancelled,
+    get_owned_event, toggle_event_cancelled
+)
+from events.tests.utils import create_event
+
+
+class EventServicesTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            username="club", password="password123"
+        )
+        self.other_user = User.objects.create_user(
+            username="other", password="password123"
+        )
+        today = timezone.localdate()
+        self.first = self._create_event("First Run", today + timedelta(1))
+        self.second = self._create_event("Second Run", today + timedelta(2))
+        self.past = self._create_event("Old Run", today - timedelta(3))
+        self.other = self._create_event(
+            "Other Run", today + timedelta(1), author=self.other_user
+        )
+
+    def _create_event(self, title, date, author=None):
+        return create_event(author or self.user, title, date=date)
+
+    def test_get_owned_event(self):
+        """
+        Events should be fetched with one query, only for their author.
+        """
+        with self.assertNumQueries(1):
+            event = get_owned_event(self.user, self.first.slug)
+        self.assertEqual(event, self.first)
+
+        with self.assertRaises(EventNotFound):
+            get_owned_event(self.user, self.other.slug)
+        with self.assertRaises(EventHasEnded):
+            get_owned_event(self.user, self.past.slug, upcoming=True)
+
+    def test_toggle_runs_one_update(self):
+        """
+        Toggling should flip the status with one conditional UPDATE and
+        touch updated_on, so cached cards are rendered again.
+        """
+        updated_on = self.first.updated_on
+        with CaptureQueriesContext(connection) as queries:
+            event = toggle_event_cancelled(self.user, self.first.slug)
+        updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn("NOT", updates[0])
+        self.assertTrue(event.cancelled)
+
+        self.first.refresh_from_db()
+        self.assertTrue(self.first.cancelled)
+        self.assertGreater(self.first.updated_on, updated_on)
+        event = toggle_event_cancelled(self.user, self.first.slug)
+        self.assertFalse(event.cancelled)
+
+    def test_toggle_refused(self):
+        """
+        Events of other users and past events should not be toggled.
+        """
+        with self.assertRaises(EventNotFound):
+            toggle_event_cancelled(self.user, self.other.slug)
+        with self.assertRaises(EventHasEnded):
+            toggle_event_cancelled(self.user, self.past.slug)
+
+        self.other.refresh_from_db()
+        self.past.refresh_from_db()
+        self.assertFalse(self.other.cancelled)
+        self.assertFalse(self.past.cancelled)
+
+    def test_updates_invalidate_cached_listings(self):
+        """
+        UPDATE queries don't send signals, so the actions should bump the
+        listings' version themselves.
+        """
+        self.assertEqual(get_author_summary(self.user)["cancelled"], 0)
+        version = get_version("list")
+        toggle_event_cancelled(self.user, self.first.slug)
+        self.assertNotEqual(get_version("list"), version)
+        self.assertEqual(get_author_summary(self.user)["cancelled"], 1)
+
+    def test_bulk_set_cancelled(self):
+        """
+        Only upcoming events of the user should be changed, with one
+        UPDATE.
+        """
+        pks = [self.first.pk, self.second.pk, self.past.pk, self.other.pk]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(bulk_set_cancelled(self.user, pks, True), 2)
+        updates = [q for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            set(Event.objects.filter(cancelled=True)),
+            {self.first, self.second},
+        )
+
+        # Events with that status already are skipped
+        self.assertEqual(bulk_set_cancelled(self.user, pks, True), 0)
+        self.assertEqual(bulk_set_cancelled(self.user, pks, False), 2)
+
+    def test_bulk_delete(self):
+        """
+        Events of the user, past or upcoming, should be deleted; events
+        of other users not.
+        """
+        pks = [self.first.pk, self.past.pk, self.other.pk]
+        self.assertEqual(bulk_delete(self.user, pks), 2)
+        self.assertEqual(
+            set(Event.objects.all()), {self.second, self.other}
+        )
+
+
+class EventBulkActionViewTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="club", password="password123"
+        )
+        self.event = create_event(self.user, "Bulk Run")
+        self.url = reverse("event_bulk_action")
+        self.client.login(username="club", password="password123")
+
+    def test_bulk_actions(self):
+        """
+        The selected events should be cancelled, reactivated or deleted,
+        with a message saying how many.
+        """
+        response = self.client.post(
+            self.url, {"action": "cancel", "events": [self.event.pk]},
+            follow=True,
+        )
+        self.assertRedirects(response, reverse("profile"))
+        self.assertContains(response, "1 event(s) cancelled.")
+        self.event.refresh_from_db()
+        self.assertTrue(self.event.cancelled)
+
+        self.client.post(
+            self.url, {"action": "reactivate", "events": [self.event.pk]}
+        )
+        self.event.refresh_from_db()
+        self.assertFalse(self.event.cancelled)
+
+        self.client.post(
+            self.url, {"action": "delete", "events": [self.event.pk]}
+        )
+        self.assertFalse(Event.objects.exists())
+
+    def test_invalid_requests(self):
+        """
+        Empty or invalid selections and GET requests should change
+        nothing.
+        """
+        response = self.client.post(
+            self.url, {"action": "delete"}, follow=True
+        )
+        self.assertContains(response, "Please select at least one event.")
+        self.client.post(self.url, {"action": "delete", "events": ["x"]})
+        self.client.post(self.url, {"action": "drop", "events": [1]})
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        self.assertTrue(Event.objects.exists())
@@ -0,0 +1,243 @@
+"""
+Tests for the incremental sync of partner feeds.
+"""
+
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.contrib.auth.models import User
+from events.cache import get_version
+from events.models import Category, Event
+from events.sync import FeedSync, FileFeed
+
+
+class FeedSyncTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            username="club", password="password123"
+        )
+        self.trail = Category.objects.create(name="Trail Run")
+        self.social = Category.objects.create(name="Social Run")
+        self.date = timezone.localdate() + timedelta(days=7)
+        handle, self.path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def _entry(self, uid, title, **fields):
+        entry = {
+            "uid": uid,
+            "title": title,
+            "organizer": "North Club",
+            "description": "Weekly run",
+            "date": self.date.isoformat(),
+            "start_time": "10:00",
+            "end_time": "11:00",
+            "difficulty": "BEGINNER",
+            "location": "Tempelhofer Feld",
+            "categories": ["Trail Run"],
+        }
+        entry.update(fields)
+        return entry
+
+    def _sync(self, *entries):
+        with open(self.path, "w", encoding="utf-8") as stream:
+            for entry in entries:
+                stream.write(json.dumps(entry) + "\n")
+        return FeedSync(FileFeed("north", self.path), self.user).run()
+
+    def test_unchanged_feed(self):
+        """
+        Syncing an unchanged feed again shouldn't write anything.
+        """
+        entries = [
+            self._entry("a", "Run A"),
+            self._entry("b", "Run B", categories=[]),
+        ]
+        sync = self._sync(*entries)
+        self.assertEqual((sync.created, sync.updated, sync.cancelled), (
+            2, 0, 0
+        ))
+        event = Event.objects.get(external_id="a")
+        self.assertEqual(event.external_source, "north")
+        self.assertEqual(len(event.content_hash), 64)
+        self.assertEqual(list(event.category.all()), [self.trail])
+
+        version = get_version("list")
+        with CaptureQueriesContext(connection) as queries:
+            sync = self._sync(*entries)
+        self.assertEqual(sync.unchanged, 2)
+        self.assertEqual((sync.created, sync.updated, sync.cancelled), (
+            0, 0, 0
+        ))
+        self.assertFalse(any(
+            query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+            for query in queries
+        ))
+        self.assertEqual(get_version("list"), version)
+        self.assertEqual(
+            Event.objects.get(pk=event.pk).updated_on, event.updated_on
+        )
+
+    def test_changed_entries(self):
+        """
+        Changed entries should be updated in place, keeping their slugs,
+        with their categories replaced.
+        """
+        self._sync(self._entry("a", "Run A"), self._entry("b", "Run B"))
+        event = Event.objects.get(external_id="a")
+        version = get_version("list")
+
+        sync = self._sync(
+            self._entry(
+                "a", "Run A Moved", location="Olympiastadion",
+                start_time="09:00", categories=["social run"],
+            ),
+            self._entry("b", "Run B"),
+        )
+        self.assertEqual((sync.updated, sync.unchanged), (1, 1))
+        updated = Event.objects.get(pk=event.pk)
+        self.assertEqual(updated.title, "Run A Moved")
+        self.assertEqual(updated.slug, event.slug)
+        self.assertEqual(timezone.localtime(updated.starts_at).hour, 9)
+        self.assertNotEqual(updated.latitude, event.latitude)
+        self.assertGreater(updated.updated_on, event.updated_on)
+        self.assertEqual(list(updated.category.all()), [self.social])
+        self.assertNotEqual(get_version("list"), version)
+
+    def test_update_queries(self):
+        """
+        Updates should take the same number of queries for any number of
+        changed entries.
+        """
+        def sync_changes(count, description):
+            entries = [
+                self._entry(str(i), f"Run {i}", description=description)
+                for i in range(count)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                sync = self._sync(*entries)
+            return sync, len(queries)
+
+        sync_changes(2, "First")
+        sync, few = sync_changes(2, "Second")
+        self.assertEqual(sync.updated, 2)
+        sync_changes(20, "First")
+        sync, many = sync_changes(20, "Second")
+        self.assertEqual(sync.updated, 20)
+        self.assertEqual(few, many)
+
+    def test_failed_update_batch(self):
+        """
+        A failing batch of updates should be reported per line without
+        stopping the other batches.
+        """
+        self._sync(self._entry("a", "Run A"), self._entry("b", "Run B"))
+        with open(self.path, "w", encoding="utf-8") as stream:
+            for entry in (
+                self._entry("a", "Run A Moved"),
+                self._entry("b", "Run B Moved"),
+            ):
+                stream.write(json.dumps(entry) + "\n")
+
+        bulk_update = Event.objects.bulk_update
+        failures = [DatabaseError("deadlock detected")]
+
+        def flaky_bulk_update(*args, **kwargs):
+            if failures:
+                raise failures.pop()
+            return bulk_update(*args, **kwargs)
+
+        with mock.patch.object(
+            Event.objects, "bulk_update", side_effect=flaky_bulk_update
+        ):
+            sync = FeedSync(
+                FileFeed("north", self.path), self.user, batch_size=1
+            ).run()
+        self.assertEqual(sync.updated, 1)
+        self.assertEqual(
+            sync.errors, [(1, "Batch failed: deadlock detected")]
+        )
+        self.assertEqual(
+            Event.objects.get(external_id="b").title, "Run B Moved"
+        )
+
+    def test_removed_entries(self):
+        """
+        Upcoming events removed from the feed should be cancelled, and
+        reactivated if they come back.
+        """
+        self._sync(self._entry("a", "Run A"), self._entry("b", "Run B"))
+
+        sync = self._sync(self._entry("a", "Run A"))
+        self.assertEqual(sync.cancelled, 1)
+        self.assertTrue(Event.objects.get(external_id="b").cancelled)
+
+        sync = self._sync(self._entry("a", "Run A"), self._entry("b", "Run B"))
+        self.assertEqual(sync.updated, 1)
+        self.assertFalse(Event.objects.get(external_id="b").cancelled)
+
+    def test_invalid_entries(self):
+        """
+        Invalid entries should be reported and neither written nor
+        cancelled; an empty feed shouldn't cancel anything.
+        """
+        self._sync(self._entry("a", "Run A"), self._entry("b", "Run B"))
+
+        sync = self._sync(
+            self._entry("a", "Run A", end_time="09:00"),
+            self._entry("b", "Run B"),
+            self._entry("b", "Run B Again"),
+            self._entry("", "Run Without ID"),
+        )
+        self.assertEqual(len(sync.errors), 3)
+        self.assertEqual(sync.cancelled, 0)
+        self.assertEqual(Event.objects.get(external_id="a").title, "Run A")
+        self.assertFalse(Event.objects.filter(cancelled=True).exists())
+
+        sync = self._sync()
+        self.assertEqual(sync.cancelled, 0)
+
+    def test_started_events(self):
+        """
+        Entries of events that already started should be skipped, and
+        past events shouldn't be cancelled.
+        """
+        self._sync(self._entry("a", "Run A"))
+        Event.objects.filter(external_id="a").update(
+            starts_at=timezone.now() - timedelta(days=1)
+        )
+        yesterday = timezone.localdate() - timedelta(days=1)
+        sync = self._sync(
+            self._entry("old", "Old Run", date=yesterday.isoformat()),
+            self._entry("b", "Run B"),
+        )
+        self.assertEqual((sync.skipped, sync.created, sync.cancelled), (
+            1, 1, 0
+        ))
+        self.assertEqual(sync.errors, [])
+        self.assertFalse(Event.objects.filter(external_id="old").exists())
+
+    def test_command(self):
+        """
+        The command should sync the feed and report the result.
+        """
+        with open(self.path, "w", encoding="utf-8") as stream:
+            stream.write(json.dumps(self._entry("a", "Run A")) + "\n")
+        stdout = StringIO()
+        call_command(
+            "sync_events", "north", self.path, "--author", "club",
+            stdout=stdout,
+        )
+        self.assertIn("north: 1 created, 0 updated", stdout.getvalue())
+        self.assertTrue(Event.objects.filter(external_id="a").exists())
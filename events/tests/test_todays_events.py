@@ -0,0 +1,133 @@
+"""
+Tests for the cached list of today's events on the homepage.
+"""
+
+from datetime import datetime, time, timedelta
+from unittest import mock
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from events.cache import get_todays_events, get_version
+from events.models import Category
+from events.tests.utils import create_event
+
+
+class TodaysEventsCacheTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="password123"
+        )
+        self.category = Category.objects.create(name="Trail Run")
+        self.today = timezone.localdate()
+        self.noon = self._at(time(12, 0))
+
+        # Freeze "now" at noon, so the events below are upcoming
+        patcher = mock.patch(
+            "django.utils.timezone.now", return_value=self.noon
+        )
+        self.now = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.early = self._create_event("Lunch Run", time(12, 30), time(13, 0))
+        self.late = self._create_event("Evening Run", time(18, 0), time(19, 0))
+        self.tomorrow = self._create_event(
+            "Tomorrow Run", time(18, 0), time(19, 0),
+            date=self.today + timedelta(days=1),
+        )
+
+    def _at(self, value, days=0):
+        return timezone.make_aware(
+            datetime.combine(self.today + timedelta(days=days), value),
+            timezone.get_current_timezone(),
+        )
+
+    def _create_event(self, title, start_time, end_time, date=None):
+        return create_event(
+            self.user, title, categories=[self.category],
+            date=date or self.today,
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+    def test_cache_hits_run_no_queries(self):
+        """
+        Once cached, neither the list nor the homepage should query the
+        database (for anonymous visitors).
+        """
+        self.assertEqual(get_todays_events(), [self.early, self.late])
+        with self.assertNumQueries(0):
+            events = get_todays_events()
+            self.assertEqual(
+                [category.name for category in events[0].category.all()],
+                ["Trail Run"],
+            )
+
+        self.client.get(reverse("home"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("home"))
+        self.assertContains(response, "Lunch Run")
+        self.assertContains(response, "Trail Run")
+        self.assertNotContains(response, "Tomorrow Run")
+
+    def test_expires_when_next_event_ends(self):
+        """
+        The list should be computed again right after its first event
+        ended, and at midnight.
+        """
+        get_todays_events()
+
+        self.now.return_value = self.early.ends_at
+        with self.assertNumQueries(0):
+            self.assertEqual(get_todays_events(), [self.early, self.late])
+
+        self.now.return_value = self.early.ends_at + timedelta(seconds=1)
+        self.assertEqual(get_todays_events(), [self.late])
+
+        self.now.return_value = self._at(time(0, 0), days=1)
+        self.assertEqual(get_todays_events(), [self.tomorrow])
+
+    def test_invalidated_by_todays_events_only(self):
+        """
+        Changes to today's events (also moving them away from today)
+        should invalidate the list, changes to other days' events not.
+        """
+        get_todays_events()
+        version = get_version("today")
+        self.tomorrow.location = "Stadium"
+        self.tomorrow.save()
+        self.assertEqual(get_version("today"), version)
+
+        self.late.cancelled = True
+        self.late.save()
+        self.assertTrue(get_todays_events()[1].cancelled)
+
+        self.early.date = self.today + timedelta(days=1)
+        self.early.save()
+        self.assertEqual(get_todays_events(), [self.late])
+
+        self.tomorrow.date = self.today
+        self.tomorrow.save()
+        self.assertEqual(get_todays_events(), [self.late, self.tomorrow])
+
+        self.late.delete()
+        self.assertEqual(get_todays_events(), [self.tomorrow])
+
+    def test_invalidated_by_category_changes(self):
+        """
+        Renaming or assigning categories should invalidate the list, as
+        it's cached with the events' categories.
+        """
+        get_todays_events()
+        self.category.name = "Trail Running"
+        self.category.save()
+        events = get_todays_events()
+        self.assertEqual(events[0].category.all()[0].name, "Trail Running")
+
+        social = Category.objects.create(name="Social Run")
+        self.early.category.add(social)
+        events = get_todays_events()
+        self.assertEqual(len(events[0].category.all()), 2)
@@ -2,16 +2,25 @@
 Tests for the events app views.
 """
 
-from datetime import timedelta, time
-from django.test import TestCase
+from datetime import datetime, timedelta, time
+from unittest import mock
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from django.contrib.auth.models import User
+from django.core.cache import caches
+from events.cache import bump_version
 from events.models import Event, Category
+from events.tests.utils import create_event
 
 
 class EventViewsTestCase(TestCase):
     def setUp(self):
+        # Start every test with empty caches
+        self._clear_caches()
+
         # Users
         self.user = User.objects.create_user(
             username="testuser", password="password123"
@@ -113,6 +122,11 @@ class EventViewsTestCase(TestCase):
         )
         self.other_users_event.category.add(self.category2)
 
+    def _clear_caches(self):
+        """Empty all named caches."""
+        for cache in caches.all():
+            cache.clear()
+
     # ------------------------------
     # TodaysEventsListView
     # ------------------------------
@@ -212,6 +226,122 @@ class EventViewsTestCase(TestCase):
         for event in response.context["events"]:
             self.assertFalse(event.cancelled)
 
+    @override_settings(EVENT_LIST_PAGINATION="cursor")
+    def test_event_list_cursor_pagination(self):
+        """
+        Test that cursor mode pages through all upcoming events in order
+        with ?after=/?before= tokens and without a COUNT query.
+        """
+        self._create_events(12, self.tomorrow + timedelta(days=1))
+        expected = list(Event.objects.upcoming().order_by("starts_at", "pk"))
+        url = reverse("events")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"difficulty": "BEGINNER"})
+        # Apart from the aggregate fingerprint of the page's ETag and the
+        # grouped facet counts
+        self.assertFalse(any(
+            "COUNT(" in query["sql"] and "MAX(" not in query["sql"]
+            and "GROUP BY" not in query["sql"]
+            for query in queries
+        ))
+
+        # Filters are kept in the cursor links
+        page = response.context["page_obj"]
+        self.assertTrue(response.context["cursor_pagination"])
+        self.assertContains(
+            response,
+            f"?after={page.next_cursor}&difficulty=BEGINNER"
+        )
+
+        # Walk forwards through all pages
+        seen = []
+        params = {}
+        while True:
+            response = self.client.get(url, params)
+            page = response.context["page_obj"]
+            seen.extend(page.object_list)
+            if not page.has_next():
+                break
+            params = {"after": page.next_cursor}
+        self.assertEqual(seen, expected)
+
+        # Going back from the last page returns the previous page
+        response = self.client.get(url, {"before": page.previous_cursor})
+        self.assertEqual(
+            list(response.context["events"]), expected[:9]
+        )
+
+    def test_event_list_invalid_cursor(self):
+        """
+        Test that a malformed cursor token results in a 404 response.
+        """
+        response = self.client.get(reverse("events"), {"after": "garbage"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_event_list_reuses_cached_event_ids(self):
+        """
+        Test that a repeated request for the same filters is served from
+        the cached ID list, and that creating an event invalidates it.
+        """
+        url = reverse("events")
+        filters = {"difficulty": [Event.Difficulty.BEGINNER]}
+        self.client.get(url, filters)
+
+        # Cache miss for the event list and the facet counts (filter form
+        # still cached)
+        bump_version("list")
+        with CaptureQueriesContext(connection) as miss_queries:
+            self.client.get(url, filters)
+
+        # Cache hit: only the events on the page are fetched
+        with CaptureQueriesContext(connection) as hit_queries:
+            response = self.client.get(url, filters)
+        self.assertEqual(len(hit_queries), len(miss_queries) - 3)
+        self.assertIn(self.future_event, response.context["events"])
+
+        # Creating a matching event invalidates the cached list
+        new_event = create_event(
+            self.user, "New Beginner Event",
+            date=self.tomorrow,
+            start_time=time(8, 0),
+            end_time=time(9, 0),
+            difficulty=Event.Difficulty.BEGINNER,
+        )
+        response = self.client.get(url, filters)
+        self.assertIn(new_event, response.context["events"])
+
+    # ------------------------------
+    # Fragment caching
+    # ------------------------------
+    def test_event_card_fragment_is_cached_per_event_version(self):
+        """
+        Test that event cards are rendered from the fragment cache until
+        the event or its categories change, and that the cached card is
+        shared between the profile and the events list.
+        """
+        self.client.login(username="testuser", password="password123")
+        self.client.get(reverse("profile"))
+
+        # A change that bypasses save() keeps the cached card
+        Event.objects.filter(pk=self.future_event.pk).update(
+            organizer="Changed Organizer"
+        )
+        response = self.client.get(reverse("events"))
+        self.assertContains(response, "Organizer A")
+        self.assertNotContains(response, "Changed Organizer")
+
+        # Assigning a category touches the event and renders it again
+        self.future_event.category.add(self.category2)
+        response = self.client.get(reverse("events"))
+        self.assertContains(response, "Changed Organizer")
+
+        # Renaming a category invalidates all cards showing categories
+        self.category1.name = "Renamed Run"
+        self.category1.save()
+        response = self.client.get(reverse("profile"))
+        self.assertContains(response, "Renamed Run")
+
     # ------------------------------
     # event_detail view
     # ------------------------------
@@ -623,3 +753,53 @@ class EventViewsTestCase(TestCase):
         self.assertTrue(
             any("not allowed" in str(m) for m in messages_list)
         )
+
+    # ------------------------------
+    # Query budgets
+    # ------------------------------
+    def _create_events(self, count, date, author=None):
+        """Create `count` events with a category each on the given date."""
+        offset = Event.objects.count()
+        for i in range(offset, offset + count):
+            create_event(
+                author or self.user, f"Bulk Event {i}",
+                categories=[self.category1, self.category2],
+                date=date,
+                start_time=time(18, 0),
+                end_time=time(19, 0),
+                difficulty=Event.Difficulty.BEGINNER,
+            )
+
+    def test_listing_pages_query_count_is_constant(self):
+        """
+        The homepage, events list and profile should run the same number
+        of queries however many event cards they show, i.e. categories are
+        prefetched instead of queried per card.
+        """
+        # Freeze "now" at noon so today's bulk events are still upcoming
+        noon = timezone.make_aware(
+            datetime.combine(self.today, time(12, 0)),
+            timezone.get_current_timezone()
+        )
+        self.client.login(username="testuser", password="password123")
+        # Including one aggregate query for the ETag of the events list,
+        # one per facet count of the events list, and one for the
+        # profile's event counts (also its ETag)
+        pages = {
+            "home": (reverse("home"), self.today, 4),
+            "events": (reverse("events"), self.tomorrow, 9),
+            "profile": (reverse("profile"), self.tomorrow, 6),
+        }
+        with mock.patch("django.utils.timezone.now", return_value=noon):
+            for name, (url, date, budget) in pages.items():
+                with self.subTest(page=name):
+                    self._create_events(1, date)
+                    self._clear_caches()
+                    with self.assertNumQueries(budget):
+                        self.client.get(url)
+
+                    # More cards on the page must not add queries
+                    self._create_events(5, date)
+                    self._clear_caches()
+                    with self.assertNumQueries(budget):
+                        self.client.get(url)
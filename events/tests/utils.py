@@ -0,0 +1,34 @@
+"""
+Helpers shared by the tests of the events app.
+
+Includes:
+- create_event: Creates an event, filling in the required fields the
+  test doesn't care about.
+"""
+
+from datetime import time, timedelta
+from django.utils import timezone
+from events.models import Event
+
+
+def create_event(author, title="Test Event", categories=(), **fields):
+    """
+    Create an event by ``author`` in the ``categories``.
+
+    Unless given in ``fields``, the event takes place tomorrow from 10:00
+    to 12:00 in the "Park", organized by the "Running Club".
+    """
+    event = Event.objects.create(**{
+        "title": title,
+        "organizer": "Running Club",
+        "description": "Description",
+        "date": timezone.localdate() + timedelta(days=1),
+        "start_time": time(10, 0),
+        "end_time": time(12, 0),
+        "location": "Park",
+        "author": author,
+        **fields,
+    })
+    if categories:
+        event.category.add(*categories)
+    return event
@@ -2,7 +2,8 @@
 URL configuration for the events app.
 
 Maps URLs to views for listing, creating, updating, deleting
-and toggling events.
+and toggling events (one by one or in bulk), for autocomplete
+suggestions and calendar feeds.
 """
 
 from django.urls import path
@@ -18,6 +19,28 @@ urlpatterns = [
     # User profile with upcoming and past events
     path('profile/', views.ProfileView.as_view(), name='profile'),
 
+    # Cancel, reactivate or delete several events selected on the profile
+    path(
+        'profile/bulk/',
+        views.event_bulk_action,
+        name='event_bulk_action'
+    ),
+
+    # Autocomplete suggestions for location and organizer inputs
+    path(
+        'autocomplete/<str:field>/',
+        views.event_autocomplete,
+        name='event_autocomplete'
+    ),
+
+    # iCalendar feeds of filtered events and of a user's own events
+    path('feed.ics', views.event_feed, name='events_feed'),
+    path(
+        'feed/<str:token>.ics',
+        views.user_event_feed,
+        name='user_events_feed'
+    ),
+
     # Event detail page (slugs must be last to avoid conflicts)
     path('<slug:slug>/', views.event_detail, name='event_detail'),
 
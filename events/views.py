@@ -4,25 +4,58 @@ Views for the events app.
 Includes:
 - Class-based views for listing, creating, updating, and deleting events
 - Function-based views for event detail, deletion, and toggling cancel status
+- Bulk cancelling, reactivating and deleting of events from the profile
+- JSON autocomplete suggestions for event locations and organizers
+- Conditional GET (ETag / Last-Modified) for the detail and listing pages
+- Streaming iCalendar feeds of filtered events and of a user's own events
 - Context and filtering logic for events
 """
 
-from datetime import timedelta, datetime
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.http import (
+    Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+)
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import (
+    condition, require_GET, require_POST
+)
 from django.views.generic import ListView, CreateView, UpdateView
 from .models import Event
-from .forms import EventFilterForm, EventForm
-
-
-class TodaysEventsListView(ListView):
+from .autocomplete import AUTOCOMPLETE_FIELDS, suggest
+from .conditional import (
+    ConditionalListMixin, event_etag, event_last_modified, make_etag,
+    queryset_fingerprint
+)
+from .cache import (
+    filter_cache_key, get_author_summary, get_version, get_cached_event_ids,
+    get_todays_events
+)
+from .facets import get_facet_counts
+from .feeds import (
+    feed_events, feed_token, iter_calendar, user_from_feed_token
+)
+from .forms import EventBulkActionForm, EventFilterForm, EventForm
+from .pagination import CountedPaginator, CursorPaginator
+from .services import (
+    EventHasEnded, EventNotFound, bulk_delete, bulk_set_cancelled,
+    delete_owned_event, get_owned_event, toggle_event_cancelled
+)
+
+
+class TodaysEventsListView(ConditionalListMixin, ListView):
     """
     Display today's upcoming events on the homepage.
 
+    The list is cached (see ``get_todays_events``), so neither the list
+    nor its ETag need database queries on cache hits.
+
     **Context:**
 
     ``todays_events``
@@ -39,17 +72,20 @@ class TodaysEventsListView(ListView):
         """
         Return events happening today that have not already ended.
         """
-        todays_events = Event.objects.filter(
-            date=timezone.localdate()
-        ).order_by("start_time")
-        todays_upcoming_events = [e for e in todays_events if not e.is_past]
-        return todays_upcoming_events
+        return get_todays_events()
+
+    def get_fingerprint(self):
+        """
+        Return the IDs and update times of the listed events: the cached
+        list changes whenever one of them changes, ends or is added.
+        """
+        return [(event.pk, event.updated_on) for event in self.object_list]
 
 
 # Extending ListView for Filtering see:
 # https://bastakiss.com/blog/django-6/enhancing-django-listview-with-dynamic-
 # filtering-a-step-by-step-guide-403
-class EventListView(ListView):
+class EventListView(ConditionalListMixin, ListView):
     """
     Display a paginated list of future events with filter options.
 
@@ -61,6 +97,15 @@ class EventListView(ListView):
         Instance of EventFilterForm to render filter inputs.
     ``query_string``
         URL-encoded GET parameters for preserving filters in pagination.
+    ``cursor_pagination``
+        True if the page was paginated by cursor (``?after=``/``?before=``)
+        instead of by page number.
+    ``filter_values``
+        Normalized selected filter values, used to cache the rendered
+        filter form.
+    ``facet_counts_key``
+        Hash of the event counts shown next to the category and
+        difficulty options, used to cache the rendered filter form.
 
     **Template:** :template:`events/event_list.html`
     """
@@ -69,75 +114,122 @@ class EventListView(ListView):
     context_object_name = "events"
     paginate_by = 9
 
+    def uses_cursor_pagination(self):
+        """
+        Return True if this request should be paginated by cursor.
+
+        Cursor pagination is used when enabled in the settings or when the
+        request already carries a cursor token, except for searches: their
+        results are ordered by relevance, which has no stable keyset.
+        """
+        if self.request.GET.get("q", "").strip():
+            return False
+        return (
+            settings.EVENT_LIST_PAGINATION == "cursor"
+            or "after" in self.request.GET
+            or "before" in self.request.GET
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Paginate by keyset on (starts_at, id) in cursor mode, which needs
+        no COUNT query and costs the same on every page. Otherwise
+        paginate by page number over the cached list of event IDs.
+        """
+        if not self.uses_cursor_pagination():
+            # Paginate the cached list of matching event IDs and only
+            # fetch the events shown on the requested page
+            event_ids = get_cached_event_ids(queryset, self.filter_key)
+            paginator, page, page_ids, is_paginated = (
+                super().paginate_queryset(event_ids, page_size)
+            )
+            events = Event.objects.with_categories().in_bulk(page_ids)
+            page.object_list = [
+                events[pk] for pk in page_ids if pk in events
+            ]
+            return paginator, page, page.object_list, is_paginated
+
+        page = CursorPaginator(queryset, page_size).page(
+            after=self.request.GET.get("after"),
+            before=self.request.GET.get("before"),
+        )
+        return (None, page, page.object_list, page.has_other_pages())
+
     def get_queryset(self):
         """
         Return future events filtered by category, difficulty, date,
-        and cancellation status. Excludes events already in the past.
+        distance, and cancellation status. Excludes events already in the
+        past.
+
+        With a search query, only matching events are returned, ordered
+        by relevance, then by date.
         """
-        today = timezone.localdate()
-        queryset = Event.objects.filter(
-            date__gte=today
-        ).order_by("date", "start_time")
+        # Exclude events that are already past
+        queryset = Event.objects.upcoming().with_categories().order_by(
+            "starts_at"
+        )
 
         # Filtering
         # Instantiate the form with GET data
         self.form = EventFilterForm(self.request.GET or None)
+        self.filter_key = filter_cache_key({})
 
         if self.form.is_valid():
-            # Category
-            categories = self.form.cleaned_data.get("category")
-            if categories:
-                queryset = queryset.filter(category__in=categories).distinct()
-
-            # Difficulty
-            difficulties = self.form.cleaned_data.get("difficulty")
-            if difficulties:
-                queryset = queryset.filter(difficulty__in=difficulties)
-
-            # Date
-            date_filter = self.form.cleaned_data.get('date_filter')
-            if date_filter == 'today':
-                queryset = queryset.filter(date=today)
-            elif date_filter == 'tomorrow':
-                queryset = queryset.filter(date=today + timedelta(days=1))
-            elif date_filter == 'this_week':
-                # Assuming week starts on Monday
-                start_of_week = today - timedelta(days=today.weekday())
-                end_of_week = start_of_week + timedelta(days=6)
-                queryset = queryset.filter(
-                    date__range=[start_of_week, end_of_week]
-                    )
-            # 'all' -> no date filter
-
-            # Cancelled filter
-            exclude_cancelled = self.form.cleaned_data.get("cancelled")
-            if exclude_cancelled:
-                queryset = queryset.filter(cancelled=False)
+            self.filter_key = filter_cache_key(self.form.cleaned_data)
+            queryset = self.form.filter_queryset(queryset)
 
-        # Exclude events that are already past
-        queryset = [e for e in queryset if not e.is_past]
         return queryset
 
+    def get_fingerprint_queryset(self):
+        """
+        Return all events: the facet counts depend on events outside the
+        filtered list as well.
+        """
+        return Event.objects.all()
+
+    def get_facet_counts(self):
+        """Return the event counts shown next to the filter options."""
+        return get_facet_counts(self.form)
+
     def get_context_data(self, **kwargs):
         """
-        Add the filter form and preserved GET parameters to the context.
+        Add the filter form with facet counts and preserved GET parameters
+        to the context.
         """
         context = super().get_context_data(**kwargs)
+        facets = self.get_facet_counts()
+        self.form.set_facet_counts(facets)
         context["form"] = self.form
+        context["facet_counts_key"] = make_etag(*(
+            sorted(counts.items()) for counts in facets.values()
+        ))
+        context["cursor_pagination"] = self.uses_cursor_pagination()
+
+        # Selected filter values exactly as submitted (sorted), so the
+        # cached filter form is only reused for identical input
+        context["filter_values"] = urlencode(sorted(
+            (name, value)
+            for name in self.form.fields
+            for value in self.request.GET.getlist(name)
+        ))
 
         # Preserve filter params in pagination links
         query_params = self.request.GET.copy()
-        if "page" in query_params:
-            query_params.pop("page")  # remove current page if exists
+        for param in ("page", "after", "before"):
+            # remove current page or cursor if exists
+            query_params.pop(param, None)
         context["query_string"] = query_params.urlencode()
 
         return context
 
 
+@condition(etag_func=event_etag, last_modified_func=event_last_modified)
 def event_detail(request, slug):
     """
     Display a single :model:`events.Event` by slug.
 
+    Answers 304 Not Modified if the client's copy is still current.
+
     **Context:**
 
     ``event``
@@ -155,6 +247,129 @@ def event_detail(request, slug):
     )
 
 
+@require_GET
+def event_autocomplete(request, field):
+    """
+    Return existing values of an event field matching the user's input
+    ``?q=``, so new events reuse existing spellings.
+
+    Supported fields are ``location`` and ``organizer``.
+
+    **Response:** JSON ``{"results": [...]}``, most used values first.
+    """
+    if field not in AUTOCOMPLETE_FIELDS:
+        raise Http404("Unknown autocomplete field.")
+
+    return JsonResponse({"results": suggest(field, request.GET.get("q", ""))})
+
+
+def _calendar_response(request, events, name):
+    """
+    Return a streaming iCalendar response of ``events``.
+    """
+    def build_url(event):
+        return request.build_absolute_uri(
+            reverse("event_detail", args=[event.slug])
+        )
+
+    response = StreamingHttpResponse(
+        iter_calendar(
+            events, name, build_url, request.get_host().split(":")[0]
+        ),
+        content_type="text/calendar; charset=utf-8",
+    )
+    response["Content-Disposition"] = 'inline; filename="runnershive.ics"'
+    return response
+
+
+def _filtered_feed_events(request):
+    """
+    Return the events of the filtered feed, or None if the filters are
+    invalid. Looked up once per request.
+    """
+    if not hasattr(request, "_feed_events"):
+        form = EventFilterForm(request.GET)
+        request._feed_events = (
+            form.filter_queryset(
+                feed_events(Event.objects.with_categories())
+            )
+            if form.is_valid() else None
+        )
+    return request._feed_events
+
+
+def _event_feed_etag(request):
+    events = _filtered_feed_events(request)
+    if events is None:
+        return None
+    return make_etag(
+        "feed",
+        *queryset_fingerprint(events),
+        sorted(request.GET.lists()),
+        get_version("categories"),
+    )
+
+
+@require_GET
+@condition(etag_func=_event_feed_etag)
+def event_feed(request):
+    """
+    Stream an iCalendar feed of the events matching the filters of the
+    events list (same GET parameters), for calendar subscriptions.
+
+    Contains upcoming events and events that ended recently. Answers 304
+    Not Modified if the calendar app's copy is still current.
+    """
+    events = _filtered_feed_events(request)
+    if events is None:
+        return HttpResponseBadRequest("Invalid filters.")
+    return _calendar_response(request, events, "Runners Hive Events")
+
+
+def _user_feed_events(request, token):
+    """
+    Return the events of the user with the feed ``token``, or None if the
+    token is invalid. Looked up once per request.
+    """
+    if not hasattr(request, "_feed_events"):
+        user = user_from_feed_token(token)
+        request._feed_events = (
+            feed_events(
+                Event.objects.filter(author=user).with_categories()
+            )
+            if user else None
+        )
+    return request._feed_events
+
+
+def _user_feed_etag(request, token):
+    events = _user_feed_events(request, token)
+    if events is None:
+        return None
+    return make_etag(
+        "user-feed", token, *queryset_fingerprint(events),
+        get_version("categories"),
+    )
+
+
+@require_GET
+@condition(etag_func=_user_feed_etag)
+def user_event_feed(request, token):
+    """
+    Stream the private iCalendar feed of the events a user authored.
+
+    The signed ``token`` identifies the user (see
+    :func:`events.feeds.feed_token`), so calendar apps can subscribe
+    without logging in.
+    """
+    events = _user_feed_events(request, token)
+    if events is None:
+        raise Http404("Unknown calendar feed.")
+    response = _calendar_response(request, events, "My Runners Hive Events")
+    patch_cache_control(response, private=True)
+    return response
+
+
 class EventCreateView(LoginRequiredMixin, CreateView):
     """
     Allow logged-in users to create a new event.
@@ -199,44 +414,110 @@ class EventCreateView(LoginRequiredMixin, CreateView):
         return reverse("event_detail", args=[self.object.slug])
 
 
-class ProfileView(LoginRequiredMixin, ListView):
+class ProfileView(LoginRequiredMixin, ConditionalListMixin, ListView):
     """
     Display upcoming and past events of the logged-in user.
 
+    Upcoming and past events are paginated separately (``?page=`` and
+    ``?past_page=``), each by its own SQL-ordered query. The numbers of
+    events come from a cached summary, so paginating runs no COUNT
+    queries.
+
     **Context:**
 
     ``upcoming_events``
         Paginated list of user's upcoming events.
     ``past_events``
-        List of user's past events (not paginated).
+        Paginated list of user's past events, most recent first.
+    ``past_page_obj``
+        Page of the past events.
+    ``past_query_string``
+        URL-encoded GET parameters for the past events' page links.
+    ``event_counts``
+        Numbers of the user's events (see ``get_author_summary``).
+    ``calendar_feed_url``
+        Private iCalendar feed URL of the user's events.
 
     **Template:** :template:`events/profile.html`
     """
     template_name = "events/profile.html"
     paginate_by = 9
+    past_paginate_by = 10
     context_object_name = 'upcoming_events'
 
+    def get_summary(self):
+        """Return the (cached) numbers of the user's events."""
+        if not hasattr(self, "summary"):
+            self.summary = get_author_summary(self.request.user)
+        return self.summary
+
     def get_queryset(self):
         """
-        Return a sorted list of upcoming events for the logged-in user.
+        Return the upcoming events of the logged-in user, soonest first.
+        """
+        return Event.objects.filter(
+            author=self.request.user
+        ).upcoming().with_categories().order_by("starts_at")
+
+    def get_past_queryset(self):
+        """
+        Return the past events of the logged-in user, most recent first,
+        with the fields shown in the list only.
         """
-        all_events = Event.objects.filter(author=self.request.user)
-        upcoming = [e for e in all_events if not e.is_past]
-        upcoming.sort(key=lambda e: datetime.combine(e.date, e.start_time))
-        return upcoming
+        return Event.objects.filter(
+            author=self.request.user
+        ).past().order_by("-starts_at", "-pk").only(
+            "title", "slug", "date", "start_time", "ends_at"
+        )
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """Paginate with the number of upcoming events of the summary."""
+        return CountedPaginator(
+            queryset, per_page, self.get_summary()["upcoming"], **kwargs
+        )
+
+    def get_past_page(self):
+        """Return the requested page (``?past_page=``) of past events."""
+        paginator = CountedPaginator(
+            self.get_past_queryset(),
+            self.past_paginate_by,
+            self.get_summary()["past"],
+        )
+        try:
+            return paginator.page(self.request.GET.get("past_page") or 1)
+        except InvalidPage:
+            raise Http404("Invalid page.")
+
+    def get_fingerprint(self):
+        """
+        Return the user's summary: it changes whenever one of the user's
+        events changes, is added or deleted, or ends.
+        """
+        summary = self.get_summary()
+        return (summary["last_updated"], summary["total"], summary["upcoming"])
 
     def get_context_data(self, **kwargs):
         """
-        Add past events to the context for display.
+        Add the page of past events, the event counts and the feed URL
+        to the context.
         """
         context = super().get_context_data(**kwargs)
-        all_events = Event.objects.filter(author=self.request.user)
-        past_events = [e for e in all_events if e.is_past]
-        past_events.sort(
-            key=lambda e: datetime.combine(e.date, e.start_time),
-            reverse=True
+        past_page = self.get_past_page()
+        context['past_page_obj'] = past_page
+        context['past_events'] = past_page.object_list
+        context['event_counts'] = self.get_summary()
+
+        # Keep the page of the other list in each list's page links
+        for name, param in (
+            ("query_string", "page"), ("past_query_string", "past_page")
+        ):
+            query_params = self.request.GET.copy()
+            query_params.pop(param, None)
+            context[name] = query_params.urlencode()
+
+        context['calendar_feed_url'] = self.request.build_absolute_uri(
+            reverse("user_events_feed", args=[feed_token(self.request.user)])
         )
-        context['past_events'] = past_events
         return context
 
 
@@ -255,34 +536,39 @@ class EventUpdateView(LoginRequiredMixin, UpdateView):
         """Return events belonging to the logged-in user."""
         return Event.objects.filter(author=self.request.user)
 
-    def dispatch(self, *args, **kwargs):
+    def dispatch(self, request, *args, **kwargs):
         """
         Prevent editing past events or events not owned by the user.
 
-        If the event is in the past, an info message is shown and the user is
-        redirected to the previous page or to the profile page. If the event
-        does not belong to the logged-in user, an error message is shown and
-        the user is redirected similarly. Non-existent events also redirect
-        with an error message.
+        The event is fetched once, filtered by its author. If it is in the
+        past, an info message is shown and the user is redirected to the
+        previous page or to the profile page. If it does not exist or
+        belongs to another user, an error message is shown and the user is
+        redirected similarly.
         """
-        try:
-            event = Event.objects.get(slug=kwargs['slug'])
-        except Event.DoesNotExist:
-            messages.error(self.request, "Event not found.")
-            return redirect("profile")
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
 
-        if event.author != self.request.user:
-            messages.error(self.request,
-                           "You do not have permission to edit this event.")
-            return redirect(self.request.META.get('HTTP_REFERER', 'profile'))
-
-        if event.is_past:
-            messages.info(self.request,
-                          f"Event '{event.title}' is in the past! You cannot "
-                          "edit it anymore.")
-            return redirect(self.request.META.get('HTTP_REFERER', 'profile'))
-
-        return super().dispatch(self.request, *args, **kwargs)
+        try:
+            self.object = get_owned_event(
+                request.user, kwargs['slug'], upcoming=True
+            )
+        except EventNotFound:
+            messages.error(request,
+                           "Event not found or you do not have permission "
+                           "to edit it.")
+            return redirect(request.META.get('HTTP_REFERER', 'profile'))
+        except EventHasEnded as error:
+            messages.info(request,
+                          f"Event '{error.event.title}' is in the past! You "
+                          "cannot edit it anymore.")
+            return redirect(request.META.get('HTTP_REFERER', 'profile'))
+
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_object(self, queryset=None):
+        """Return the event fetched in dispatch()."""
+        return self.object
 
     def form_valid(self, form):
         """Save updated event and show a success message."""
@@ -320,24 +606,19 @@ def event_delete(request, slug):
 
     Shows a success or error message using Django messages.
     """
-    try:
-        event = Event.objects.get(slug=slug, author=request.user)
-    except Event.DoesNotExist:
-        messages.error(request, "You are not allowed to delete this event.")
+    if request.method != "POST":
+        messages.error(
+            request, "The event could not be deleted. Invalid request method."
+        )
         return redirect("profile")
 
-    if request.method == "POST":
-        event.delete()
-        messages.success(
-            request, f"Event '{event.title}' deleted successfully!"
-        )
+    try:
+        event = delete_owned_event(request.user, slug)
+    except EventNotFound:
+        messages.error(request, "You are not allowed to delete this event.")
         return redirect("profile")
 
-    # Redirect to profile if GET request or any other method
-    messages.error(
-        request,
-        f"Event '{event.title}' could not be deleted. Invalid request method."
-    )
+    messages.success(request, f"Event '{event.title}' deleted successfully!")
     return redirect("profile")
 
 
@@ -358,38 +639,65 @@ def toggle_event_cancel(request, slug):
     - success/warning for toggling status
     - error for invalid request methods
     """
+    # Any non-POST request is invalid
+    if request.method != "POST":
+        messages.error(
+            request,
+            "The cancellation status could not be changed. Invalid request "
+            "method."
+        )
+        return redirect("profile")
+
     try:
-        event = Event.objects.get(slug=slug, author=request.user)
-    except Event.DoesNotExist:
+        event = toggle_event_cancelled(request.user, slug)
+    except EventNotFound:
         messages.error(request, "You are not allowed to cancel this event.")
         return redirect("profile")
-
-    # Prevent cancelling past events
-    if event.is_past:
+    except EventHasEnded as error:
+        # Prevent cancelling past events
         messages.info(
             request,
-            f"Cannot change cancellation status for past event\
-                '{event.title}'."
+            "Cannot change cancellation status for past event "
+            f"'{error.event.title}'."
         )
         return redirect("profile")
 
-    # Only POST requests toggle the status
-    if request.method == "POST":
-        event.cancelled = not event.cancelled
-        event.save()
-        if event.cancelled:
-            messages.warning(
-                request, f"Event '{event.title}' has been cancelled."
-            )
-        else:
-            messages.success(
-                request, f"Event '{event.title}' is active again."
-            )
+    if event.cancelled:
+        messages.warning(request, f"Event '{event.title}' has been cancelled.")
+    else:
+        messages.success(request, f"Event '{event.title}' is active again.")
+    return redirect("profile")
+
+
+@login_required
+@require_POST
+def event_bulk_action(request):
+    """
+    Cancel, reactivate or delete the events selected on the profile page.
+
+    Only events of the logged-in user are affected; cancelling and
+    reactivating skip past events.
+
+    **Template:** Redirects to profile page
+
+    Shows how many events were changed, or an error for invalid
+    selections.
+    """
+    form = EventBulkActionForm(request.POST)
+    if not form.is_valid():
+        for errors in form.errors.values():
+            messages.error(request, errors[0])
         return redirect("profile")
 
-    # Any non-POST request is invalid
-    messages.error(
-        request,
-        f"Cancellation status of event '{event.title}' could not be changed."
-    )
+    action = form.cleaned_data["action"]
+    pks = form.cleaned_data["events"]
+    if action == "delete":
+        count = bulk_delete(request.user, pks)
+        messages.success(request, f"{count} event(s) deleted.")
+    elif action == "cancel":
+        count = bulk_set_cancelled(request.user, pks, True)
+        messages.warning(request, f"{count} event(s) cancelled.")
+    else:
+        count = bulk_set_cancelled(request.user, pks, False)
+        messages.success(request, f"{count} event(s) active again.")
     return redirect("profile")
@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration of the web process (see Procfile).
+
+Loaded automatically by gunicorn from the project directory. All
+settings are read from environment variables, see runnershive/server.py.
+For example, serve the async views with uvicorn workers:
+
+    GUNICORN_WORKER_CLASS=uvicorn gunicorn
+"""
+
+import os
+from runnershive import server
+
+# Not named "config", which is a gunicorn setting
+_settings = server.server_config(os.environ)
+
+wsgi_app = _settings["wsgi_app"]
+worker_class = _settings["worker_class"]
+workers = _settings["workers"]
+threads = _settings["threads"]
+preload_app = _settings["preload_app"]
+max_requests = _settings["max_requests"]
+max_requests_jitter = _settings["max_requests_jitter"]
+timeout = _settings["timeout"]
+
+# Server hooks, found by gunicorn by their names
+when_ready = server.when_ready
+post_worker_init = server.post_worker_init
@@ -3,6 +3,12 @@ ASGI config for runnershive project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The ASGI application uses its own settings module
+(runnershive/settings_asgi.py), which serves the async versions of the
+main pages (see runnershive/asgi_urls.py). Run it with uvicorn workers
+under gunicorn by setting GUNICORN_WORKER_CLASS=uvicorn (see
+gunicorn.conf.py).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -11,6 +17,6 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'runnershive.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'runnershive.settings_asgi')
 
 application = get_asgi_application()
@@ -0,0 +1,61 @@
+"""
+URL configuration of the ASGI application.
+
+The same URLs as ``runnershive.urls``, with the main pages served by their
+async views (``events/async_views.py`` and ``core/async_views.py``).
+Selected by the ASGI settings (``runnershive/settings_asgi.py``).
+
+Includes:
+- replace_views: Swaps the views of named URL patterns.
+"""
+
+from django.urls import URLPattern, URLResolver
+from core import async_views as core_views
+from events import async_views as event_views
+from . import urls
+
+# Async views by URL name
+ASYNC_VIEWS = {
+    "home": event_views.TodaysEventsListView.as_view(),
+    "events": event_views.EventListView.as_view(),
+    "profile": event_views.ProfileView.as_view(),
+    "event_detail": event_views.event_detail,
+    "contact": core_views.contact_view,
+}
+
+
+def replace_views(patterns, views):
+    """
+    Return ``patterns`` with the views of the URLs named in ``views``
+    replaced, keeping the order of the patterns (and of included ones).
+    """
+    replaced = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            # Only rebuild includes containing a replaced view
+            included = replace_views(pattern.url_patterns, views)
+            if included != list(pattern.url_patterns):
+                pattern = URLResolver(
+                    pattern.pattern,
+                    included,
+                    pattern.default_kwargs,
+                    pattern.app_name,
+                    pattern.namespace,
+                )
+        elif pattern.name in views:
+            pattern = URLPattern(
+                pattern.pattern,
+                views[pattern.name],
+                pattern.default_args,
+                pattern.name,
+            )
+        replaced.append(pattern)
+    return replaced
+
+
+urlpatterns = replace_views(urls.urlpatterns, ASYNC_VIEWS)
+
+handler400 = urls.handler400
+handler403 = urls.handler403
+handler404 = urls.handler404
+handler500 = urls.handler500
@@ -0,0 +1,243 @@
+"""
+Cache configuration and helpers for the Runners Hive project.
+
+Includes:
+- parse_cache_url: Builds a Django cache configuration from a URL, much
+  like dj_database_url does for DATABASE_URL.
+- caches_from_env: Builds the named caches ("default", "pages",
+  "fragments", "sessions") from CACHE_URL / CACHE_URL_<ALIAS> variables,
+  requiring caches shared between processes if asked to.
+- VersionedCache: A small wrapper around a named cache with key
+  namespacing, a namespace version for bulk invalidation and hit/miss
+  counters, with ``a``-prefixed async versions of its lookups.
+- cache_stats: Returns the hit/miss counters of all VersionedCache
+  namespaces in this process.
+
+Supported cache URLs:
+
+- ``locmem://``: Per-process memory, fine for development and tests but
+  not shared between gunicorn workers.
+- ``db://`` or ``db://table_name``: The database cache, shared by all
+  processes. Every lookup is a query, so it's only allowed for the other
+  caches (e.g. ``CACHE_URL_SESSIONS=db://``), not the "default" one. The
+  table is created by ``manage.py createcachetable``, which the release
+  process in the Procfile runs on every deploy.
+- ``file:///path/to/dir``: Shared file cache on the local disk, one
+  sub-directory per named cache. Shared by the workers of one dyno.
+- ``redis://host:port/db`` or ``rediss://...``: Any Redis-protocol server
+  (requires the ``redis`` package).
+- ``dummy://``: Disables caching.
+
+Query parameters ``timeout``, ``key_prefix`` and ``max_entries`` are
+passed on to the cache configuration, e.g.
+``redis://localhost:6379/0?timeout=600``.
+"""
+
+import time
+from collections import Counter
+from urllib.parse import parse_qs, urlsplit
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+CACHE_ALIASES = ("default", "pages", "fragments", "sessions")
+
+BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "rediss": "django.core.cache.backends.redis.RedisCache",
+    "dummy": "django.core.cache.backends.dummy.DummyCache",
+    "db": "django.core.cache.backends.db.DatabaseCache",
+}
+
+# Table of the database cache if the URL names none
+DEFAULT_CACHE_TABLE = "runnershive_cache"
+
+
+def parse_cache_url(url, alias="default"):
+    """
+    Return a Django cache configuration for the given cache URL.
+
+    ``alias`` keeps the named caches apart when they share one URL: it
+    names the local memory cache, the file cache sub-directory or the key
+    prefix on a shared Redis server.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unsupported cache URL scheme: {scheme!r}")
+
+    config = {"BACKEND": BACKENDS[scheme]}
+    key_prefix = ""
+    if scheme == "locmem":
+        config["LOCATION"] = f"{parts.netloc or 'runnershive'}-{alias}"
+    elif scheme == "file":
+        config["LOCATION"] = f"{parts.path.rstrip('/')}/{alias}"
+    elif scheme in ("redis", "rediss"):
+        config["LOCATION"] = parts._replace(query="").geturl()
+        key_prefix = alias
+    elif scheme == "db":
+        config["LOCATION"] = parts.netloc or DEFAULT_CACHE_TABLE
+        key_prefix = alias
+
+    params = {
+        key: values[-1] for key, values in parse_qs(parts.query).items()
+    }
+    if "timeout" in params:
+        timeout = params["timeout"]
+        config["TIMEOUT"] = None if timeout == "none" else int(timeout)
+    if "max_entries" in params:
+        config["OPTIONS"] = {"MAX_ENTRIES": int(params["max_entries"])}
+    key_prefix = params.get("key_prefix", key_prefix)
+    if key_prefix:
+        config["KEY_PREFIX"] = key_prefix
+    return config
+
+
+def caches_from_env(environ, shared=False):
+    """
+    Return the CACHES setting built from environment variables.
+
+    ``CACHE_URL`` configures all named caches; ``CACHE_URL_<ALIAS>`` (e.g.
+    ``CACHE_URL_SESSIONS``) overrides it for a single cache.
+
+    With ``shared``, the caches must be shared by all worker processes:
+    VersionedCache keeps its versions in the "default" cache, so a bump in
+    one worker must be seen by all others, and sessions logged out in one
+    worker must not stay valid in another. ``CACHE_URL`` is then required
+    and ``locmem://`` is rejected. The "default" cache can't be ``db://``
+    either: every VersionedCache lookup reads a version from it, so each
+    cache hit would cost a database query.
+    """
+    if shared and "CACHE_URL" not in environ:
+        raise ImproperlyConfigured(
+            "Set CACHE_URL to a cache shared between worker processes, "
+            "e.g. redis://host:port/db or file:///path/to/dir (or set "
+            "DEBUG for development)."
+        )
+    default_url = environ.get("CACHE_URL", "locmem://")
+    config = {
+        alias: parse_cache_url(
+            environ.get(f"CACHE_URL_{alias.upper()}", default_url), alias
+        )
+        for alias in CACHE_ALIASES
+    }
+    if shared:
+        local = [
+            alias for alias in CACHE_ALIASES
+            if config[alias]["BACKEND"] == BACKENDS["locmem"]
+        ]
+        if local:
+            raise ImproperlyConfigured(
+                f"Caches {', '.join(local)} use locmem://, which isn't "
+                "shared between worker processes. Use redis:// or file:// "
+                "(or set DEBUG for development)."
+            )
+        if config["default"]["BACKEND"] == BACKENDS["db"]:
+            raise ImproperlyConfigured(
+                "The default cache holds the versions read by every cache "
+                "lookup and can't use db://. Use redis:// or file://."
+            )
+    return config
+
+
+# Hit/miss counters of all VersionedCache namespaces in this process
+_stats = Counter()
+
+
+def cache_stats():
+    """
+    Return the hit/miss counters per VersionedCache namespace, e.g.
+    ``{"events:list": {"hits": 10, "misses": 2}}``.
+    """
+    stats = {}
+    for (namespace, outcome), count in _stats.items():
+        stats.setdefault(namespace, {"hits": 0, "misses": 0})[outcome] = count
+    return stats
+
+
+class VersionedCache:
+    """
+    A namespace of keys in one of the named caches.
+
+    Every key is prefixed with the namespace and its current version, so
+    ``bump()`` invalidates all keys of the namespace at once without
+    having to find and delete them. Versions are kept in the "default"
+    cache so all caches of a namespace agree on them.
+    """
+
+    def __init__(self, namespace, alias="default"):
+        self.namespace = namespace
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def version_key(self):
+        return f"{self.namespace}:version"
+
+    @property
+    def version(self):
+        """Return the current version of the namespace."""
+        # Start from the current time so a version key that was evicted
+        # never falls back to a number still used by cached entries
+        return caches["default"].get_or_set(
+            self.version_key, time.time_ns, None
+        )
+
+    def bump(self):
+        """Invalidate all keys of the namespace."""
+        try:
+            caches["default"].incr(self.version_key)
+        except ValueError:
+            # Version key not set (yet) or evicted
+            caches["default"].set(self.version_key, time.time_ns(), None)
+
+    async def aversion(self):
+        """Async version of ``version``."""
+        return await caches["default"].aget_or_set(
+            self.version_key, time.time_ns, None
+        )
+
+    def make_key(self, key):
+        """Return the full cache key for ``key`` in the current version."""
+        return f"{self.namespace}:{self.version}:{key}"
+
+    async def amake_key(self, key):
+        """Async version of ``make_key``."""
+        return f"{self.namespace}:{await self.aversion()}:{key}"
+
+    def _count(self, value, sentinel, default):
+        """Count a hit or miss and return the value or ``default``."""
+        if value is sentinel:
+            _stats[self.namespace, "misses"] += 1
+            return default
+        _stats[self.namespace, "hits"] += 1
+        return value
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key`` and count a hit or miss."""
+        sentinel = object()
+        value = self.cache.get(self.make_key(key), sentinel)
+        return self._count(value, sentinel, default)
+
+    async def aget(self, key, default=None):
+        """Async version of ``get``."""
+        sentinel = object()
+        value = await self.cache.aget(await self.amake_key(key), sentinel)
+        return self._count(value, sentinel, default)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        """Cache ``value`` under ``key`` for ``timeout`` seconds."""
+        self.cache.set(self.make_key(key), value, timeout)
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT):
+        """Async version of ``set``."""
+        await self.cache.aset(await self.amake_key(key), value, timeout)
+
+    def delete(self, key):
+        """Remove ``key`` from the cache."""
+        self.cache.delete(self.make_key(key))
@@ -0,0 +1,121 @@
+"""
+Database configuration and connection statistics for the Runners Hive
+project.
+
+Includes:
+- database_config: Builds ``DATABASES['default']`` from DATABASE_URL
+  with persistent connections, health checks and an optional connection
+  pool for PostgreSQL.
+- pool_stats: Returns connection usage statistics of this process.
+
+Environment variables (all optional):
+
+- ``DB_CONN_MAX_AGE``: Seconds to keep a connection open between requests
+  (default 600, 0 opens a new connection for every request). Defaults to
+  0 for the ASGI application: async views run their queries in threads
+  that don't reuse persistent connections, so kept connections would
+  pile up instead.
+- ``DB_CONN_HEALTH_CHECKS``: Check persistent connections before reusing
+  them (default on). Always on with ``DB_POOL``, where the pool checks
+  connections before handing them out.
+- ``DB_POOL``: Use a psycopg connection pool instead of persistent
+  connections (psycopg_pool, installed with ``psycopg[pool]``).
+- ``DB_POOL_MIN_SIZE`` / ``DB_POOL_MAX_SIZE``: Pool size (default 2 / 10).
+- ``DB_POOL_MAX_LIFETIME``: Seconds before a pooled connection is
+  replaced (default 3600).
+- ``DB_POOL_TIMEOUT``: Seconds to wait for a free connection (default 30).
+"""
+
+from collections import Counter
+import dj_database_url
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+POSTGRES_ENGINE = "django.db.backends.postgresql"
+# Engine name returned by older dj_database_url versions, which no longer
+# exists in Django
+LEGACY_POSTGRES_ENGINE = "django.db.backends.postgresql_psycopg2"
+
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def _flag(environ, name, default):
+    """Return the boolean value of an environment variable."""
+    value = environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in TRUE_VALUES
+
+
+def database_config(environ, asgi=False):
+    """
+    Return the configuration of the default database, for the ASGI
+    application if ``asgi`` is set.
+
+    PostgreSQL connections are kept open between requests (with health
+    checks) so requests don't pay for a new TCP and TLS handshake each
+    time. With ``DB_POOL`` enabled, connections are handed out by a psycopg
+    connection pool instead.
+    """
+    config = dj_database_url.parse(environ.get("DATABASE_URL"))
+    if config["ENGINE"] == LEGACY_POSTGRES_ENGINE:
+        config["ENGINE"] = POSTGRES_ENGINE
+    if config["ENGINE"] != POSTGRES_ENGINE:
+        return config
+
+    if _flag(environ, "DB_POOL", False):
+        # Django does not allow persistent connections together with a
+        # pool; with health checks, the pool checks a connection before
+        # handing it out
+        config["CONN_MAX_AGE"] = 0
+        config["CONN_HEALTH_CHECKS"] = True
+        config.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(environ.get("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(environ.get("DB_POOL_MAX_SIZE", 10)),
+            "max_lifetime": float(
+                environ.get("DB_POOL_MAX_LIFETIME", 3600)
+            ),
+            "timeout": float(environ.get("DB_POOL_TIMEOUT", 30)),
+        }
+    else:
+        config["CONN_MAX_AGE"] = int(
+            environ.get("DB_CONN_MAX_AGE", 0 if asgi else 600)
+        )
+        config["CONN_HEALTH_CHECKS"] = _flag(
+            environ, "DB_CONN_HEALTH_CHECKS", True
+        )
+    return config
+
+
+# Number of database connections opened by this process, per alias
+_connections_opened = Counter()
+
+
+@receiver(connection_created)
+def _count_connection(sender, connection, **kwargs):
+    _connections_opened[connection.alias] += 1
+
+
+def pool_stats():
+    """
+    Return connection usage statistics of this process per database alias.
+
+    For pooled connections these are the psycopg pool statistics (pool
+    size, connections in use, waiting requests, ...); otherwise the number
+    of connections opened so far and the configured connection lifetime.
+    """
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        pool = getattr(connection, "pool", None)
+        if pool is not None:
+            stats[alias] = {"mode": "pool", **pool.get_stats()}
+        else:
+            conn_max_age = connection.settings_dict["CONN_MAX_AGE"]
+            stats[alias] = {
+                "mode": "persistent" if conn_max_age else "per-request",
+                "conn_max_age": conn_max_age,
+                "connections_opened": _connections_opened[alias],
+            }
+    return stats
@@ -0,0 +1,118 @@
+"""
+Management command profiling the startup of a new process.
+
+Usage:
+    python manage.py startup_profile
+    python manage.py startup_profile --limit 40
+
+Starts a new Python interpreter with ``-X importtime`` that sets up
+Django and loads what the first request loads (see
+``runnershive.startup``), then reports the time of each phase and app,
+the slowest imports and the import time by package.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from runnershive.startup import parse_importtime
+
+PHASES = (
+    ("settings", "Settings"),
+    ("setup", "Apps (django.setup)"),
+    ("urls", "URLconf"),
+    ("templates", "Template engines"),
+)
+
+
+class Command(BaseCommand):
+    help = "Report import and app loading times of a new process."
+
+    # The profile runs in a new process, no need to check this one
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=20,
+            help="Number of imports and packages listed (default: 20).",
+        )
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "runnershive.startup"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+            # The profile doesn't use the caches, but without DEBUG the
+            # settings require CACHE_URL
+            env={"CACHE_URL": "dummy://", **os.environ},
+        )
+        if result.returncode:
+            raise CommandError(
+                "Startup failed:\n" + result.stderr[-2000:]
+            )
+        timings = json.loads(result.stdout.splitlines()[-1])
+        imports = parse_importtime(result.stderr.splitlines())
+
+        self.write_phases(timings)
+        self.write_apps(timings["apps"])
+        self.write_imports(imports, options["limit"])
+        self.write_packages(imports, options["limit"])
+
+    def write_table(self, title, header, rows):
+        self.stdout.write("")
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        self.stdout.write(header)
+        for row in rows:
+            self.stdout.write(row)
+
+    def write_phases(self, timings):
+        total = sum(timings[phase] for phase, label in PHASES)
+        self.write_table(
+            "Phases", f"{'ms':>9}  phase",
+            [f"{timings[phase]:9.1f}  {label}" for phase, label in PHASES]
+            + [f"{total:9.1f}  Total"],
+        )
+
+    def write_apps(self, apps):
+        # Slowest apps first
+        apps = sorted(
+            apps.items(), key=lambda item: -sum(item[1].values())
+        )
+        self.write_table(
+            "Apps (ms)", f"{'import':>9} {'models':>9} {'ready':>9}  app",
+            [
+                f"{app['import']:9.1f} {app['models']:9.1f} "
+                f"{app['ready']:9.1f}  {label}"
+                for label, app in apps
+            ],
+        )
+
+    def write_imports(self, imports, limit):
+        # Only imports not made by other modules; their time includes the
+        # modules they import
+        outermost = sorted(
+            (row for row in imports if row[3] == 0),
+            key=lambda row: -row[2],
+        )
+        self.write_table(
+            "Slowest imports (ms, including the modules they import)",
+            f"{'ms':>9}  module",
+            [
+                f"{cumulative / 1000:9.1f}  {module}"
+                for module, own, cumulative, depth in outermost[:limit]
+            ],
+        )
+
+    def write_packages(self, imports, limit):
+        packages = Counter()
+        for module, own, cumulative, depth in imports:
+            packages[module.partition(".")[0]] += own
+        self.write_table(
+            "Import time by package (ms)", f"{'ms':>9}  package",
+            [
+                f"{own / 1000:9.1f}  {package}"
+                for package, own in packages.most_common(limit)
+            ],
+        )
@@ -0,0 +1,46 @@
+"""
+Async-capable versions of third-party middleware.
+
+Includes:
+- WhiteNoiseMiddleware: Serves static files (WhiteNoise).
+
+Under ASGI, Django runs sync-only middleware in a thread and switches
+everything below it (including async views) back to async, on every
+request. WhiteNoise only looks up static files before the view, so it
+gets an async ``__acall__`` here and behaves as before under WSGI.
+
+django-allauth's AccountMiddleware is sync-only as well, but allauth
+requires its own class in MIDDLEWARE, so it can't be replaced here.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from whitenoise import middleware as whitenoise_middleware
+
+
+class WhiteNoiseMiddleware(whitenoise_middleware.WhiteNoiseMiddleware):
+    """
+    WhiteNoise middleware that calls ``__acall__`` instead of
+    ``__call__`` if the next handler is async (like Django's
+    ``MiddlewareMixin``).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        # Static files are looked up in memory (or stat()ed with
+        # autorefresh), which doesn't need a thread
+        response = self.process_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
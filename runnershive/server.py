@@ -0,0 +1,197 @@
+"""
+Gunicorn configuration and warmup for the Runners Hive project.
+
+Includes:
+- server_config: Builds the gunicorn settings from environment variables.
+- warmup: Compiles the project templates and populates the URL resolver,
+  logging templates that fail to compile.
+- when_ready / post_worker_init: Gunicorn hooks running the warmup.
+
+The settings are applied by ``gunicorn.conf.py``. Environment variables
+(all optional):
+
+- ``GUNICORN_WORKER_CLASS``: ``sync`` (default), ``gthread``, ``uvicorn``
+  or the dotted path of a worker class. Uvicorn workers serve the ASGI
+  application (``runnershive/asgi.py``), all others the WSGI one.
+- ``WEB_CONCURRENCY``: Number of worker processes (default 2, set by
+  Heroku according to the dyno size).
+- ``GUNICORN_THREADS``: Threads per worker (default 1). More than one
+  thread switches sync workers to gthread.
+- ``GUNICORN_PRELOAD``: Import the application once in the master
+  process before forking the workers (default on). The workers share
+  its memory and start without importing allauth, cloudinary, summernote
+  etc. again.
+- ``GUNICORN_MAX_REQUESTS`` / ``GUNICORN_MAX_REQUESTS_JITTER``: Restart
+  a worker after this many requests plus a random jitter, so leaked
+  memory is returned and workers don't all restart at once (default
+  1000 / 100, 0 disables restarts).
+- ``GUNICORN_TIMEOUT``: Seconds before a silent worker is restarted
+  (default 30).
+"""
+
+import os
+import sysconfig
+import time
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template import (
+    TemplateDoesNotExist, TemplateSyntaxError, engines
+)
+from django.template.backends.django import DjangoTemplates
+from django.urls import URLResolver, get_resolver
+from .database import _flag
+
+WSGI_APP = "runnershive.wsgi:application"
+ASGI_APP = "runnershive.asgi:application"
+
+# Short names for GUNICORN_WORKER_CLASS
+WORKER_CLASSES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    "uvicorn": "uvicorn.workers.UvicornWorker",
+}
+# Worker classes serving the ASGI application
+ASGI_WORKER_CLASSES = ("uvicorn.workers.UvicornWorker",)
+
+
+def server_config(environ):
+    """Return the gunicorn settings for the given environment."""
+    worker_class = environ.get("GUNICORN_WORKER_CLASS", "sync")
+    worker_class = WORKER_CLASSES.get(worker_class, worker_class)
+    return {
+        "wsgi_app": (
+            ASGI_APP if worker_class in ASGI_WORKER_CLASSES else WSGI_APP
+        ),
+        "worker_class": worker_class,
+        "workers": int(environ.get("WEB_CONCURRENCY", 2)),
+        "threads": int(environ.get("GUNICORN_THREADS", 1)),
+        "preload_app": _flag(environ, "GUNICORN_PRELOAD", True),
+        "max_requests": int(environ.get("GUNICORN_MAX_REQUESTS", 1000)),
+        "max_requests_jitter": int(
+            environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100)
+        ),
+        "timeout": int(environ.get("GUNICORN_TIMEOUT", 30)),
+    }
+
+
+def _is_within(path, directory):
+    """Return whether ``path`` is ``directory`` or inside it."""
+    path, directory = os.path.abspath(path), os.path.abspath(directory)
+    return os.path.commonpath([path, directory]) == directory
+
+
+def _project_template_dirs(engine):
+    """
+    Return the template directories of the project: ``TEMPLATES["DIRS"]``
+    and the ``templates`` directories of the project's own apps, not of
+    installed packages (even if installed inside the project directory,
+    as on Heroku).
+    """
+    directories = list(engine.dirs)
+    if engine.app_dirs:
+        package_dirs = {
+            sysconfig.get_path("purelib"), sysconfig.get_path("platlib")
+        }
+        for app_config in apps.get_app_configs():
+            if not _is_within(app_config.path, settings.BASE_DIR) or any(
+                _is_within(app_config.path, package_dir)
+                for package_dir in package_dirs
+            ):
+                continue
+            directory = os.path.join(app_config.path, "templates")
+            if os.path.isdir(directory):
+                directories.append(directory)
+    return directories
+
+
+def compile_templates():
+    """
+    Compile all project templates into the cached template loader.
+
+    Return the number of templates compiled and the ``(template_name,
+    error)`` of those that failed: syntax errors, missing templates they
+    extend or include, or files that aren't UTF-8. They fail when
+    rendered, as without the warmup.
+    """
+    compiled = 0
+    failed = []
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for directory in _project_template_dirs(engine):
+            for root, dirs, files in os.walk(directory):
+                for name in files:
+                    path = os.path.join(root, name)
+                    template_name = os.path.relpath(
+                        path, directory
+                    ).replace(os.sep, "/")
+                    try:
+                        engine.get_template(template_name)
+                    except (
+                        TemplateDoesNotExist, TemplateSyntaxError,
+                        UnicodeDecodeError,
+                    ) as error:
+                        failed.append((template_name, error))
+                        continue
+                    compiled += 1
+    return compiled, failed
+
+
+def _compile_patterns(patterns):
+    """
+    Compile the regular expressions of ``patterns`` (and of included
+    patterns) and return the number of URL patterns.
+    """
+    count = 0
+    for pattern in patterns:
+        # Compiled on first access
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            count += _compile_patterns(pattern.url_patterns)
+        else:
+            count += 1
+    return count
+
+
+def populate_url_resolver():
+    """
+    Import all URLconfs, compile their patterns and build the lookup
+    tables used by ``reverse()``. Return the number of URL patterns.
+    """
+    resolver = get_resolver()
+    count = _compile_patterns(resolver.url_patterns)
+    # Builds the reverse lookup of all URLs (and namespaces)
+    resolver.reverse_dict
+    return count
+
+
+def warmup(log):
+    """
+    Do the work of the first request of a worker ahead of time: compile
+    the templates and populate the URL resolver.
+    """
+    start = time.perf_counter()
+    templates, failed = compile_templates()
+    for template_name, error in failed:
+        log.warning("Warmup: can't compile %s: %r", template_name, error)
+    urls = populate_url_resolver()
+    # The warmup shouldn't need the database, but forked workers must
+    # never share a connection opened by the master
+    connections.close_all()
+    log.info(
+        "Warmup: compiled %d templates, resolved %d URL patterns in %.0f ms",
+        templates, urls, (time.perf_counter() - start) * 1000,
+    )
+
+
+def when_ready(server):
+    """Warm up the preloaded application once, before forking workers."""
+    if server.cfg.preload_app:
+        warmup(server.log)
+
+
+def post_worker_init(worker):
+    """Warm up each worker before it accepts requests (without preload)."""
+    if not worker.cfg.preload_app:
+        warmup(worker.log)
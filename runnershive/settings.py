@@ -13,8 +13,10 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 import sys
-# For connecting to PostgreSQL on Heroku
-import dj_database_url
+# For configuring the caches from CACHE_URL
+from runnershive.caching import caches_from_env
+# For connecting to PostgreSQL on Heroku (parses DATABASE_URL)
+from runnershive.database import database_config
 
 # Import environment variables from env.py if it exists
 if os.path.isfile('env.py'):
@@ -53,6 +55,8 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    # PostgreSQL full-text search and trigram lookups
+    'django.contrib.postgres',
 
     # Cloudinary for media storage
     'cloudinary_storage',
@@ -91,6 +95,19 @@ ACCOUNT_EMAIL_VERIFICATION = 'none'
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
+# Pagination of the events list: "page" for numbered pages or "cursor"
+# for keyset pagination with ?after=/?before= tokens (no COUNT query)
+EVENT_LIST_PAGINATION = os.environ.get("EVENT_LIST_PAGINATION", "page")
+
+# Geocoder backend for event locations (see events/geocoding.py) and the
+# local gazetteer CSV used by the default, offline backend
+EVENT_GEOCODER = os.environ.get(
+    "EVENT_GEOCODER", "events.geocoding.GazetteerGeocoder"
+)
+EVENT_GAZETTEER = os.environ.get(
+    "EVENT_GAZETTEER", BASE_DIR / "events" / "data" / "gazetteer.csv"
+)
+
 # Summernote rich text editor configuration
 # See: https://github.com/lqez/django-summernote
 SUMMERNOTE_CONFIG = {
@@ -115,7 +132,9 @@ SUMMERNOTE_CONFIG = {
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # WhiteNoise middleware, made async-capable for ASGI
+    # See: runnershive/middleware.py
+    'runnershive.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -150,14 +169,36 @@ WSGI_APPLICATION = 'runnershive.wsgi.application'
 # Database configuration
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-# Use dj_database_url to parse DATABASE_URL from environment (Heroku)
+# Use dj_database_url to parse DATABASE_URL from environment (Heroku).
+# PostgreSQL connections are persistent with health checks, or pooled
+# with DB_POOL=1. See: runnershive/database.py
 DATABASES = {
-    'default': dj_database_url.parse(os.environ.get("DATABASE_URL"))
+    'default': database_config(os.environ)
 }
 
 # Use SQLite database for running unittests
 if 'test' in sys.argv:
     DATABASES['default']['ENGINE'] = 'django.db.backends.sqlite3'
+    # PostgreSQL-only options such as the connection pool
+    DATABASES['default']['OPTIONS'] = {}
+
+
+# Cache configuration
+# CACHE_URL selects the backend of all named caches: locmem://, db://,
+# file:///path/to/dir or redis://host:port/db. CACHE_URL_<ALIAS> (e.g.
+# CACHE_URL_SESSIONS) overrides it for a single cache.
+# Without DEBUG, several gunicorn workers share cache versions and
+# sessions, so CACHE_URL is required, locmem:// is refused and the
+# default cache (holding the versions) can't be db://. Tests and
+# development run in one process with locmem://.
+# See: runnershive/caching.py
+CACHES = caches_from_env(
+    os.environ, shared=not DEBUG and 'test' not in sys.argv
+)
+
+# Keep sessions in the "sessions" cache, backed by the database
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
 
 
 # Password validation
@@ -0,0 +1,19 @@
+"""
+Django settings of the ASGI application (runnershive/asgi.py).
+
+The project settings, with the URLconf serving the async versions of the
+main pages (see runnershive/asgi_urls.py) and without persistent
+database connections by default (see runnershive/database.py).
+Selected through DJANGO_SETTINGS_MODULE, so management commands and the
+WSGI application keep using runnershive.settings.
+"""
+
+import os
+from .database import database_config
+from .settings import *  # noqa: F401, F403
+
+ROOT_URLCONF = 'runnershive.asgi_urls'
+
+DATABASES = {
+    'default': database_config(os.environ, asgi=True)
+}
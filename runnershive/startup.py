@@ -0,0 +1,110 @@
+"""
+Startup timing of a new process, used by ``manage.py startup_profile``.
+
+Includes:
+- time_startup: Times loading the settings, each app (import, models and
+  ``ready()``), the URLconf and the template tag libraries.
+- parse_importtime: Parses the output of ``python -X importtime``.
+
+Meant to run in a new interpreter (``python -X importtime -m
+runnershive.startup``), so only the standard library is imported at
+module level.
+"""
+
+import json
+import re
+import time
+
+IMPORTTIME_RE = re.compile(
+    r"^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|"
+    r"(?P<indent> +)(?P<module>\S+)$"
+)
+
+
+def _elapsed_ms(start):
+    return (time.perf_counter() - start) * 1000
+
+
+def _time_app_configs(timings):
+    """
+    Record how long each app takes to import, to import its models and to
+    run ``ready()``, in ``timings`` by app label.
+    """
+    from django.apps.config import AppConfig
+
+    create = AppConfig.create.__func__
+
+    def timed(app_timings, step, method):
+        def wrapper():
+            start = time.perf_counter()
+            method()
+            app_timings[step] = _elapsed_ms(start)
+        return wrapper
+
+    def timed_create(cls, entry):
+        start = time.perf_counter()
+        app_config = create(cls, entry)
+        app_timings = timings[app_config.label] = {
+            "import": _elapsed_ms(start), "models": 0, "ready": 0,
+        }
+        app_config.import_models = timed(
+            app_timings, "models", app_config.import_models
+        )
+        app_config.ready = timed(app_timings, "ready", app_config.ready)
+        return app_config
+
+    AppConfig.create = classmethod(timed_create)
+
+
+def time_startup():
+    """
+    Start Django and return the time of each phase in milliseconds, and
+    of each app under ``apps``.
+    """
+    timings = {}
+    start = time.perf_counter()
+    import django
+    from django.conf import settings
+    settings.INSTALLED_APPS
+    timings["settings"] = _elapsed_ms(start)
+
+    timings["apps"] = {}
+    _time_app_configs(timings["apps"])
+    start = time.perf_counter()
+    django.setup()
+    timings["setup"] = _elapsed_ms(start)
+
+    # Loaded by the first request (or the gunicorn warmup)
+    from django.template import engines
+    from django.urls import get_resolver
+    start = time.perf_counter()
+    get_resolver().url_patterns
+    timings["urls"] = _elapsed_ms(start)
+    start = time.perf_counter()
+    # Creating the engines imports the template tag libraries of all apps
+    engines.all()
+    timings["templates"] = _elapsed_ms(start)
+    return timings
+
+
+def parse_importtime(lines):
+    """
+    Return ``(module, self_us, cumulative_us, depth)`` for each import in
+    the output of ``python -X importtime``; depth 0 for modules no other
+    module was importing at the time.
+    """
+    imports = []
+    for line in lines:
+        match = IMPORTTIME_RE.match(line.rstrip("\n"))
+        if match:
+            imports.append((
+                match["module"],
+                int(match["self"]),
+                int(match["cumulative"]),
+                (len(match["indent"]) - 1) // 2,
+            ))
+    return imports
+
+
+if __name__ == "__main__":
+    print(json.dumps(time_startup()))
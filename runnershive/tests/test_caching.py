@@ -0,0 +1,191 @@
+"""
+Tests for the runnershive cache configuration and helpers.
+"""
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+from runnershive.caching import (
+    VersionedCache, cache_stats, caches_from_env, parse_cache_url
+)
+
+FILE_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-default",
+    },
+    "pages": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": "/tmp/runnershive-test-cache/pages",
+    },
+}
+
+
+class CacheConfigTestCase(SimpleTestCase):
+
+    def test_parse_locmem_url(self):
+        """
+        locmem:// should give every named cache its own memory store.
+        """
+        self.assertEqual(
+            parse_cache_url("locmem://", "pages"),
+            {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "runnershive-pages",
+            },
+        )
+
+    def test_parse_file_url(self):
+        """
+        file:// should use one sub-directory per named cache.
+        """
+        config = parse_cache_url("file:///var/tmp/cache/", "fragments")
+        self.assertEqual(
+            config["BACKEND"],
+            "django.core.cache.backends.filebased.FileBasedCache"
+        )
+        self.assertEqual(config["LOCATION"], "/var/tmp/cache/fragments")
+
+    def test_parse_redis_url_with_options(self):
+        """
+        redis:// should keep the server URL, prefix keys with the cache
+        name and pass on query parameters.
+        """
+        config = parse_cache_url(
+            "redis://localhost:6379/1?timeout=600&max_entries=5000",
+            "sessions",
+        )
+        self.assertEqual(
+            config,
+            {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://localhost:6379/1",
+                "TIMEOUT": 600,
+                "OPTIONS": {"MAX_ENTRIES": 5000},
+                "KEY_PREFIX": "sessions",
+            },
+        )
+
+    def test_parse_unknown_scheme(self):
+        """Unknown cache URL schemes should be rejected."""
+        with self.assertRaises(ValueError):
+            parse_cache_url("memcached://localhost:11211")
+
+    def test_caches_from_env(self):
+        """
+        CACHE_URL should configure all named caches and CACHE_URL_<ALIAS>
+        should override single caches.
+        """
+        config = caches_from_env({
+            "CACHE_URL": "file:///tmp/cache",
+            "CACHE_URL_SESSIONS": "redis://localhost:6379/0",
+        })
+        self.assertEqual(
+            set(config), {"default", "pages", "fragments", "sessions"}
+        )
+        self.assertEqual(config["pages"]["LOCATION"], "/tmp/cache/pages")
+        self.assertEqual(
+            config["sessions"]["BACKEND"],
+            "django.core.cache.backends.redis.RedisCache"
+        )
+
+    def test_default_is_local_memory(self):
+        """Without CACHE_URL all caches should use local memory."""
+        config = caches_from_env({})
+        for alias in config:
+            self.assertEqual(
+                config[alias]["BACKEND"],
+                "django.core.cache.backends.locmem.LocMemCache"
+            )
+
+    def test_shared_caches_require_cache_url(self):
+        """
+        Caches shared between workers should need an explicit CACHE_URL
+        and may use the database cache for all but the default cache.
+        """
+        with self.assertRaisesMessage(ImproperlyConfigured, "CACHE_URL"):
+            caches_from_env({}, shared=True)
+        config = caches_from_env({
+            "CACHE_URL": "redis://localhost:6379/0",
+            "CACHE_URL_SESSIONS": "db://",
+        }, shared=True)
+        self.assertEqual(config["sessions"], {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "runnershive_cache",
+            "KEY_PREFIX": "sessions",
+        })
+        self.assertEqual(
+            config["default"]["BACKEND"],
+            "django.core.cache.backends.redis.RedisCache"
+        )
+
+    def test_shared_caches_refuse_database_default(self):
+        """
+        The default cache, read by every VersionedCache lookup, shouldn't
+        be the database cache.
+        """
+        with self.assertRaisesMessage(ImproperlyConfigured, "db://"):
+            caches_from_env({"CACHE_URL": "db://"}, shared=True)
+
+    def test_shared_caches_refuse_local_memory(self):
+        """
+        Local memory caches should be refused when the caches must be
+        shared between workers.
+        """
+        with self.assertRaisesMessage(ImproperlyConfigured, "sessions"):
+            caches_from_env({
+                "CACHE_URL": "redis://localhost:6379/0",
+                "CACHE_URL_SESSIONS": "locmem://",
+            }, shared=True)
+
+
+@override_settings(CACHES=FILE_CACHES)
+class VersionedCacheTestCase(SimpleTestCase):
+
+    def setUp(self):
+        for alias in FILE_CACHES:
+            caches[alias].clear()
+        self.cache = VersionedCache("tests:items", alias="pages")
+
+    def test_get_and_set(self):
+        """Values should round-trip through the file cache."""
+        self.cache.set("answer", 42)
+        self.assertEqual(self.cache.get("answer"), 42)
+        self.assertIsNone(self.cache.get("missing"))
+
+    def test_bump_invalidates_namespace(self):
+        """Bumping the version should hide all previously cached keys."""
+        self.cache.set("answer", 42)
+        self.cache.bump()
+        self.assertIsNone(self.cache.get("answer"))
+
+    def test_counts_hits_and_misses(self):
+        """Every lookup should count as a hit or a miss."""
+        before = cache_stats().get(
+            "tests:items", {"hits": 0, "misses": 0}
+        )
+        self.cache.set("answer", 42)
+        self.cache.get("answer")
+        self.cache.get("answer")
+        self.cache.get("missing")
+        after = cache_stats()["tests:items"]
+        self.assertEqual(after["hits"] - before["hits"], 2)
+        self.assertEqual(after["misses"] - before["misses"], 1)
+
+    async def test_async_get_and_set(self):
+        """
+        The async versions should share keys, versions and counters with
+        the sync ones.
+        """
+        before = cache_stats().get(
+            "tests:items", {"hits": 0, "misses": 0}
+        )
+        await self.cache.aset("answer", 42)
+        self.assertEqual(self.cache.get("answer"), 42)
+        self.assertEqual(await self.cache.aget("answer"), 42)
+        self.assertIsNone(await self.cache.aget("missing"))
+        self.cache.bump()
+        self.assertIsNone(await self.cache.aget("answer"))
+        after = cache_stats()["tests:items"]
+        self.assertEqual(after["hits"] - before["hits"], 2)
+        self.assertEqual(after["misses"] - before["misses"], 2)
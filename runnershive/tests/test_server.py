@@ -0,0 +1,155 @@
+"""
+Tests for the gunicorn configuration and warmup.
+"""
+
+import os
+import tempfile
+from unittest import mock
+from django.conf import settings
+from django.template import (
+    TemplateDoesNotExist, TemplateSyntaxError, engines
+)
+from django.test import SimpleTestCase, override_settings
+from django.urls import get_resolver
+from runnershive.server import (
+    ASGI_APP, WSGI_APP, _project_template_dirs, compile_templates,
+    populate_url_resolver, post_worker_init, server_config, warmup,
+    when_ready
+)
+
+
+class ServerConfigTestCase(SimpleTestCase):
+
+    def test_defaults(self):
+        """
+        Sync workers should serve the preloaded WSGI application and be
+        recycled with jitter.
+        """
+        config = server_config({})
+        self.assertEqual(config["wsgi_app"], WSGI_APP)
+        self.assertEqual(config["worker_class"], "sync")
+        self.assertEqual(config["workers"], 2)
+        self.assertEqual(config["threads"], 1)
+        self.assertTrue(config["preload_app"])
+        self.assertEqual(config["max_requests"], 1000)
+        self.assertEqual(config["max_requests_jitter"], 100)
+
+    def test_environment(self):
+        """The settings should be read from the environment."""
+        config = server_config({
+            "GUNICORN_WORKER_CLASS": "gthread",
+            "WEB_CONCURRENCY": "4",
+            "GUNICORN_THREADS": "8",
+            "GUNICORN_PRELOAD": "off",
+            "GUNICORN_MAX_REQUESTS": "0",
+        })
+        self.assertEqual(config["wsgi_app"], WSGI_APP)
+        self.assertEqual(config["worker_class"], "gthread")
+        self.assertEqual(config["workers"], 4)
+        self.assertEqual(config["threads"], 8)
+        self.assertFalse(config["preload_app"])
+        self.assertEqual(config["max_requests"], 0)
+
+    def test_uvicorn_workers_serve_asgi(self):
+        """Uvicorn workers should serve the ASGI application."""
+        config = server_config({"GUNICORN_WORKER_CLASS": "uvicorn"})
+        self.assertEqual(config["wsgi_app"], ASGI_APP)
+        self.assertEqual(
+            config["worker_class"], "uvicorn.workers.UvicornWorker"
+        )
+
+
+class WarmupTestCase(SimpleTestCase):
+
+    def test_compile_templates(self):
+        """
+        Project templates should be compiled into the cached loader,
+        templates of packages should not.
+        """
+        loader = engines["django"].engine.template_loaders[0]
+        loader.reset()
+        compiled, failed = compile_templates()
+        self.assertGreater(compiled, 0)
+        self.assertEqual(failed, [])
+        self.assertIn("base.html", loader.get_template_cache)
+        self.assertIn("events/event_list.html", loader.get_template_cache)
+        self.assertNotIn("admin/base.html", loader.get_template_cache)
+
+    def test_compile_templates_reports_failures(self):
+        """
+        Templates that can't be compiled should be reported and logged,
+        not stop the warmup.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            files = {
+                "ok.html": b"{% if ok %}ok{% endif %}",
+                "syntax.html": b"{% if %}",
+                "latin1.html": b"caf\xe9",
+            }
+            for name, content in files.items():
+                with open(os.path.join(directory, name), "wb") as file:
+                    file.write(content)
+            os.symlink(
+                os.path.join(directory, "gone.html"),
+                os.path.join(directory, "missing.html"),
+            )
+            templates = [{
+                "BACKEND": "django.template.backends.django.DjangoTemplates",
+                "DIRS": [directory],
+            }]
+            with override_settings(TEMPLATES=templates):
+                compiled, failed = compile_templates()
+                log = mock.Mock()
+                warmup(log)
+        self.assertEqual(log.warning.call_count, 3)
+        self.assertEqual(compiled, 1)
+        self.assertEqual(
+            {name: type(error) for name, error in failed},
+            {
+                "syntax.html": TemplateSyntaxError,
+                "latin1.html": UnicodeDecodeError,
+                "missing.html": TemplateDoesNotExist,
+            },
+        )
+
+    def test_project_template_dirs(self):
+        """
+        Only DIRS and the template directories of apps inside the project
+        directory should count, not those of a directory that merely
+        starts with the same name.
+        """
+        engine = engines["django"]
+        base_dir = str(settings.BASE_DIR)
+        with override_settings(BASE_DIR=base_dir + "-other"):
+            self.assertEqual(
+                _project_template_dirs(engine), list(engine.dirs)
+            )
+        directories = _project_template_dirs(engine)
+        self.assertIn(
+            os.path.join(base_dir, "events", "templates"), directories
+        )
+        self.assertFalse(any("site-packages" in d for d in directories))
+
+    def test_populate_url_resolver(self):
+        """All URL patterns, including included ones, should be counted."""
+        count = populate_url_resolver()
+        self.assertGreater(count, len(get_resolver().url_patterns))
+        self.assertIn("events", get_resolver().reverse_dict)
+
+    def test_hooks(self):
+        """
+        The warmup should run once in the master with preload, otherwise
+        in each worker.
+        """
+        server = mock.Mock()
+        server.cfg.preload_app = True
+        with mock.patch("runnershive.server.warmup") as warmup:
+            when_ready(server)
+            post_worker_init(server)
+        warmup.assert_called_once_with(server.log)
+
+        server.cfg.preload_app = False
+        with mock.patch("runnershive.server.warmup") as warmup:
+            when_ready(server)
+            post_worker_init(server)
+        warmup.assert_called_once_with(server.log)
@@ -0,0 +1,57 @@
+"""
+Tests for the startup_profile management command.
+"""
+
+import subprocess
+from io import StringIO
+from unittest import mock
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+from runnershive.startup import parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     cloudinary.compat
+import time:       900 |       1020 |   cloudinary.utils
+import time:       300 |       1320 | cloudinary
+import time:        50 |         50 | env
+"""
+
+
+class StartupProfileTestCase(SimpleTestCase):
+
+    def test_parse_importtime(self):
+        """Each import should be parsed with its times and depth."""
+        self.assertEqual(parse_importtime(IMPORTTIME.splitlines()), [
+            ("cloudinary.compat", 120, 120, 2),
+            ("cloudinary.utils", 900, 1020, 1),
+            ("cloudinary", 300, 1320, 0),
+            ("env", 50, 50, 0),
+        ])
+
+    def test_profile(self):
+        """
+        The command should report the phases, apps, imports and packages
+        of a new process.
+        """
+        out = StringIO()
+        call_command("startup_profile", "--limit", "5", stdout=out)
+        output = out.getvalue()
+        self.assertIn("Apps (django.setup)", output)
+        self.assertIn("  events\n", output)
+        self.assertIn("  django.urls\n", output)
+        self.assertIn("  django\n", output)
+        # Limited to 5 imports
+        imports = output.split("Slowest imports")[1].split("\n\n")[0]
+        self.assertEqual(len(imports.splitlines()), 7)
+
+    def test_failed_startup(self):
+        """A failing startup should be reported with its error output."""
+        failed = subprocess.CompletedProcess(
+            [], 1, stdout="", stderr="ImproperlyConfigured"
+        )
+        with mock.patch("subprocess.run", return_value=failed):
+            with self.assertRaisesMessage(
+                CommandError, "ImproperlyConfigured"
+            ):
+                call_command("startup_profile")
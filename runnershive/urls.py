@@ -19,12 +19,15 @@ from events import views
 from django.contrib import admin
 from django.urls import path, include
 from .views import handler400, handler403, handler404, handler500
+from .views import runtime_stats
 
 # URL Paths ordered alphabetically
 urlpatterns = [
     path('accounts/', include('allauth.urls')),
     path('admin/', admin.site.urls),
+    path('api/v1/', include("events.api_urls")),
     path('events/', include("events.urls")),
+    path('stats/', runtime_stats, name="runtime_stats"),
     path('summernote/', include('django_summernote.urls')),
     path('', views.TodaysEventsListView.as_view(), name="home"),
     path('', include("core.urls")),
@@ -1,4 +1,8 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
+from .caching import cache_stats
+from .database import pool_stats
 
 
 def handler400(request, exception):
@@ -32,3 +36,15 @@ def handler500(request):
     # 1) add this line to the top of the function loading the home page
     # raise Exception("Test 500 Error")
     return render(request, "errors/500.html", status=500)
+
+
+@staff_member_required
+def runtime_stats(request):
+    """
+    Return database connection and cache statistics of the worker process
+    serving the request as JSON (staff only).
+    """
+    return JsonResponse({
+        "database": pool_stats(),
+        "cache": cache_stats(),
+    })
@@ -0,0 +1,45 @@
+/* jshint esversion: 11 */
+
+// Suggest existing spellings for inputs with a data-autocomplete-url,
+// using a native <datalist> filled from the autocomplete endpoint
+document.addEventListener("DOMContentLoaded", function () {
+    document.querySelectorAll("input[data-autocomplete-url]").forEach((input) => {
+        const datalist = document.createElement("datalist");
+        datalist.id = `${input.id}-suggestions`;
+        input.after(datalist);
+        input.setAttribute("list", datalist.id);
+
+        let timer = null;
+        let controller = null;
+
+        input.addEventListener("input", () => {
+            clearTimeout(timer);
+            // Wait for a short pause in typing before asking the server
+            timer = setTimeout(() => {
+                const query = input.value.trim();
+                if (!query) {
+                    datalist.replaceChildren();
+                    return;
+                }
+
+                // Drop the answer to a previous, outdated request
+                if (controller) {
+                    controller.abort();
+                }
+                controller = new AbortController();
+
+                const url = `${input.dataset.autocompleteUrl}?q=${encodeURIComponent(query)}`;
+                fetch(url, { signal: controller.signal })
+                    .then((response) => response.json())
+                    .then((data) => {
+                        datalist.replaceChildren(...data.results.map((value) => {
+                            const option = document.createElement("option");
+                            option.value = value;
+                            return option;
+                        }));
+                    })
+                    .catch(() => {});
+            }, 150);
+        });
+    });
+});
@@ -0,0 +1,33 @@
+/* jshint esversion: 11 */
+
+// Fill the distance filter with the user's current location
+document.addEventListener("DOMContentLoaded", function () {
+    const button = document.getElementById("nearMeBtn");
+    const near = document.getElementById("id_near");
+    const lat = document.getElementById("id_lat");
+    const lng = document.getElementById("id_lng");
+    const radius = document.getElementById("id_radius");
+
+    if (!button || !navigator.geolocation) {
+        button?.remove();
+        return;
+    }
+
+    // Typing a place replaces a previously used own location
+    near.addEventListener("input", () => {
+        lat.value = "";
+        lng.value = "";
+    });
+
+    button.addEventListener("click", () => {
+        navigator.geolocation.getCurrentPosition((position) => {
+            lat.value = position.coords.latitude.toFixed(4);
+            lng.value = position.coords.longitude.toFixed(4);
+            near.value = "";
+            near.placeholder = "My location";
+            if (!radius.value) {
+                radius.value = "10";
+            }
+        });
+    });
+});
@@ -25,3 +25,10 @@ deleteModal.addEventListener('show.bs.modal', event => {
     // Ensures that request goes to the correct endpoint when deletion gets confirmed
     deleteForm.action = url;
 });
+
+// Ask for confirmation before deleting the selected events
+document.querySelector('.bulk-delete-btn').addEventListener('click', event => {
+    if (!confirm('Delete the selected events? This action cannot be undone.')) {
+        event.preventDefault();
+    }
+});